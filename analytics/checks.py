@@ -0,0 +1,29 @@
+from django.core.checks import Error, Tags, register
+from django.db import connections
+
+MIN_POSTGRES_VERSION = 150000  # server_version_num de PostgreSQL 15
+
+
+@register(Tags.database)
+def check_postgres_version(app_configs, databases=None, **kwargs):
+    """
+    Los rollups necesitan PostgreSQL 15+: la restricción única de sus
+    dimensiones usa NULLS NOT DISTINCT (las filas de ticket completo tienen
+    producto y categoría nulos) y el upsert de rollups.py hace ON CONFLICT
+    sobre ella. En versiones anteriores Django omite la opción sin error y
+    cada recálculo duplicaría esas filas en vez de sumarlas.
+
+    Como toda verificación de base de datos, la ejecuta `migrate`.
+    """
+    errors = []
+    for alias in databases or []:
+        connection = connections[alias]
+        if connection.vendor != 'postgresql' or connection.pg_version >= MIN_POSTGRES_VERSION:
+            continue
+        errors.append(Error(
+            f"La base de datos '{alias}' usa PostgreSQL {connection.pg_version // 10000}; "
+            f"se requiere PostgreSQL 15 o superior.",
+            hint="Los rollups de analítica usan restricciones únicas NULLS NOT DISTINCT.",
+            id='analytics.E001',
+        ))
+    return errors
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from analytics.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recalcula desde cero los rollups de ventas (por hora y por día) de un rango de fechas."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--from', dest='date_from', required=True, help="Primer día (YYYY-MM-DD)")
+        parser.add_argument('--to', dest='date_to', help="Último día inclusive (YYYY-MM-DD); por defecto hoy")
+
+    def handle(self, *args, **options):
+        date_from = parse_date(options['date_from'] or '')
+        date_to = parse_date(options['date_to']) if options['date_to'] else timezone.localdate()
+        if not date_from or not date_to:
+            raise CommandError("Las fechas deben tener el formato YYYY-MM-DD")
+        if date_from > date_to:
+            raise CommandError("--from no puede ser posterior a --to")
+
+        result = rebuild(date_from, date_to)
+        for table, rows in result.items():
+            self.stdout.write(f"{table}: {rows} filas")
+        self.stdout.write(self.style.SUCCESS(f"Rollups reconstruidos del {date_from} al {date_to}"))
@@ -0,0 +1,59 @@
+# Generated by Django 5.2 on 2026-10-17 17:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('inventory', '0006_purchase_cash_register'),
+        ('sale', '0005_cashregister_discrepancy'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SalesDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('units', models.BigIntegerField(default=0)),
+                ('tickets', models.IntegerField(default=0)),
+                ('gross', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('discounts', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('bucket', models.DateField()),
+                ('cash_register', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='sale.cashregister')),
+                ('cashier', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='inventory.category')),
+                ('product', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='inventory.product')),
+            ],
+            options={
+                'db_table': 'analytics_sales_daily',
+                'constraints': [models.UniqueConstraint(fields=('bucket', 'product', 'category', 'cashier', 'cash_register'), name='sales_daily_dimensions_uniq', nulls_distinct=False)],
+            },
+        ),
+        migrations.CreateModel(
+            name='SalesHourly',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('units', models.BigIntegerField(default=0)),
+                ('tickets', models.IntegerField(default=0)),
+                ('gross', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('discounts', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('bucket', models.DateTimeField()),
+                ('cash_register', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='sale.cashregister')),
+                ('cashier', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='inventory.category')),
+                ('product', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='inventory.product')),
+            ],
+            options={
+                'db_table': 'analytics_sales_hourly',
+                'constraints': [models.UniqueConstraint(fields=('bucket', 'product', 'category', 'cashier', 'cash_register'), name='sales_hourly_dimensions_uniq', nulls_distinct=False)],
+            },
+        ),
+    ]
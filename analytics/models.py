@@ -0,0 +1,56 @@
+from django.db import models
+
+from inventory.models import Product, Category
+from sale.models import CashRegister
+from user.models import User
+
+DIMENSIONS = ['bucket', 'product', 'category', 'cashier', 'cash_register']
+
+
+class SalesRollup(models.Model):
+    """
+    Totales de ventas precalculados por periodo y dimensión.
+
+    Las filas con producto/categoría nulos son el total del ticket completo
+    para (periodo, cajero, caja): ahí `tickets` es exacto. En las filas por
+    producto `tickets` cuenta las ventas que incluyeron ese producto.
+    """
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, null=True, related_name='+')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, null=True, related_name='+')
+    cashier = models.ForeignKey(User, on_delete=models.CASCADE, null=True, related_name='+')
+    cash_register = models.ForeignKey(CashRegister, on_delete=models.CASCADE, null=True, related_name='+')
+
+    units = models.BigIntegerField(default=0)
+    tickets = models.IntegerField(default=0)
+    gross = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    discounts = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        abstract = True
+
+
+class SalesHourly(SalesRollup):
+    bucket = models.DateTimeField()
+
+    class Meta:
+        db_table = 'analytics_sales_hourly'
+        constraints = [
+            models.UniqueConstraint(fields=DIMENSIONS, nulls_distinct=False, name='sales_hourly_dimensions_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.bucket:%Y-%m-%d %H}h"
+
+
+class SalesDaily(SalesRollup):
+    bucket = models.DateField()
+
+    class Meta:
+        db_table = 'analytics_sales_daily'
+        constraints = [
+            models.UniqueConstraint(fields=DIMENSIONS, nulls_distinct=False, name='sales_daily_dimensions_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.bucket:%Y-%m-%d}"
@@ -0,0 +1,144 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+
+from analytics.models import SalesHourly, SalesDaily
+from inventory.models import Product
+from sale.models import Sale, SaleDetail, CashRegister
+
+COLUMNS = ('bucket', 'product_id', 'category_id', 'cashier_id', 'cash_register_id',
+           'units', 'tickets', 'gross', 'discounts', 'revenue')
+MEASURES = COLUMNS[5:]
+
+
+def _upsert_sql(model, rows: int) -> str:
+    table = model._meta.db_table
+    values = ', '.join(['(' + ', '.join(['%s'] * len(COLUMNS)) + ')'] * rows)
+    updates = ', '.join(f'{m} = {table}.{m} + EXCLUDED.{m}' for m in MEASURES)
+    return (
+        f"INSERT INTO {table} ({', '.join(COLUMNS)}) VALUES {values} "
+        f"ON CONFLICT ({', '.join(COLUMNS[:5])}) DO UPDATE SET {updates}"
+    )
+
+
+def _hour(moment):
+    return moment.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def _add(totals, key, units, gross, discounts, revenue, tickets):
+    row = totals[key]
+    row[0] += units
+    row[1] += tickets
+    row[2] += gross
+    row[3] += discounts
+    row[4] += revenue
+
+
+def _upsert(model, totals):
+    if not totals:
+        return
+    # Orden fijo de claves: dos ventas concurrentes bloquean las filas en el mismo orden
+    keys = sorted(totals, key=lambda key: tuple('' if v is None else str(v) for v in key))
+    params = []
+    for key in keys:
+        params.extend(key)
+        params.extend(totals[key])
+    with connection.cursor() as cursor:
+        cursor.execute(_upsert_sql(model, len(keys)), params)
+
+
+def record_sales(sales):
+    """
+    Suma ventas recién creadas a los rollups por hora y por día.
+
+    `sales` es una lista de (Sale, [SaleDetail]) con los productos ya cargados.
+    Debe llamarse dentro de la transacción que crea las ventas: si hace
+    rollback, los rollups también.
+    """
+    hourly = defaultdict(lambda: [0, 0, Decimal(0), Decimal(0), Decimal(0)])
+    daily = defaultdict(lambda: [0, 0, Decimal(0), Decimal(0), Decimal(0)])
+
+    for sale, details in sales:
+        register = sale.cash_register
+        dims = (register.user_id if register else None, register.pk if register else None)
+        buckets = ((hourly, _hour(sale.created_at)), (daily, timezone.localdate(sale.created_at)))
+
+        by_product = defaultdict(lambda: [0, Decimal(0), Decimal(0), Decimal(0)])
+        for detail in details:
+            gross = detail.price * detail.quantity
+            line = by_product[(detail.product_id, detail.product.category_id)]
+            line[0] += detail.quantity
+            line[1] += gross
+            line[2] += gross - detail.subtotal
+            line[3] += detail.subtotal
+
+        for totals, bucket in buckets:
+            for (product_id, category_id), (units, gross, discounts, revenue) in by_product.items():
+                _add(totals, (bucket, product_id, category_id) + dims, units, gross, discounts, revenue, 1)
+            ticket = [sum(values[i] for values in by_product.values()) for i in range(4)]
+            _add(totals, (bucket, None, None) + dims, *ticket, 1)
+
+    _upsert(SalesHourly, hourly)
+    _upsert(SalesDaily, daily)
+
+
+_REBUILD_SQL = """
+    INSERT INTO {table} ({columns})
+    SELECT bucket, product_id, category_id, cashier_id, cash_register_id,
+           SUM(quantity), COUNT(DISTINCT sale_id), SUM(gross), SUM(gross - subtotal), SUM(subtotal)
+    FROM (
+        SELECT {bucket} AS bucket, d.product_id, p.category_id, r.user_id AS cashier_id,
+               s.cash_register_id, d.sale_id, d.quantity, d.price * d.quantity AS gross, d.subtotal
+        FROM {details} d
+        JOIN {sales} s ON s.id = d.sale_id
+        JOIN {products} p ON p.id = d.product_id
+        LEFT JOIN {registers} r ON r.id = s.cash_register_id
+        WHERE s.created_at >= %s AND s.created_at < %s
+    ) lines
+    GROUP BY GROUPING SETS (
+        (bucket, cashier_id, cash_register_id, product_id, category_id),
+        (bucket, cashier_id, cash_register_id)
+    )
+"""
+
+
+def rebuild(date_from, date_to) -> dict:
+    """
+    Recalcula desde cero los rollups de los días [date_from, date_to] (fechas
+    locales) a partir de Sale/SaleDetail. Los rollups se bloquean durante la
+    reconstrucción, así que las ventas que se registren mientras tanto esperan
+    y se suman después sobre los valores nuevos.
+    """
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(date_from, time.min), tz)
+    end = timezone.make_aware(datetime.combine(date_to + timedelta(days=1), time.min), tz)
+
+    names = {
+        'columns': ', '.join(COLUMNS),
+        'details': SaleDetail._meta.db_table,
+        'sales': Sale._meta.db_table,
+        'products': Product._meta.db_table,
+        'registers': CashRegister._meta.db_table,
+    }
+    targets = (
+        (SalesHourly, "date_trunc('hour', s.created_at)", []),
+        (SalesDaily, "(s.created_at AT TIME ZONE %s)::date", [settings.TIME_ZONE]),
+    )
+
+    result = {}
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            f"LOCK TABLE {SalesHourly._meta.db_table}, {SalesDaily._meta.db_table} IN SHARE ROW EXCLUSIVE MODE"
+        )
+        SalesHourly.objects.filter(bucket__gte=start, bucket__lt=end).delete()
+        SalesDaily.objects.filter(bucket__gte=date_from, bucket__lte=date_to).delete()
+
+        for model, bucket, bucket_params in targets:
+            sql = _REBUILD_SQL.format(table=model._meta.db_table, bucket=bucket, **names)
+            cursor.execute(sql, bucket_params + [start, end])
+            result[model._meta.db_table] = cursor.rowcount
+    return result
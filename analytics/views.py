@@ -0,0 +1,115 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import F, Sum
+from django.db.models.functions import TruncWeek, TruncMonth
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+
+from analytics.models import SalesHourly, SalesDaily
+from user.permissions import IsAdministrator
+from config.response import response, StandardResponseSerializerSuccess, StandardResponseSerializerError
+
+PERIODS = ('hour', 'day', 'week', 'month')
+DIMENSION_FILTERS = ('product', 'category', 'cashier', 'cash_register')
+
+
+
+def _day_start(day):
+    """Inicio del día local `day` como timestamp, para comparar con bucket sin convertirlo."""
+    return timezone.make_aware(datetime.combine(day, time.min), timezone.get_current_timezone())
+
+
+def _average(revenue, tickets):
+    return (revenue / tickets).quantize(Decimal('0.01')) if tickets else Decimal(0)
+
+
+@extend_schema(
+    tags=['Analítica'],
+    parameters=[
+        OpenApiParameter(name='period', description='Agrupación: hour, day, week o month (por defecto day)', required=False, type=str),
+        OpenApiParameter(name='from', description='Primer día (YYYY-MM-DD)', required=False, type=str),
+        OpenApiParameter(name='to', description='Último día inclusive (YYYY-MM-DD)', required=False, type=str),
+        OpenApiParameter(name='product', description='ID del producto', required=False, type=str),
+        OpenApiParameter(name='category', description='ID de la categoría', required=False, type=str),
+        OpenApiParameter(name='cashier', description='ID del cajero', required=False, type=str),
+        OpenApiParameter(name='cash_register', description='ID de la caja', required=False, type=str),
+    ],
+    responses={
+        200: StandardResponseSerializerSuccess,
+        400: StandardResponseSerializerError,
+        500: StandardResponseSerializerError
+    }
+)
+class SalesAnalyticsView(APIView):
+    """Ingresos, unidades, tickets y ticket promedio por periodo, leídos solo de los rollups."""
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAdministrator]
+
+    def get(self, request):
+        params = request.query_params
+        period = params.get('period', 'day')
+        if period not in PERIODS:
+            return response(400, f"Periodo inválido. Opciones: {', '.join(PERIODS)}")
+
+        date_from = parse_date(params['from']) if params.get('from') else None
+        date_to = parse_date(params['to']) if params.get('to') else None
+        if (params.get('from') and not date_from) or (params.get('to') and not date_to):
+            return response(400, "Las fechas deben tener el formato YYYY-MM-DD")
+
+        try:
+            if period == 'hour':
+                # Rango sobre bucket (no bucket__date) para que use el índice de la columna
+                queryset = SalesHourly.objects.all()
+                if date_from:
+                    queryset = queryset.filter(bucket__gte=_day_start(date_from))
+                if date_to:
+                    queryset = queryset.filter(bucket__lt=_day_start(date_to + timedelta(days=1)))
+            else:
+                queryset = SalesDaily.objects.all()
+                if date_from:
+                    queryset = queryset.filter(bucket__gte=date_from)
+                if date_to:
+                    queryset = queryset.filter(bucket__lte=date_to)
+
+            filters = {f'{name}_id': params[name] for name in DIMENSION_FILTERS if params.get(name)}
+            # Con producto o categoría se usan las filas por producto; si no, las filas
+            # de ticket completo, donde la cantidad de tickets es exacta
+            by_product = 'product_id' in filters or 'category_id' in filters
+            queryset = queryset.filter(product__isnull=not by_product, **filters)
+
+            if period == 'week':
+                queryset = queryset.annotate(period=TruncWeek('bucket'))
+            elif period == 'month':
+                queryset = queryset.annotate(period=TruncMonth('bucket'))
+            else:
+                queryset = queryset.annotate(period=F('bucket'))
+
+            rows = (
+                queryset.values('period')
+                .annotate(revenue=Sum('revenue'), units=Sum('units'), tickets=Sum('tickets'), discounts=Sum('discounts'))
+                .order_by('period')
+            )
+
+            series, totals = [], {'revenue': Decimal(0), 'units': 0, 'tickets': 0, 'discounts': Decimal(0)}
+            for row in rows:
+                row['average_ticket'] = _average(row['revenue'], row['tickets'])
+                series.append(row)
+                for key in totals:
+                    totals[key] += row[key]
+            totals['average_ticket'] = _average(totals['revenue'], totals['tickets'])
+
+            return response(200, "Analítica de ventas obtenida", data={
+                'period': period,
+                'tickets_by_product': by_product,
+                'totals': totals,
+                'series': series,
+            })
+        except (ValueError, DjangoValidationError):
+            return response(400, "Filtro inválido")
+        except Exception as e:
+            return response(500, f"Error al obtener analítica de ventas: {str(e)}")
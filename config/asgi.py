@@ -5,6 +5,15 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+This is the application served in production (see entrypoint.sh). The live
+events stream (/api/events/, live.views) only works under ASGI, where each open
+connection is an idle coroutine instead of a blocked worker:
+
+    gunicorn config.asgi:application -k uvicorn.workers.UvicornWorker
+
+For local development with the stream, run ``uvicorn config.asgi:application
+--reload`` instead of runserver.
 """
 
 import os
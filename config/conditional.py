@@ -0,0 +1,67 @@
+import hashlib
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count, Max
+from rest_framework.response import Response
+
+from config.eager import select_related_paths
+
+
+def _has_updated_at(model) -> bool:
+    try:
+        model._meta.get_field('updated_at')
+        return True
+    except FieldDoesNotExist:
+        return False
+
+
+def _related_paths(queryset, serializer_class):
+    """Relaciones FK/OneToOne que el serializer anida y que tienen updated_at."""
+    if serializer_class is None:
+        return []
+    paths = []
+    for path in select_related_paths(serializer_class, queryset.model):
+        model = queryset.model
+        for part in path.split('__'):
+            model = model._meta.get_field(part).related_model
+        if _has_updated_at(model):
+            paths.append(path)
+    return paths
+
+
+def queryset_etag(queryset, serializer_class=None, extra: str = '') -> tuple:
+    """
+    ETag débil de un queryset filtrado: max(updated_at) de las filas (y de las
+    relaciones que el serializer anida) más la cantidad de filas, en una sola
+    consulta agregada y sin serializar nada.
+
+    Retorna (etag, cantidad_de_filas).
+    """
+    aggregates = {'rows': Count('pk'), 'last': Max('updated_at')}
+    for i, path in enumerate(_related_paths(queryset, serializer_class)):
+        aggregates[f'last_{i}'] = Max(f'{path}__updated_at')
+
+    values = queryset.order_by().aggregate(**aggregates)
+    raw = '|'.join(str(values[k]) for k in sorted(values)) + f'|{extra}'
+    return f'W/"{hashlib.md5(raw.encode()).hexdigest()}"', values['rows']
+
+
+def etag_matches(request, etag: str) -> bool:
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header or not etag:
+        return False
+    if header.strip() == '*':
+        return True
+    # Comparación débil: W/"x" y "x" se consideran iguales
+    opaque = etag[2:] if etag.startswith('W/') else etag
+    for candidate in header.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status=304, headers={'ETag': etag})
@@ -0,0 +1,84 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+COUNT_CACHE_TTL = getattr(settings, 'LIST_COUNT_CACHE_TTL', 30)
+COUNT_ESTIMATE_THRESHOLD = getattr(settings, 'LIST_COUNT_ESTIMATE_THRESHOLD', 100_000)
+
+FALSE_VALUES = ('false', '0', 'no', 'off')
+
+
+def wants_count(request) -> bool:
+    """Los clientes pueden omitir el conteo total con ?count=false."""
+    if request is None:
+        return True
+    return str(request.query_params.get('count', 'true')).lower() not in FALSE_VALUES
+
+
+def _cache_key(queryset) -> str:
+    # La firma del filtro es el SQL sin ORDER BY: mismo WHERE, mismo conteo
+    sql = str(queryset.order_by().query)
+    digest = hashlib.md5(f"{queryset.db}:{sql}".encode()).hexdigest()
+    return f"list-count:{queryset.model._meta.db_table}:{digest}"
+
+
+def _table_estimate(queryset):
+    """Filas estimadas por el planner (pg_class.reltuples) o None si no aplica."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        # Una tabla particionada no tiene filas propias (reltuples -1 o 0): se suman sus particiones
+        cursor.execute(
+            "SELECT CASE WHEN c.relkind = 'p' THEN ("
+            "    SELECT sum(p.reltuples) FILTER (WHERE p.reltuples >= 0) FROM pg_inherits i "
+            "    JOIN pg_class p ON p.oid = i.inhrelid WHERE i.inhparent = c.oid"
+            ") ELSE c.reltuples END::bigint "
+            "FROM pg_class c WHERE c.oid = %s::regclass",
+            [queryset.model._meta.db_table]
+        )
+        row = cursor.fetchone()
+    # reltuples es -1 si la tabla (o ninguna de sus particiones) nunca fue analizada
+    if not row or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def _filtered_estimate(queryset):
+    plan = json.loads(queryset.order_by().explain(format='json'))
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+def count_queryset(queryset, request=None):
+    """
+    Conteo total de un queryset filtrado (antes de paginar).
+
+    Retorna (conteo, estimado). El conteo es None si el cliente pidió
+    count=false. Se ejecuta un solo COUNT(*) por firma de filtro y se guarda
+    COUNT_CACHE_TTL segundos; en tablas más grandes que
+    COUNT_ESTIMATE_THRESHOLD se usa la estimación del planner.
+    """
+    if not wants_count(request):
+        return None, False
+
+    key = _cache_key(queryset)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    result = None
+    table_rows = _table_estimate(queryset)
+    if table_rows is not None and table_rows >= COUNT_ESTIMATE_THRESHOLD:
+        if not queryset.query.has_filters():
+            result = (table_rows, True)
+        else:
+            result = (_filtered_estimate(queryset), True)
+
+    if result is None:
+        result = (queryset.count(), False)
+
+    cache.set(key, result, COUNT_CACHE_TTL)
+    return result
@@ -0,0 +1,83 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+MAX_DEPTH = 5
+
+
+def _plan(serializer, model, depth=0):
+    """
+    Recorre los campos anidados de un serializer y retorna
+    (rutas select_related, [(ruta prefetch, modelo, plan hijo)]).
+    """
+    select, prefetch = [], []
+    if depth >= MAX_DEPTH:
+        return select, prefetch
+
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        many = isinstance(field, serializers.ListSerializer)
+        child = field.child if many else field
+        if not isinstance(child, serializers.BaseSerializer):
+            continue
+
+        source = field.source
+        if not source or source == '*' or '.' in source:
+            continue
+        try:
+            model_field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            continue
+        if not model_field.is_relation:
+            continue
+
+        related_model = model_field.related_model
+        child_select, child_prefetch = _plan(child, related_model, depth + 1)
+
+        forward_single = model_field.concrete and (model_field.many_to_one or model_field.one_to_one)
+        if forward_single and not many:
+            # FK / OneToOne hacia adelante: un JOIN en la misma consulta
+            select.append(source)
+            select.extend(f"{source}__{path}" for path in child_select)
+            prefetch.extend((f"{source}__{path}", m, p) for path, m, p in child_prefetch)
+        else:
+            # Relaciones inversas o muchos-a-muchos: una consulta extra por nivel
+            prefetch.append((source, related_model, (child_select, child_prefetch)))
+
+    return select, prefetch
+
+
+def _build_prefetches(prefetch_plan):
+    # Los objetos Prefetch se crean en cada llamada: Django los modifica al usarlos
+    result = []
+    for path, model, (child_select, child_prefetch) in prefetch_plan:
+        queryset = model._default_manager.all()
+        if child_select:
+            queryset = queryset.select_related(*child_select)
+        if child_prefetch:
+            queryset = queryset.prefetch_related(*_build_prefetches(child_prefetch))
+        result.append(Prefetch(path, queryset=queryset))
+    return result
+
+
+def eager_load(queryset, serializer_class):
+    """
+    Aplica select_related/prefetch_related según los serializers anidados de
+    `serializer_class`, de modo que serializar una página completa cueste un
+    número fijo de consultas sin importar cuántas filas tenga.
+
+    Ej: SaleSerializer -> prefetch 'details' con
+    select_related('product__category', 'product__discount').
+    """
+    select, prefetch = _plan(serializer_class(), queryset.model)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*_build_prefetches(prefetch))
+    return queryset
+
+
+def select_related_paths(serializer_class, model) -> list:
+    """Rutas FK/OneToOne que `serializer_class` anida (ej: ['category', 'discount'])."""
+    return _plan(serializer_class(), model)[0]
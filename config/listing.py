@@ -0,0 +1,165 @@
+from django.core.exceptions import ValidationError
+from django.db.models import Case, When, IntegerField, Value as V
+
+from config.response import response
+from config.counting import count_queryset
+from config.pagination import cursor_paginate, CursorError
+from config.eager import eager_load
+from config.conditional import queryset_etag, etag_matches, not_modified
+
+# Estrategias de búsqueda para el parámetro attr/value, de más a menos amigable con índices
+EXACT = 'exact'        # igualdad: usa el índice de la columna (ids, FKs, booleanos, montos)
+PREFIX = 'prefix'      # LIKE 'valor%' (índice *_like de las columnas únicas); si no hay resultados, como CONTAINS
+CONTAINS = 'contains'  # ILIKE '%valor%' con relevancia (primero los que empiezan con el valor)
+
+
+class ListQueryError(ValueError):
+    """Parámetros de listado inválidos (se responden con 400)."""
+
+
+class ListQueryMixin:
+    """
+    Motor de listado compartido por los ViewSets: filtro attr/value, orden,
+    paginación limit/offset o por cursor y conteo total.
+
+    Cada ViewSet declara qué campos se pueden filtrar y ordenar:
+
+        filter_fields = {'name': CONTAINS, 'code': PREFIX, 'category': EXACT}
+        order_fields = ('created_at', 'name')
+
+    Las relaciones que usa el serializer se cargan de forma anticipada
+    automáticamente (config.eager); list_select_related y
+    list_prefetch_related permiten agregar rutas extra.
+    """
+    filter_fields = {}
+    order_fields = ('created_at',)
+    default_order = '-created_at'
+    list_select_related = ()
+    list_prefetch_related = ()
+    # Responder 304 si el listado filtrado no cambió desde el ETag del cliente
+    conditional_get = False
+
+    def get_list_queryset(self):
+        return self.get_queryset()
+
+    def get_etag_extra(self, request):
+        """Datos extra del ETag del listado (ej: el usuario, si el listado depende de él)."""
+        return request.get_full_path()
+
+    def filter_list_queryset(self, request, queryset):
+        """Punto de extensión para filtros propios del ViewSet (ej: category, search)."""
+        return queryset
+
+    def apply_attr_filter(self, request, queryset):
+        attr = request.query_params.get('attr')
+        value = request.query_params.get('value')
+        if not attr:
+            return queryset, False
+
+        lookup = self.filter_fields.get(attr)
+        if lookup is None:
+            raise ListQueryError(f"El campo '{attr}' no es válido para filtrado")
+        if not value:
+            return queryset, False
+
+        field = queryset.model._meta.get_field(attr)
+        column = field.attname
+
+        try:
+            if lookup == EXACT:
+                return queryset.filter(**{column: value}), False
+            if lookup == PREFIX:
+                # Primero la búsqueda por prefijo, que usa el índice; si no encuentra
+                # nada se busca como texto (ej: "123" encuentra "0000000123", o en minúsculas)
+                prefixed = queryset.filter(**{f"{column}__startswith": value})
+                if prefixed.exists():
+                    return prefixed, False
+
+            queryset = queryset.filter(**{f"{column}__icontains": value}).annotate(
+                relevance=Case(
+                    When(**{f"{column}__istartswith": value}, then=V(0)),
+                    default=V(1),
+                    output_field=IntegerField()
+                )
+            )
+            return queryset, True
+        except (ValidationError, ValueError, TypeError):
+            raise ListQueryError(f"Valor inválido para el campo '{attr}'")
+
+    def get_ordering(self, request):
+        order = request.query_params.get('order')
+        if not order:
+            return None
+        field_name = order.strip().lstrip('+-')
+        if field_name not in self.order_fields:
+            raise ListQueryError(f"No se pudo ordenar por '{order}'")
+        return ('-' if order.strip().startswith('-') else '') + field_name
+
+    def build_list_queryset(self, request):
+        queryset = eager_load(self.get_list_queryset(), self.get_serializer_class())
+        if self.list_select_related:
+            queryset = queryset.select_related(*self.list_select_related)
+        if self.list_prefetch_related:
+            queryset = queryset.prefetch_related(*self.list_prefetch_related)
+
+        queryset = self.filter_list_queryset(request, queryset)
+        queryset, ranked = self.apply_attr_filter(request, queryset)
+
+        order = self.get_ordering(request)
+        if order:
+            queryset = queryset.order_by(order, '-id' if order.startswith('-') else 'id')
+        elif 'search_rank' in queryset.query.annotations:
+            # Búsqueda de texto (ej: ProductViewSet.search): los más relevantes primero
+            relevance = ('relevance',) if ranked else ()
+            queryset = queryset.order_by(*relevance, '-search_rank', self.default_order, '-id')
+        elif ranked:
+            queryset = queryset.order_by('relevance', self.default_order, '-id')
+        else:
+            queryset = queryset.order_by(self.default_order, '-id')
+        return queryset
+
+    def paginate_list(self, request, queryset):
+        """Retorna (filas, siguiente_cursor). Sin cursor se usa limit/offset."""
+        if 'cursor' in request.query_params:
+            try:
+                return cursor_paginate(queryset, request, self.default_order)
+            except CursorError as e:
+                raise ListQueryError(str(e))
+
+        limit = request.query_params.get('limit')
+        offset = request.query_params.get('offset', 0)
+        if limit is None:
+            return queryset, None
+        try:
+            limit = int(limit)
+            offset = int(offset)
+        except ValueError:
+            raise ListQueryError("Los valores de limit y offset deben ser enteros")
+        return queryset[offset:offset + limit], None
+
+    def list_response(self, request, found_message, error_message):
+        try:
+            queryset = self.build_list_queryset(request)
+
+            etag = None
+            if self.conditional_get:
+                etag, _ = queryset_etag(queryset, self.get_serializer_class(), extra=self.get_etag_extra(request))
+                if etag_matches(request, etag):
+                    return not_modified(etag)
+
+            total, estimated = count_queryset(queryset, request)
+            page, next_cursor = self.paginate_list(request, queryset)
+            serializer = self.get_serializer(page, many=True)
+            return response(
+                200,
+                found_message,
+                data=serializer.data,
+                count_data=total,
+                count_estimated=estimated,
+                next_cursor=next_cursor,
+                etag=etag
+            )
+        except ListQueryError as e:
+            return response(400, str(e))
+        except Exception as e:
+            return response(500, f"{error_message}: {str(e)}")
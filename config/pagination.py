@@ -0,0 +1,119 @@
+import base64
+import json
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import F, Q
+
+DEFAULT_CURSOR_LIMIT = 20
+MAX_CURSOR_LIMIT = 200
+
+
+class CursorError(ValueError):
+    """Cursor inválido, manipulado o que no corresponde al orden pedido."""
+
+
+def _cursor_value(value):
+    # isoformat() conserva los microsegundos; DjangoJSONEncoder los recorta
+    # y el keyset necesita el valor exacto para comparar por igualdad.
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def encode_cursor(order: str, values: list) -> str:
+    payload = json.dumps({"o": order, "v": [_cursor_value(v) for v in values]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> dict:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        if not isinstance(payload.get("v"), list) or len(payload["v"]) != 2:
+            raise ValueError
+        return payload
+    except Exception:
+        raise CursorError("El cursor no es válido")
+
+
+def parse_order(model, order: str = None, default: str = "-created_at"):
+    """
+    Convierte el parámetro `order` (ej: +name, -created_at) en (campo, descendente).
+    Solo se aceptan columnas propias del modelo para que el keyset use índices.
+    """
+    order = (order or default).strip()
+    descending = order.startswith("-")
+    field_name = order.lstrip("+-")
+    try:
+        field = model._meta.get_field(field_name)
+    except FieldDoesNotExist:
+        raise CursorError(f"No se pudo ordenar por '{order}'")
+    if not getattr(field, "concrete", False) or field.is_relation:
+        raise CursorError(f"No se pudo ordenar por '{order}'")
+    return field.attname, descending
+
+
+def _seek_filter(field_name: str, descending: bool, last_value, last_id, nullable: bool = True) -> Q:
+    """
+    Filtro "después de" para el orden (campo, id) con NULLs al final,
+    equivalente a comparar la tupla (campo, id) contra la última fila vista.
+
+    Si el campo no admite NULL no se agrega la rama `isnull`: además de
+    sobrar, un OR con ella impide que Postgres descarte particiones al
+    ordenar por la columna de partición (created_at).
+    """
+    cmp = "lt" if descending else "gt"
+    id_after = Q(**{f"id__{cmp}": last_id})
+    if last_value is None:
+        return Q(**{f"{field_name}__isnull": True}) & id_after
+    after = Q(**{f"{field_name}__{cmp}": last_value}) | (Q(**{field_name: last_value}) & id_after)
+    if nullable:
+        after |= Q(**{f"{field_name}__isnull": True})
+    return after
+
+
+def cursor_paginate(queryset, request, default_order: str = "-created_at"):
+    """
+    Paginación por keyset sobre (order, id). Cada página cuesta lo mismo sin
+    importar la profundidad porque se busca desde la última fila vista en lugar
+    de descartar `offset` filas.
+
+    Retorna (filas_de_la_pagina, siguiente_cursor | None).
+    """
+    params = request.query_params
+    token = params.get("cursor")
+    order = params.get("order") or default_order
+
+    try:
+        limit = int(params.get("limit", DEFAULT_CURSOR_LIMIT))
+    except ValueError:
+        raise CursorError("El valor de limit debe ser entero")
+    limit = max(1, min(limit, MAX_CURSOR_LIMIT))
+
+    model = queryset.model
+    field_name, descending = parse_order(model, order, default_order)
+
+    if descending:
+        ordering = [F(field_name).desc(nulls_last=True), F("id").desc()]
+    else:
+        ordering = [F(field_name).asc(nulls_last=True), F("id").asc()]
+    queryset = queryset.order_by(*ordering)
+
+    if token:
+        payload = decode_cursor(token)
+        if payload.get("o") != order:
+            raise CursorError("El cursor no corresponde al orden solicitado")
+        last_value, last_id = payload["v"]
+        nullable = model._meta.get_field(field_name).null
+        queryset = queryset.filter(_seek_filter(field_name, descending, last_value, last_id, nullable))
+
+    rows = list(queryset[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(order, [getattr(last, field_name), last.pk])
+
+    return rows, next_cursor
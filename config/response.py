@@ -6,7 +6,10 @@ def response(
     message: str | list,
     data: any = None,
     error: str = None,
-    count_data: int = None
+    count_data: int = None,
+    next_cursor: str = None,
+    count_estimated: bool = False,
+    etag: str = None
 ) -> Response:
     response = {
         "statusCode": status_code,
@@ -19,8 +22,13 @@ def response(
         response["data"] = data
     if count_data is not None:
         response["countData"] = count_data
+        if count_estimated:
+            response["countEstimated"] = True
+    if next_cursor is not None:
+        response["nextCursor"] = next_cursor
 
-    return Response(response, status=status_code)
+    headers = {"ETag": etag} if etag else None
+    return Response(response, status=status_code, headers=headers)
 
 class StandardResponseSerializerSuccess (serializers.Serializer):
     statusCode = serializers.IntegerField()
@@ -36,4 +44,6 @@ class StandardResponseSerializerSuccessList (serializers.Serializer):
     statusCode = serializers.IntegerField()
     message = serializers.CharField()    
     data = serializers.JSONField(required=False)
-    countData = serializers.IntegerField()
\ No newline at end of file
+    countData = serializers.IntegerField(required=False)
+    countEstimated = serializers.BooleanField(required=False)
+    nextCursor = serializers.CharField(required=False)
\ No newline at end of file
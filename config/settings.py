@@ -39,6 +39,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework.authtoken',
     'corsheaders',
@@ -50,6 +51,12 @@ INSTALLED_APPS = [
     'delivery',
     'payment',
     'order',
+    'sync',
+    'numbering',
+    'analytics',
+    'partitioning',
+    'jobs',
+    'live',
 ]
 
 REST_FRAMEWORK = {
@@ -59,6 +66,40 @@ REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
 
+# Conteo total de los listados (config.counting)
+LIST_COUNT_CACHE_TTL = 30  # segundos
+LIST_COUNT_ESTIMATE_THRESHOLD = 100_000  # filas; por encima se usa la estimación del planner
+
+# Caché del catálogo (inventory.catalog_cache). Por defecto memoria local de
+# cada worker; para compartirla entre workers usar un backend compartido, ej:
+#   'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': '/var/tmp/spos_cache'
+#   'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://127.0.0.1:6379'
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'catalog': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'catalog',
+    },
+}
+CATALOG_CACHE_ALIAS = 'catalog'
+CATALOG_CACHE_TTL = 60  # segundos; acota lo desactualizado que puede estar otro worker con memoria local
+
+# Delta-sync de terminales POS (/api/sync/)
+SYNC_OVERLAP_SECONDS = 5
+
+# Índice en memoria para /api/products/autocomplete/ (inventory.autocomplete)
+AUTOCOMPLETE_REBUILD_SECONDS = 600
+
+# Eventos en vivo de pedidos y pagos (/api/events/, requiere ASGI: ver entrypoint.sh)
+LIVE_EVENTS_CHANNEL = 'spos_events'  # canal de LISTEN/NOTIFY compartido por todos los workers
+LIVE_EVENTS_KEEPALIVE = 15  # segundos entre comentarios keep-alive del stream
+LIVE_EVENTS_TICKET_SECONDS = 30  # validez del ticket de /api/events/ticket/
+
+# Tablero de despacho (/api/orders/board/, order.board)
+ORDER_BOARD_CACHE_SECONDS = 5
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=8),  # ⏰ Token válido por 8 horas
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
@@ -102,12 +143,15 @@ TEMPLATES = [
     },
 ]
 
+# Solo lo usa runserver: en producción se sirve config.asgi (ver entrypoint.sh)
 WSGI_APPLICATION = 'config.wsgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Requiere PostgreSQL 15 o superior (NULLS NOT DISTINCT en los rollups de
+# analítica; `migrate` lo verifica, ver analytics/checks.py)
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
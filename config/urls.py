@@ -23,6 +23,9 @@ from sale.views import SaleViewSet, CashRegisterViewSet
 from inventory.views import CategoryViewSet, DiscountViewSet, ProductViewSet, PurchaseViewSet, RecommendationAdminView
 from rest_framework.routers import DefaultRouter
 from seed.views import SeedView
+from sync.views import SyncView
+from analytics.views import SalesAnalyticsView
+from live.views import events_stream, EventTicketView
 
 def redirect_to_docs(request):
     return redirect('/api/docs/')
@@ -49,6 +52,10 @@ urlpatterns = [
     path('api/auth/check-token/', CheckTokenView.as_view(), name='check_token'),           
     path('api/', include(router.urls)),    
     path('api/seed/', SeedView.as_view(), name='seed'),
+    path('api/sync/', SyncView.as_view(), name='sync'),
+    path('api/analytics/sales/', SalesAnalyticsView.as_view(), name='sales-analytics'),
+    path('api/events/', events_stream, name='events'),
+    path('api/events/ticket/', EventTicketView.as_view(), name='events-ticket'),
     path('api/delivery/', include('delivery.urls')),
     path('api/orders/', include('order.urls')),
     path('api/payments/', include('payment.urls')),
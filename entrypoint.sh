@@ -12,5 +12,6 @@ python manage.py migrate --noinput
 echo "🧹 Recolectando archivos estáticos..."
 python manage.py collectstatic --noinput
 
-echo "🚀 Iniciando Gunicorn..."
-gunicorn config.wsgi:application --bind 0.0.0.0:$PORT
+echo "🚀 Iniciando Gunicorn (ASGI)..."
+# Workers ASGI: /api/events/ mantiene conexiones abiertas sin ocupar un worker
+gunicorn config.asgi:application -k uvicorn.workers.UvicornWorker --bind 0.0.0.0:$PORT
@@ -0,0 +1,165 @@
+import heapq
+import logging
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Sum
+
+logger = logging.getLogger(__name__)
+
+# Cada worker reconstruye su índice completo cada cierto tiempo para recoger
+# cambios hechos por otros procesos y actualizar la popularidad por ventas.
+REBUILD_SECONDS = getattr(settings, 'AUTOCOMPLETE_REBUILD_SECONDS', 600)
+
+
+def normalize(text: str) -> str:
+    """Minúsculas y sin tildes: 'Pingüino Café' -> 'pinguino cafe'."""
+    text = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in text if not unicodedata.combining(c)).lower().strip()
+
+
+def _word_suffixes(name: str):
+    """Claves de búsqueda: el nombre desde el inicio de cada palabra."""
+    words = name.split()
+    return {' '.join(words[i:]) for i in range(len(words))}
+
+
+class ProductPrefixIndex:
+    """
+    Índice de prefijos en memoria sobre los nombres de productos activos.
+
+    Se guarda un arreglo ordenado de (clave, product_id) y se resuelve cada
+    prefijo con bisect; los candidatos se ordenan por popularidad (unidades
+    vendidas). Las consultas no tocan la base de datos: solo la primera del
+    proceso espera la construcción, y cuando el índice vence se reconstruye en
+    un hilo aparte mientras se sigue respondiendo con el anterior.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()  # una sola reconstrucción a la vez por proceso
+        self._keys = []        # [(clave normalizada, product_id)] ordenado
+        self._products = {}    # product_id -> {'id', 'name', 'sale_price', 'popularity', 'keys'}
+        self._built_at = None
+
+    def _load(self):
+        from analytics.models import SalesDaily
+        from inventory.models import Product
+
+        # Unidades vendidas desde los rollups diarios, no sumando el historial de detalles de venta
+        popularity = dict(
+            SalesDaily.objects.filter(product__isnull=False)
+            .values('product_id').annotate(units=Sum('units')).values_list('product_id', 'units')
+        )
+        rows = Product.objects.filter(is_active=True).values_list('id', 'name', 'sale_price')
+        products, keys = {}, []
+        for pk, name, sale_price in rows:
+            entry = self._entry(pk, name, sale_price, popularity.get(pk, 0))
+            products[str(pk)] = entry
+            keys.extend((key, str(pk)) for key in entry['keys'])
+        keys.sort()
+        return products, keys
+
+    @staticmethod
+    def _entry(pk, name, sale_price, popularity):
+        normalized = normalize(name)
+        return {
+            'id': str(pk),
+            'name': name,
+            'normalized': normalized,
+            'sale_price': str(sale_price),
+            'popularity': int(popularity or 0),
+            'keys': _word_suffixes(normalized),
+        }
+
+    def _swap(self):
+        products, keys = self._load()
+        with self._lock:
+            self._products, self._keys = products, keys
+            self._built_at = time.monotonic()
+
+    def rebuild(self):
+        with self._build_lock:
+            self._swap()
+
+    def _refresh(self):
+        # Corre en su propio hilo con _build_lock ya tomado por _ensure_built
+        try:
+            self._swap()
+        except Exception:
+            logger.exception("No se pudo reconstruir el índice de autocompletado")
+        finally:
+            connection.close()
+            self._build_lock.release()
+
+    def _ensure_built(self):
+        if self._built_at is None:
+            # Primera consulta del proceso: un solo hilo construye, los demás esperan
+            with self._build_lock:
+                if self._built_at is None:
+                    self._swap()
+            return
+        if time.monotonic() - self._built_at > REBUILD_SECONDS and self._build_lock.acquire(blocking=False):
+            threading.Thread(target=self._refresh, daemon=True).start()
+
+    def _remove_keys(self, product_id):
+        entry = self._products.pop(product_id, None)
+        if not entry:
+            return None
+        for key in entry['keys']:
+            i = bisect_left(self._keys, (key, product_id))
+            if i < len(self._keys) and self._keys[i] == (key, product_id):
+                del self._keys[i]
+        return entry
+
+    def upsert(self, product):
+        """Actualización incremental al guardar un producto."""
+        if self._built_at is None:
+            return
+        product_id = str(product.pk)
+        with self._lock:
+            previous = self._remove_keys(product_id)
+            if not product.is_active:
+                return
+            popularity = previous['popularity'] if previous else 0
+            entry = self._entry(product.pk, product.name, product.sale_price, popularity)
+            self._products[product_id] = entry
+            for key in entry['keys']:
+                insort(self._keys, (key, product_id))
+
+    def remove(self, product_id):
+        if self._built_at is None:
+            return
+        with self._lock:
+            self._remove_keys(str(product_id))
+
+    def search(self, prefix: str, limit: int = 10):
+        self._ensure_built()
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+
+        with self._lock:
+            matches = set()
+            i = bisect_left(self._keys, (prefix, ''))
+            while i < len(self._keys) and self._keys[i][0].startswith(prefix):
+                matches.add(self._keys[i][1])
+                i += 1
+            entries = [self._products[pk] for pk in matches]
+
+        # Primero los que empiezan con el texto, luego los más vendidos
+        best = heapq.nsmallest(
+            limit, entries,
+            key=lambda e: (not e['normalized'].startswith(prefix), -e['popularity'], e['normalized'])
+        )
+        return [
+            {'id': e['id'], 'name': e['name'], 'sale_price': e['sale_price']}
+            for e in best
+        ]
+
+
+product_index = ProductPrefixIndex()
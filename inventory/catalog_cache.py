@@ -0,0 +1,161 @@
+import hashlib
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.response import Response
+
+from config.conditional import etag_matches, not_modified
+
+CACHE_ALIAS = getattr(settings, 'CATALOG_CACHE_ALIAS', 'default')
+CACHE_TTL = getattr(settings, 'CATALOG_CACHE_TTL', 60)
+LOCK_TTL = 10          # segundos que un worker puede tardar en recalcular una entrada
+LOCK_WAIT = 2.0        # espera máxima de los demás antes de calcular por su cuenta
+VERSION_KEY = 'catalog:version'
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+_local_locks = {}
+_local_locks_guard = threading.Lock()
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def stats() -> dict:
+    with _stats_lock:
+        hits, misses = _stats['hits'], _stats['misses']
+        return {
+            'version': get_version(),
+            'hits': hits,
+            'misses': misses,
+            'waits': _stats['waits'],
+            'hit_ratio': round(hits / (hits + misses), 4) if hits + misses else None,
+        }
+
+
+def get_version() -> int:
+    cache = _cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # add() evita que dos workers inicialicen la versión al mismo tiempo
+        cache.add(VERSION_KEY, 1, timeout=None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+def bump_version():
+    """Invalida todo el catálogo cacheado: las claves viejas quedan huérfanas y expiran solas."""
+    cache = _cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, 2, timeout=None)
+
+
+def _key(namespace: str, request, version: int) -> str:
+    params = urlencode(sorted(request.query_params.lists()), doseq=True)
+    digest = hashlib.md5(f"{request.path}?{params}".encode()).hexdigest()
+    return f"catalog:{version}:{namespace}:{digest}"
+
+
+def _with_live(entry, live):
+    """
+    Superpone sobre una copia de la respuesta cacheada los campos que cambian
+    demasiado seguido para cachearlos (ej: el stock, que se mueve en cada
+    venta). `live(ids)` retorna {id: {campo: valor}} de las filas de `data`.
+    El ETag se deriva del cacheado y de esos valores.
+    """
+    payload = entry['data']
+    data = payload.get('data')
+    rows = data if isinstance(data, list) else [data] if isinstance(data, dict) else []
+    current = live([row['id'] for row in rows if 'id' in row])
+    if not current:
+        return entry
+
+    patched = [{**row, **current.get(str(row.get('id')), {})} for row in rows]
+    payload = {**payload, 'data': patched if isinstance(data, list) else patched[0]}
+    etag = entry.get('etag')
+    if etag:
+        raw = etag + ''.join(f"|{pk}:{sorted(values.items())}" for pk, values in sorted(current.items()))
+        etag = f'W/"{hashlib.md5(raw.encode()).hexdigest()}"'
+    return {'data': payload, 'etag': etag}
+
+
+def _respond(request, entry):
+    etag = entry.get('etag')
+    if etag and etag_matches(request, etag):
+        return not_modified(etag)
+    return Response(entry['data'], status=200, headers={'ETag': etag} if etag else None)
+
+
+def _cached(request, entry, live):
+    _count('hits')
+    return _respond(request, _with_live(entry, live) if live else entry)
+
+
+def _local_lock(key):
+    with _local_locks_guard:
+        if len(_local_locks) > 1024:
+            _local_locks.clear()
+        return _local_locks.setdefault(key, threading.Lock())
+
+
+def cached_response(request, namespace: str, build, live=None):
+    """
+    Cache-aside para lecturas del catálogo (productos, categorías, descuentos).
+
+    La clave incluye el número de versión del catálogo, que los signals de
+    Product/Category/Discount incrementan en cada escritura. Solo un hilo por
+    proceso, y solo un proceso si el backend es compartido, recalcula una
+    entrada faltante; los demás esperan el resultado.
+
+    Los movimientos de stock no cambian la versión: con `live` (ver
+    inventory.stock.live_stock) el stock se lee aparte en cada respuesta.
+    """
+    cache = _cache()
+    key = _key(namespace, request, get_version())
+
+    cached = cache.get(key)
+    if cached is not None:
+        return _cached(request, cached, live)
+
+    with _local_lock(key):
+        cached = cache.get(key)
+        if cached is not None:
+            return _cached(request, cached, live)
+
+        lock_key = f"{key}:lock"
+        locked = cache.add(lock_key, 1, timeout=LOCK_TTL)
+        if not locked:
+            # Otro worker ya lo está calculando: esperar un momento su resultado
+            _count('waits')
+            deadline = time.monotonic() + LOCK_WAIT
+            while time.monotonic() < deadline:
+                time.sleep(0.05)
+                cached = cache.get(key)
+                if cached is not None:
+                    return _cached(request, cached, live)
+
+        _count('misses')
+        try:
+            result = build()
+            if result.status_code == 200:
+                entry = {'data': result.data, 'etag': result.get('ETag')}
+                cache.set(key, entry, CACHE_TTL)
+                if live:
+                    # Mismo ETag que tendrán los aciertos siguientes
+                    return _respond(request, _with_live(entry, live))
+            return result
+        finally:
+            if locked:
+                cache.delete(lock_key)
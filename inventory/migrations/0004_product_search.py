@@ -0,0 +1,73 @@
+# Generated by Django 5.2 on 2026-10-17 17:32
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+PRODUCT_VECTOR_SQL = """
+CREATE OR REPLACE FUNCTION inventory_product_search_vector() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('spanish', coalesce(NEW.name, '')), 'A') ||
+        setweight(to_tsvector('spanish', coalesce(NEW.description, '')), 'B') ||
+        setweight(to_tsvector('spanish', coalesce(
+            (SELECT c.name FROM inventory_category c WHERE c.id = NEW.category_id), ''
+        )), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER inventory_product_search_vector_trg
+    BEFORE INSERT OR UPDATE OF name, description, category_id ON inventory_product
+    FOR EACH ROW EXECUTE FUNCTION inventory_product_search_vector();
+
+-- Renombrar una categoría recalcula el vector de sus productos
+CREATE OR REPLACE FUNCTION inventory_category_search_vector() RETURNS trigger AS $$
+BEGIN
+    UPDATE inventory_product SET category_id = category_id WHERE category_id = NEW.id;
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER inventory_category_search_vector_trg
+    AFTER UPDATE OF name ON inventory_category
+    FOR EACH ROW WHEN (OLD.name IS DISTINCT FROM NEW.name)
+    EXECUTE FUNCTION inventory_category_search_vector();
+
+-- Poblar los productos existentes
+UPDATE inventory_product SET name = name;
+"""
+
+PRODUCT_VECTOR_REVERSE_SQL = """
+DROP TRIGGER IF EXISTS inventory_category_search_vector_trg ON inventory_category;
+DROP FUNCTION IF EXISTS inventory_category_search_vector();
+DROP TRIGGER IF EXISTS inventory_product_search_vector_trg ON inventory_product;
+DROP FUNCTION IF EXISTS inventory_product_search_vector();
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0003_product_inventory_p_created_068761_idx_and_more'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='product_search_vector_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='product_name_trgm_gin', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.RunSQL(PRODUCT_VECTOR_SQL, PRODUCT_VECTOR_REVERSE_SQL),
+    ]
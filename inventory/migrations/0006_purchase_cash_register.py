@@ -0,0 +1,20 @@
+# Generated by Django 5.2 on 2026-10-17 17:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('inventory', '0005_updated_at_indexes'),
+        ('sale', '0005_cashregister_discrepancy'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchase',
+            name='cash_register',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='purchases', to='sale.cashregister'),
+        ),
+    ]
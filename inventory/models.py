@@ -1,10 +1,18 @@
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from config.models import BaseModel
 
 class Category(BaseModel):
     name = models.CharField(max_length=100)
     description = models.TextField(blank=True)
 
+    class Meta:
+        indexes = [
+            # Delta-sync de terminales (/api/sync/)
+            models.Index(fields=['updated_at']),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -14,6 +22,12 @@ class Discount(BaseModel):
     is_active = models.BooleanField(default=True)
     expiration_date = models.DateField()
 
+    class Meta:
+        indexes = [
+            # Delta-sync de terminales (/api/sync/)
+            models.Index(fields=['updated_at']),
+        ]
+
     def __str__(self):
         return f"{self.name} - {self.percentage}%"
 
@@ -30,6 +44,20 @@ class Product(BaseModel):
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='products')
     discount = models.OneToOneField(Discount, on_delete=models.SET_NULL, null=True, blank=True, related_name='product')
 
+    # Mantenido por triggers en la base de datos (nombre + descripción + categoría)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Soporta la paginación por cursor sobre (created_at, id)
+            models.Index(fields=['created_at', 'id']),
+            # Delta-sync de terminales (/api/sync/)
+            models.Index(fields=['updated_at']),
+            GinIndex(fields=['search_vector'], name='product_search_vector_gin'),
+            # Búsqueda por similitud y por fragmentos (ILIKE '%...%') del nombre
+            GinIndex(fields=['name'], name='product_name_trgm_gin', opclasses=['gin_trgm_ops']),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -37,6 +65,14 @@ class Purchase(BaseModel):
     reason = models.TextField()
     total_amount = models.DecimalField(max_digits=12, decimal_places=2)
     code = models.CharField(max_length=20, unique=True)
+    # Caja abierta del usuario que registró la compra (si tenía una)
+    cash_register = models.ForeignKey('sale.CashRegister', on_delete=models.SET_NULL, related_name='purchases', null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Soporta la paginación por cursor sobre (created_at, id)
+            models.Index(fields=['created_at', 'id']),
+        ]
 
     # user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='purchases', role='administrator')
     def __str__(self):
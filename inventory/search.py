@@ -0,0 +1,34 @@
+from django.db import connections
+from django.db.models import F, Q, Value as V
+from django.db.models.functions import Coalesce
+
+SEARCH_CONFIG = 'spanish'
+
+
+def search_products(queryset, term: str):
+    """
+    Búsqueda de productos para el parámetro `search`.
+
+    En PostgreSQL combina el texto completo (search_vector, índice GIN) con la
+    similitud por trigramas del nombre, que tolera errores de tipeo y códigos
+    parciales. Todas las condiciones usan índices GIN y el resultado queda
+    anotado con `search_rank` para ordenarlo por relevancia.
+    """
+    term = term.strip()
+    if not term:
+        return queryset
+
+    if connections[queryset.db].vendor != 'postgresql':
+        return queryset.filter(Q(name__icontains=term) | Q(description__icontains=term))
+
+    from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+
+    query = SearchQuery(term, config=SEARCH_CONFIG, search_type='websearch')
+    return queryset.filter(
+        Q(search_vector=query)
+        | Q(name__trigram_similar=term)
+        | Q(name__icontains=term)
+    ).annotate(
+        search_rank=Coalesce(SearchRank(F('search_vector'), query), V(0.0))
+        + TrigramSimilarity('name', term)
+    )
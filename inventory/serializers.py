@@ -39,7 +39,7 @@ class ProductSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Product
-        fields = '__all__'
+        exclude = ['search_vector']
 
     def validate_name(self, value):
         if not value.strip():
@@ -87,6 +87,23 @@ class PurchaseDetailSerializer(serializers.ModelSerializer):
         return data
 
 
+class PurchaseLineSerializer(serializers.Serializer):
+    """Línea de entrada de una compra; solo valida, no toca la base de datos."""
+    product = serializers.UUIDField()
+    quantity = serializers.IntegerField()
+    price = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+    def validate_quantity(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("La cantidad debe ser mayor que cero.")
+        return value
+
+    def validate_price(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("El precio debe ser mayor que cero.")
+        return value
+
+
 class PurchaseSerializer(serializers.ModelSerializer):
     details = PurchaseDetailSerializer(many=True, read_only=True)
 
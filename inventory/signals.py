@@ -0,0 +1,25 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from inventory.models import Product, Category, Discount
+from inventory.autocomplete import product_index
+from inventory import catalog_cache
+
+
+@receiver(post_save, sender=Product)
+def update_autocomplete_index(sender, instance, **kwargs):
+    transaction.on_commit(lambda: product_index.upsert(instance))
+
+
+@receiver(post_delete, sender=Product)
+def remove_from_autocomplete_index(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: product_index.remove(pk))
+
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Discount)
+def invalidate_catalog_cache(sender, **kwargs):
+    transaction.on_commit(catalog_cache.bump_version)
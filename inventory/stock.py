@@ -0,0 +1,113 @@
+from django.db.models import Case, When, F, Q, IntegerField, Value as V
+from django.utils import timezone
+from rest_framework import serializers
+
+from inventory.models import Product
+
+
+class InsufficientStock(Exception):
+    def __init__(self, product, requested):
+        self.product = product
+        self.requested = requested
+        super().__init__(f"Stock insuficiente para el producto: {product.name}")
+
+
+def _stock_update(quantities, sign):
+    return Case(
+        *[When(pk=pk, then=F('stock') + V(sign * qty, output_field=IntegerField())) for pk, qty in quantities.items()],
+        default=F('stock'),
+        output_field=Product._meta.get_field('stock'),
+    )
+
+
+def lock_products(product_ids):
+    """
+    Bloquea (SELECT ... FOR UPDATE) los productos indicados siempre en orden de
+    id, de modo que dos ventas con los mismos productos no se bloqueen entre sí
+    en orden cruzado (deadlock). Debe llamarse dentro de transaction.atomic().
+    """
+    products = (
+        Product.objects.select_for_update(of=('self',))
+        .select_related('discount')
+        .filter(pk__in=product_ids)
+        .order_by('pk')
+    )
+    return {product.pk: product for product in products}
+
+
+def decrement_stock(quantities: dict, products: dict = None) -> dict:
+    """
+    Descuenta stock de varios productos en un solo UPDATE.
+
+    `quantities` es {product_id: cantidad}. Los productos se bloquean en orden
+    de id, se valida el stock sobre las filas bloqueadas y el UPDATE lleva la
+    guarda `stock >= cantidad` por producto, así que nunca queda stock negativo
+    aunque haya ventas en paralelo. Si el llamador ya bloqueó los productos con
+    `lock_products`, puede pasarlos en `products` para no repetir la consulta.
+    Retorna {product_id: Product} con el stock ya descontado.
+    """
+    if not quantities:
+        return products or {}
+
+    if products is None:
+        products = lock_products(quantities.keys())
+    for pk, qty in quantities.items():
+        product = products.get(pk)
+        if product is None:
+            raise Product.DoesNotExist(f"Producto {pk} no encontrado")
+        if product.stock < qty:
+            raise InsufficientStock(product, qty)
+
+    guard = Q()
+    for pk, qty in quantities.items():
+        guard |= Q(pk=pk, stock__gte=qty)
+
+    updated = Product.objects.filter(guard).update(
+        stock=_stock_update(quantities, -1),
+        updated_at=timezone.now(),
+    )
+    if updated != len(quantities):
+        # No debería ocurrir con las filas bloqueadas; se aborta la transacción
+        raise InsufficientStock(next(iter(products.values())), 0)
+
+    for pk, qty in quantities.items():
+        products[pk].stock -= qty
+    return products
+
+
+def increment_stock(quantities: dict) -> dict:
+    """
+    Suma stock a varios productos (ej: una compra) en un solo UPDATE.
+
+    Bloquea los productos en el mismo orden que `decrement_stock` para no
+    cruzarse con ventas en curso. Los ids que no existan simplemente no
+    aparecen en el resultado; el llamador decide cómo reportarlos.
+    Retorna {product_id: Product} con el stock ya actualizado.
+    """
+    if not quantities:
+        return {}
+
+    products = lock_products(quantities.keys())
+    found = {pk: qty for pk, qty in quantities.items() if pk in products}
+    if found:
+        Product.objects.filter(pk__in=found.keys()).update(
+            stock=_stock_update(found, 1),
+            updated_at=timezone.now(),
+        )
+        for pk, qty in found.items():
+            products[pk].stock += qty
+    return products
+
+
+def live_stock(product_ids) -> dict:
+    """
+    Stock actual de los productos, que catalog_cache superpone a las
+    respuestas cacheadas en lugar de invalidar todo el catálogo en cada
+    venta o compra. Retorna {id: {'stock', 'updated_at'}}.
+    """
+    updated_at = serializers.DateTimeField()
+    rows = Product.objects.filter(pk__in=product_ids).values_list('pk', 'stock', 'updated_at')
+    return {
+        str(pk): {'stock': stock, 'updated_at': updated_at.to_representation(changed)}
+        for pk, stock, changed in rows
+    }
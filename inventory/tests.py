@@ -0,0 +1,76 @@
+import threading
+
+from django.db import connection
+from django.test import TransactionTestCase, skipUnlessDBFeature
+from rest_framework import serializers
+
+from inventory.models import Category, Product
+from sale.models import Sale, SaleDetail
+from sale.serializers import SaleSerializer
+from user.models import User
+
+
+@skipUnlessDBFeature('has_select_for_update')
+class ConcurrentStockTests(TransactionTestCase):
+    """Ventas en paralelo sobre las últimas unidades de un producto (inventory.stock)."""
+
+    THREADS = 20
+
+    def setUp(self):
+        category = Category.objects.create(name='Bebidas')
+        self.product = Product.objects.create(
+            name='Agua', purchase_price=1, sale_price=2, category=category, stock=10
+        )
+        self.customer = User.objects.create_user('1234567', 'cliente@test.com', 'Cliente', '7000000', 'customer', 'x')
+
+    def _sell_in_parallel(self, quantity):
+        barrier = threading.Barrier(self.THREADS)
+        results, lock = [], threading.Lock()
+
+        def sell():
+            data = {
+                'nit': '0',
+                'customer': str(self.customer.pk),
+                'details': [{'product': str(self.product.pk), 'quantity': quantity, 'price': '2.00'}],
+            }
+            try:
+                serializer = SaleSerializer(data=data)
+                serializer.is_valid(raise_exception=True)
+                barrier.wait()
+                serializer.save()
+                outcome = 'sold'
+            except serializers.ValidationError:
+                outcome = 'rejected'
+            except Exception as e:
+                outcome = repr(e)
+            finally:
+                connection.close()
+            with lock:
+                results.append(outcome)
+
+        threads = [threading.Thread(target=sell) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def _assert_sold(self, results, quantity, expected_sales):
+        self.assertEqual(sorted(set(results) - {'sold', 'rejected'}), [])
+        self.assertEqual(results.count('sold'), expected_sales)
+        self.product.refresh_from_db()
+        self.assertGreaterEqual(self.product.stock, 0)
+        self.assertEqual(self.product.stock, 10 - expected_sales * quantity)
+        self.assertEqual(Sale.objects.count(), expected_sales)
+        self.assertEqual(
+            sum(SaleDetail.objects.values_list('quantity', flat=True)), expected_sales * quantity
+        )
+
+    def test_parallel_sales_sell_exactly_the_available_units(self):
+        results = self._sell_in_parallel(quantity=1)
+        self._assert_sold(results, quantity=1, expected_sales=10)
+
+    def test_parallel_sales_never_oversell(self):
+        # 10 unidades, ventas de 3: solo caben 3 ventas y sobra 1 unidad
+        results = self._sell_in_parallel(quantity=3)
+        self._assert_sold(results, quantity=3, expected_sales=3)
@@ -1,6 +1,9 @@
+from collections import Counter
+
 from rest_framework import viewsets
 from django.db import transaction
-from django.db.models import Q, Case, When, IntegerField, Value as V
+from django.core.exceptions import ValidationError
+from django.utils import timezone
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from rest_framework.decorators import action
@@ -9,9 +12,25 @@ from rest_framework.permissions import AllowAny
 
 from inventory.models import Product, Category, Discount, Purchase, PurchaseDetail
 from user.recomendations import RecommendationEngine  # Import RecommendationEngine
-from inventory.serializers import ProductSerializer, CategorySerializer, DiscountSerializer, PurchaseSerializer
+from inventory.serializers import ProductSerializer, CategorySerializer, DiscountSerializer, PurchaseSerializer, PurchaseLineSerializer
+from inventory.stock import increment_stock, live_stock
+from numbering.allocator import allocate_one, PURCHASE
+from sale.models import CashRegister
+from inventory.search import search_products
+from inventory.autocomplete import product_index
+from inventory import catalog_cache
 from config.response import response, StandardResponseSerializerSuccessList, StandardResponseSerializerError, StandardResponseSerializerSuccess
-from user.permissions import IsAdminOrCustomerOrCashier
+from config.listing import ListQueryMixin, EXACT, PREFIX, CONTAINS
+from config.eager import eager_load
+from config.conditional import queryset_etag, etag_matches, not_modified
+from config.export import export_response, filter_date_range, ExportError
+from user.permissions import IsAdminOrCustomerOrCashier, IsAdministrator
+
+PURCHASE_EXPORT_FIELDS = ['code', 'created_at', 'reason', 'total_amount', 'cash_register']
+PURCHASE_LINE_EXPORT_FIELDS = [
+    'purchase__code', 'purchase__created_at', 'product', 'product__name',
+    'product__category__name', 'quantity', 'price', 'subtotal',
+]
 
 @extend_schema(
     tags=['Categorías'],
@@ -22,9 +41,12 @@ from user.permissions import IsAdminOrCustomerOrCashier
         404: StandardResponseSerializerError
     }
 )
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ListQueryMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    filter_fields = {'name': CONTAINS, 'description': CONTAINS}
+    order_fields = ('created_at', 'updated_at', 'name')
+    conditional_get = True
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAdminOrCustomerOrCashier]
 
@@ -39,6 +61,7 @@ class CategoryViewSet(viewsets.ModelViewSet):
     @extend_schema(
         parameters=[
             OpenApiParameter(name='limit', description='Cantidad de resultados', required=False, type=int),
+            OpenApiParameter(name='count', description='Calcular el total de resultados (true/false, por defecto true)', required=False, type=str),
             OpenApiParameter(name='offset', description='Inicio del listado', required=False, type=int),
             OpenApiParameter(name='order', description='Campo de ordenamiento (ej: +name, -email)', required=False, type=str),
             OpenApiParameter(name='attr', description='Campo para filtrar (ej: name, description)', required=False, type=str),
@@ -50,72 +73,12 @@ class CategoryViewSet(viewsets.ModelViewSet):
             500: StandardResponseSerializerError
         }
     )
-    def list(self, request, limit=None, offset=0, order=None, attr=None, value=None):
-        try:
-            # Query básica para obtener todas las categorías
-            queryset = Category.objects.all()
-            
-            # Filtrado por parámetros adicionales
-            if attr and value and hasattr(Category, attr):
-                # Filtrado usando "contains" o "starts with"
-                starts_with_filter = {f"{attr}__istartswith": value}
-                contains_filter = {f"{attr}__icontains": value}
-                queryset = queryset.filter(Q(**contains_filter))
-                
-                # Ordenar por relevancia si el valor empieza con el texto
-                queryset = queryset.annotate(
-                    relevance=Case(
-                        When(**starts_with_filter, then=V(0)),
-                        default=V(1),
-                        output_field=IntegerField()
-                    )
-                ).order_by('relevance')                
-            elif attr and not hasattr(Category, attr):
-                return response(
-                    400,
-                    f"El campo '{attr}' no es válido para filtrado"
-                )   
-            
-            # Ordenar resultados
-            order = request.query_params.get('order')
-            if order:
-                try:
-                    queryset = queryset.order_by(order)
-                except Exception:
-                    return response(
-                        400,
-                        f"No se pudo ordenar por '{order}'"
-                    )   
-                
-            # Paginación: limit y offset
-            limit = request.query_params.get('limit')
-            offset = request.query_params.get('offset', 0)
-            
-            if limit is not None:
-                try:
-                    limit = int(limit)
-                    offset = int(offset)
-                    queryset = queryset[offset:offset+limit]
-                except ValueError:
-                    return response(
-                        400,
-                        "Los valores de limit y offset deben ser enteros"
-                    )
-                
-            # Serializar datos
-            serializer = CategorySerializer(queryset, many=True)
-            return response(
-                200,
-                "Categorías encontradas",
-                data=serializer.data,
-                count_data=len(queryset)
-            )
-        except Exception as e:
-            return response(
-                500,
-                f"Error al obtener categorías: {str(e)}"
-            )
-        
+    def list(self, request, *args, **kwargs):
+        return catalog_cache.cached_response(
+            request, 'categories',
+            lambda: self.list_response(request, "Categorías encontradas", "Error al obtener categorías")
+        )
+
     def retrieve(self, request, pk=None):
         try:
             category = Category.objects.get(pk=pk)
@@ -140,9 +103,12 @@ class CategoryViewSet(viewsets.ModelViewSet):
         404: StandardResponseSerializerError
     }
 )
-class DiscountViewSet(viewsets.ModelViewSet):
+class DiscountViewSet(ListQueryMixin, viewsets.ModelViewSet):
     queryset = Discount.objects.all()
     serializer_class = DiscountSerializer
+    filter_fields = {'name': CONTAINS, 'percentage': EXACT, 'is_active': EXACT, 'expiration_date': EXACT}
+    order_fields = ('created_at', 'updated_at', 'name', 'percentage', 'expiration_date')
+    conditional_get = True
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAdminOrCustomerOrCashier]
 
@@ -157,6 +123,7 @@ class DiscountViewSet(viewsets.ModelViewSet):
     @extend_schema(
         parameters=[
             OpenApiParameter(name='limit', description='Cantidad de resultados', required=False, type=int),
+            OpenApiParameter(name='count', description='Calcular el total de resultados (true/false, por defecto true)', required=False, type=str),
             OpenApiParameter(name='offset', description='Inicio del listado', required=False, type=int),
             OpenApiParameter(name='order', description='Campo de ordenamiento (ej: +name, -email)', required=False, type=str),
             OpenApiParameter(name='attr', description='Campo para filtrar (ej: name, description)', required=False, type=str),
@@ -168,72 +135,9 @@ class DiscountViewSet(viewsets.ModelViewSet):
             500: StandardResponseSerializerError
         }
     )
-    def list(self, request, limit=None, offset=0, order=None, attr=None, value=None):
-        try:
-            # Query básica para obtener todas las descuentos
-            queryset = Discount.objects.all()
-            
-            # Filtrado por parámetros adicionales
-            if attr and value and hasattr(Discount, attr):
-                # Filtrado usando "contains" o "starts with"
-                starts_with_filter = {f"{attr}__istartswith": value}
-                contains_filter = {f"{attr}__icontains": value}
-                queryset = queryset.filter(Q(**contains_filter))
-                
-                # Ordenar por relevancia si el valor empieza con el texto
-                queryset = queryset.annotate(
-                    relevance=Case(
-                        When(**starts_with_filter, then=V(0)),
-                        default=V(1),
-                        output_field=IntegerField()
-                    )
-                ).order_by('relevance')                
-            elif attr and not hasattr(Discount, attr):
-                return response(
-                    400,
-                    f"El campo '{attr}' no es válido para filtrado"
-                )   
-            
-            # Ordenar resultados
-            order = request.query_params.get('order')
-            if order:
-                try:
-                    queryset = queryset.order_by(order)
-                except Exception:
-                    return response(
-                        400,
-                        f"No se pudo ordenar por '{order}'"
-                    )   
-                
-            # Paginación: limit y offset
-            limit = request.query_params.get('limit')
-            offset = request.query_params.get('offset', 0)
-            
-            if limit is not None:
-                try:
-                    limit = int(limit)
-                    offset = int(offset)
-                    queryset = queryset[offset:offset+limit]
-                except ValueError:
-                    return response(
-                        400,
-                        "Los valores de limit y offset deben ser enteros"
-                    )
-                
-            # Serializar datos
-            serializer = DiscountSerializer(queryset, many=True)
-            return response(
-                200,
-                "Descuentos encontrados",
-                data=serializer.data,
-                count_data=len(queryset)
-            )
-        except Exception as e:
-            return response(
-                500,
-                f"Error al obtener descuentos: {str(e)}"
-            )
-        
+    def list(self, request, *args, **kwargs):
+        return self.list_response(request, "Descuentos encontrados", "Error al obtener descuentos")
+
     def retrieve(self, request, pk=None):
         try:
             discount = Discount.objects.get(pk=pk)
@@ -257,9 +161,18 @@ class DiscountViewSet(viewsets.ModelViewSet):
         404: StandardResponseSerializerError
     }
 )
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(ListQueryMixin, viewsets.ModelViewSet):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
+    filter_fields = {
+        'name': CONTAINS,
+        'description': CONTAINS,
+        'is_active': EXACT,
+        'category': EXACT,
+        'discount': EXACT,
+    }
+    order_fields = ('created_at', 'updated_at', 'name', 'stock', 'sale_price', 'purchase_price')
+    conditional_get = True
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAdminOrCustomerOrCashier]
 
@@ -280,15 +193,35 @@ class ProductViewSet(viewsets.ModelViewSet):
             return response(200, "Producto actualizado", data=serializer.data)
         return response(400, "Errores de validación", error=serializer.errors)
     
+    def filter_list_queryset(self, request, queryset):
+        # Filtro por categoría
+        category_id = request.query_params.get('category')
+        if category_id:
+            queryset = queryset.filter(category__id=category_id)
+
+        # Búsqueda de texto completo por nombre, descripción y categoría
+        search = request.query_params.get('search')
+        if search:
+            queryset = search_products(queryset, search)
+
+        # Filtro por productos con descuento
+        has_discount = request.query_params.get('has_discount')
+        if has_discount and has_discount.lower() == 'true':
+            queryset = queryset.filter(discount__isnull=False)
+
+        return queryset
+
     @extend_schema(
         parameters=[
             OpenApiParameter(name='limit', description='Cantidad de resultados', required=False, type=int),
+            OpenApiParameter(name='count', description='Calcular el total de resultados (true/false, por defecto true)', required=False, type=str),
             OpenApiParameter(name='offset', description='Inicio del listado', required=False, type=int),
+            OpenApiParameter(name='cursor', description='Cursor opaco de la página siguiente (vacío para la primera página)', required=False, type=str),
             OpenApiParameter(name='order', description='Campo de ordenamiento (ej: +name, -email)', required=False, type=str),
             OpenApiParameter(name='attr', description='Campo para filtrar (ej: name, description)', required=False, type=str),
             OpenApiParameter(name='value', description='Valor del campo a filtrar', required=False, type=str),
             OpenApiParameter(name='category', description='ID de la categoría para filtrar productos', required=False, type=str),
-            OpenApiParameter(name='search', description='Buscar productos por nombre o descripción', required=False, type=str),
+            OpenApiParameter(name='search', description='Buscar productos por nombre, descripción o categoría (tolera errores de tipeo)', required=False, type=str),
             OpenApiParameter(name='has_discount', description='Filtrar productos con descuento (true/false)', required=False, type=str),
         ], 
         responses={
@@ -297,95 +230,29 @@ class ProductViewSet(viewsets.ModelViewSet):
             500: StandardResponseSerializerError
         }
     )
-    def list(self, request, limit=None, offset=0, order=None, attr=None, value=None):
-        try:
-            # Query básica para obtener todos los productos
-            queryset = Product.objects.all()
-            
-            # Filtro por categoría
-            category_id = request.query_params.get('category')
-            if category_id:
-                queryset = queryset.filter(category__id=category_id)
-            
-            # Filtro de búsqueda por nombre o descripción
-            search = request.query_params.get('search')
-            if search:
-                queryset = queryset.filter(
-                    Q(name__icontains=search) | Q(description__icontains=search)
-                )
-            
-            # Filtro por productos con descuento
-            has_discount = request.query_params.get('has_discount')
-            if has_discount and has_discount.lower() == 'true':
-                queryset = queryset.filter(discount__isnull=False)
-            
-            # Filtrado por parámetros adicionales
-            if attr and value and hasattr(Product, attr):
-                # Filtrado usando "contains" o "starts with"
-                starts_with_filter = {f"{attr}__istartswith": value}
-                contains_filter = {f"{attr}__icontains": value}
-                queryset = queryset.filter(Q(**contains_filter))
-                
-                # Ordenar por relevancia si el valor empieza con el texto
-                queryset = queryset.annotate(
-                    relevance=Case(
-                        When(**starts_with_filter, then=V(0)),
-                        default=V(1),
-                        output_field=IntegerField()
-                    )
-                ).order_by('relevance')                
-            elif attr and not hasattr(Product, attr):
-                return response(
-                    400,
-                    f"El campo '{attr}' no es válido para filtrado"
-                )   
-            
-            # Ordenar resultados
-            order = request.query_params.get('order')
-            if order:
-                try:                    
-                    queryset = queryset.order_by(order)
-                except Exception:
-                    return response(
-                        400,
-                        f"No se pudo ordenar por '{order}'"
-                    )   
-                
-            # Paginación: limit y offset
-            limit = request.query_params.get('limit')
-            offset = request.query_params.get('offset', 0)
-            
-            if limit is not None:
-                try:
-                    limit = int(limit)
-                    offset = int(offset)
-                    queryset = queryset[offset:offset+limit]
-                except ValueError:
-                    return response(
-                        400,
-                        "Los valores de limit y offset deben ser enteros"
-                    )
-                
-            # Serializar datos
-            serializer = ProductSerializer(queryset, many=True)
-            return response(
-                200,
-                "Productos encontrados",
-                data=serializer.data,
-                count_data=len(queryset)
-            )
-        except Exception as e:
-            return response(
-                500,
-                f"Error al obtener productos: {str(e)}"
-            )
-        
+    def list(self, request, *args, **kwargs):
+        return catalog_cache.cached_response(
+            request, 'products',
+            lambda: self.list_response(request, "Productos encontrados", "Error al obtener productos"),
+            live=live_stock
+        )
+
     def retrieve(self, request, pk=None):
+        return catalog_cache.cached_response(request, 'product', lambda: self._retrieve(request, pk), live=live_stock)
+
+    def _retrieve(self, request, pk):
         try:
-            product = Product.objects.get(pk=pk)
+            queryset = Product.objects.filter(pk=pk)
+            etag, rows = queryset_etag(queryset, ProductSerializer)
+            if not rows:
+                return response(404, "Producto no encontrado")
+            if etag_matches(request, etag):
+                return not_modified(etag)
+
+            product = eager_load(queryset, ProductSerializer).get()
             serializer = ProductSerializer(product)
-            return response(200, "Producto encontrado", data=serializer.data)
-        except Product.DoesNotExist:
+            return response(200, "Producto encontrado", data=serializer.data, etag=etag)
+        except (Product.DoesNotExist, ValidationError):
             return response(404, "Producto no encontrado")
         
     def destroy(self, request, *args, **kwargs):
@@ -394,7 +261,36 @@ class ProductViewSet(viewsets.ModelViewSet):
             return response(400, "El producto no puede ser eliminado porque tiene stock")
         product.delete()
         return response(200, "Producto eliminado correctamente")
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name='q', description='Texto escrito por el cajero (prefijo del nombre)', required=True, type=str),
+            OpenApiParameter(name='limit', description='Cantidad máxima de sugerencias (por defecto 10)', required=False, type=int),
+        ],
+        responses={
+            200: StandardResponseSerializerSuccess,
+            400: StandardResponseSerializerError
+        }
+    )
+    @action(detail=False, methods=['get'], url_path='autocomplete')
+    def autocomplete(self, request):
+        try:
+            limit = min(int(request.query_params.get('limit', 10)), 50)
+        except ValueError:
+            return response(400, "El valor de limit debe ser entero")
+
+        suggestions = product_index.search(request.query_params.get('q', ''), limit)
+        return response(200, "Sugerencias encontradas", data=suggestions)
     
+    @extend_schema(
+        responses={
+            200: StandardResponseSerializerSuccess
+        }
+    )
+    @action(detail=False, methods=['get'], url_path='cache_stats', permission_classes=[IsAdministrator])
+    def cache_stats(self, request):
+        return response(200, "Estadísticas de la caché del catálogo", data=catalog_cache.stats())
+
     @action(detail=True, methods=['get'])
     def recommendations(self, request, pk=None):
         # Obtener el producto actual
@@ -425,9 +321,11 @@ class RecommendationAdminView(APIView):
                 f"Error al generar recomendaciones: {str(e)}"
             )
 
-class PurchaseViewSet(viewsets.ModelViewSet):
+class PurchaseViewSet(ListQueryMixin, viewsets.ModelViewSet):
     queryset = Purchase.objects.all()
     serializer_class = PurchaseSerializer
+    filter_fields = {'code': PREFIX, 'reason': CONTAINS, 'total_amount': EXACT}
+    order_fields = ('created_at', 'code', 'total_amount')
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAdminOrCustomerOrCashier]
 
@@ -438,72 +336,111 @@ class PurchaseViewSet(viewsets.ModelViewSet):
     def destroy(self, request, *args, **kwargs):
         return response(405, "Las compras no se pueden eliminar")
 
+    @extend_schema(
+        description="Exporta las compras en streaming (CSV o NDJSON), sin cargarlas en memoria.",
+        parameters=[
+            OpenApiParameter(name='from', description='Primer día (YYYY-MM-DD)', required=False, type=str),
+            OpenApiParameter(name='to', description='Último día inclusive (YYYY-MM-DD)', required=False, type=str),
+            OpenApiParameter(name='output', description='Formato: csv o ndjson (por defecto csv)', required=False, type=str),
+            OpenApiParameter(name='gzip', description='Comprimir la descarga (true/false)', required=False, type=str),
+            OpenApiParameter(name='lines', description='Una fila por detalle en vez de una por compra (true/false)', required=False, type=str),
+        ],
+        responses={
+            200: None,
+            400: StandardResponseSerializerError,
+        }
+    )
+    @action(detail=False, methods=['get'], url_path='export', permission_classes=[IsAdministrator])
+    def export(self, request):
+        try:
+            if request.query_params.get('lines', 'false').lower() == 'true':
+                queryset = filter_date_range(PurchaseDetail.objects.all(), request, 'purchase__created_at')
+                queryset = queryset.order_by('purchase__created_at', 'purchase_id', 'id')
+                fields = PURCHASE_LINE_EXPORT_FIELDS
+            else:
+                queryset = filter_date_range(Purchase.objects.all(), request).order_by('created_at', 'id')
+                fields = PURCHASE_EXPORT_FIELDS
+            return export_response(request, queryset, fields, f"compras_{timezone.localdate():%Y%m%d}")
+        except ExportError as e:
+            return response(400, str(e))
+
     def create(self, request, *args, **kwargs):
-        # Iniciar una transacción
-        with transaction.atomic():
-            try:
-                data = request.data
-                reason = data.get('reason')
-                code = data.get('code')
-                details = data.get('details')
-
-                if not details:
-                    return response(400, "Detalles de la compra son requeridos")
-
-                # Crear la compra
-                purchase = Purchase.objects.create(
-                    reason=reason,
-                    code=code,
-                    total_amount=0  # Este campo se actualizará después
-                )
+        try:
+            data = request.data
+            details = data.get('details')
 
-                total_amount = 0
-                for detail in details:
-                    product_id = detail.get('product')
-                    quantity = detail.get('quantity')
-                    price = detail.get('price')
-
-                    if not product_id or not quantity or not price:
-                        return response(400, "Todos los campos de detalle son requeridos")
-
-                    # Obtener el producto y verificar el stock
-                    product = Product.objects.get(id=product_id)
-
-                    # Validación de stock
-                    if product.stock < quantity:
-                        return response(400, f"Stock insuficiente para el producto {product.name}")
-
-                    # Crear detalle de la compra
-                    subtotal = quantity * price
-                    PurchaseDetail.objects.create(
-                        product=product,
-                        purchase=purchase,
-                        quantity=quantity,
-                        price=price,
-                        subtotal=subtotal
-                    )
+            if not details:
+                return response(400, "Detalles de la compra son requeridos")
+
+            # Validar todas las líneas de una vez (sin consultas) y reportar los errores juntos
+            errors, valid_lines = [], []
+            for i, detail in enumerate(details):
+                line = PurchaseLineSerializer(data=detail)
+                if line.is_valid():
+                    valid_lines.append((i, line.validated_data))
+                    errors.append({})
+                else:
+                    errors.append(line.errors)
 
-                    # Actualizar el stock del producto
-                    product.stock += quantity  # Aumentamos el stock con la cantidad comprada
-                    product.save()
+            quantities = Counter()
+            for _, line in valid_lines:
+                quantities[line['product']] += line['quantity']
 
+            # Existencia de los productos sin bloquear nada: una compra inválida
+            # se rechaza antes de tomar locks que frenen a las ventas
+            existing = set(Product.objects.filter(pk__in=quantities.keys()).values_list('pk', flat=True))
+            for i, line in valid_lines:
+                if line['product'] not in existing:
+                    errors[i] = {'product': [f"Producto no encontrado: {line['product']}"]}
+            if any(errors):
+                return response(400, "Error en los detalles de la compra", error={'details': errors})
+
+            with transaction.atomic():
+                # Mismo orden que las ventas: primero los productos (una consulta los
+                # bloquea y un UPDATE suma el stock), después la caja
+                products = increment_stock(quantities)
+                if len(products) != len(quantities):
+                    # Algún producto se eliminó después de validar
+                    transaction.set_rollback(True)
+                    return response(400, "Algún producto de la compra ya no existe")
+
+                purchase_details = []
+                total_amount = 0
+                for _, line in valid_lines:
+                    subtotal = line['quantity'] * line['price']
+                    purchase_details.append(PurchaseDetail(
+                        product=products[line['product']],
+                        quantity=line['quantity'],
+                        price=line['price'],
+                        subtotal=subtotal
+                    ))
                     total_amount += subtotal
 
-                # Actualizar el monto total de la compra
-                purchase.total_amount = total_amount
-                purchase.save()
+                cash_register = CashRegister.objects.filter(user=request.user, closing=None).first()
+                if cash_register and not cash_register.record_purchase(total_amount):
+                    cash_register = None  # Se cerró mientras tanto: la compra queda sin caja
 
-                return response(201, "Compra creada exitosamente", data=PurchaseSerializer(purchase).data)
+                purchase = Purchase.objects.create(
+                    reason=data.get('reason'),
+                    code=data.get('code') or allocate_one(PURCHASE),
+                    total_amount=total_amount,
+                    cash_register=cash_register
+                )
+                for detail in purchase_details:
+                    detail.purchase = purchase
+                PurchaseDetail.objects.bulk_create(purchase_details)
 
-            except Exception as e:
-                # Si algo sale mal, revertir la transacción
-                transaction.rollback()
-                return response(500, f"Error al procesar la compra: {str(e)}")
+            return response(201, "Compra creada exitosamente", data=PurchaseSerializer(purchase).data)
+
+        except Exception as e:
+            return response(500, f"Error al procesar la compra: {str(e)}")
 
     @extend_schema(
         parameters=[
             OpenApiParameter(name='limit', description='Cantidad de resultados', required=False, type=int),
+            OpenApiParameter(name='count', description='Calcular el total de resultados (true/false, por defecto true)', required=False, type=str),
             OpenApiParameter(name='offset', description='Inicio del listado', required=False, type=int),
+            OpenApiParameter(name='cursor', description='Cursor opaco de la página siguiente (vacío para la primera página)', required=False, type=str),
             OpenApiParameter(name='order', description='Campo de ordenamiento (ej: +name, -email)', required=False, type=str),
             OpenApiParameter(name='attr', description='Campo para filtrar (ej: code, paid_amount)', required=False, type=str),
             OpenApiParameter(name='value', description='Valor del campo a filtrar', required=False, type=str),
@@ -514,75 +451,12 @@ class PurchaseViewSet(viewsets.ModelViewSet):
             500: StandardResponseSerializerError
         }
     )
-    def list(self, request, limit=None, offset=0, order=None, attr=None, value=None):
-        try:
-            # Query básica para obtener todas las compras
-            queryset = Purchase.objects.all()
-            
-            # Filtrado por parámetros adicionales
-            if attr and value and hasattr(Purchase, attr):
-                # Filtrado usando "contains" o "starts with"
-                starts_with_filter = {f"{attr}__istartswith": value}
-                contains_filter = {f"{attr}__icontains": value}
-                queryset = queryset.filter(Q(**contains_filter))
-                
-                # Ordenar por relevancia si el valor empieza con el texto
-                queryset = queryset.annotate(
-                    relevance=Case(
-                        When(**starts_with_filter, then=V(0)),
-                        default=V(1),
-                        output_field=IntegerField()
-                    )
-                ).order_by('relevance')                
-            elif attr and not hasattr(Purchase, attr):
-                return response(
-                    400,
-                    f"El campo '{attr}' no es válido para filtrado"
-                )   
-            
-            # Ordenar resultados
-            order = request.query_params.get('order')
-            if order:
-                try:
-                    queryset = queryset.order_by(order)
-                except Exception:
-                    return response(
-                        400,
-                        f"No se pudo ordenar por '{order}'"
-                    )   
-                
-            # Paginación: limit y offset
-            limit = request.query_params.get('limit')
-            offset = request.query_params.get('offset', 0)
-            
-            if limit is not None:
-                try:
-                    limit = int(limit)
-                    offset = int(offset)
-                    queryset = queryset[offset:offset+limit]
-                except ValueError:
-                    return response(
-                        400,
-                        "Los valores de limit y offset deben ser enteros"
-                    )
-                
-            # Serializar datos
-            serializer = PurchaseSerializer(queryset, many=True)
-            return response(
-                200,
-                "Compras encontradas",
-                data=serializer.data,
-                count_data=len(queryset)
-            )
-        except Exception as e:
-            return response(
-                500,
-                f"Error al obtener compras: {str(e)}"
-            )
-        
+    def list(self, request, *args, **kwargs):
+        return self.list_response(request, "Compras encontradas", "Error al obtener compras")
+
     def retrieve(self, request, pk=None):
         try:
-            purchase = Purchase.objects.get(pk=pk)
+            purchase = eager_load(Purchase.objects.all(), PurchaseSerializer).get(pk=pk)
             serializer = PurchaseSerializer(purchase)
             return response(200, "Compra encontrada", data=serializer.data)
         except Purchase.DoesNotExist:
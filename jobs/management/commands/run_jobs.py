@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from jobs.queue import run_next
+
+
+class Command(BaseCommand):
+    help = "Worker de la cola de tareas: ejecuta las tareas pendientes a medida que llegan."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Procesar las tareas pendientes y salir")
+        parser.add_argument('--sleep', type=float, default=1.0, help="Segundos de espera cuando la cola está vacía")
+
+    def handle(self, *args, **options):
+        processed = failed = 0
+        try:
+            while True:
+                close_old_connections()
+                job = run_next()
+                if job is None:
+                    if options['once']:
+                        break
+                    time.sleep(options['sleep'])
+                    continue
+                processed += 1
+                if job.status != 'done':
+                    failed += 1
+                    self.stderr.write(f"{job}: {job.last_error}")
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"{processed} tareas procesadas, {failed} con error"))
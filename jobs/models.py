@@ -0,0 +1,34 @@
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """Tarea pendiente de ejecutar por el worker (`manage.py run_jobs`)."""
+    STATUS_CHOICES = [
+        ('pending', 'Pendiente'),
+        ('done', 'Completado'),
+        ('failed', 'Fallido'),
+    ]
+
+    # Ruta de la función a ejecutar, ej: 'order.tasks.create_sale_from_order'
+    task = models.CharField(max_length=200)
+    payload = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = 'jobs'
+        indexes = [
+            # Solo las tareas pendientes: el índice no crece con el historial
+            models.Index(fields=['run_after', 'id'], condition=Q(status='pending'), name='jobs_pending_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.status})"
@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from jobs.models import Job
+
+RETRY_BASE_SECONDS = 10
+
+
+def enqueue(task: str, **payload) -> Job:
+    """
+    Encola `task` (ruta de una función) con `payload` como argumentos.
+
+    La tarea se inserta en la transacción del llamador: si esta hace rollback
+    la tarea desaparece con ella, y el worker no la ve hasta el commit.
+    """
+    return Job.objects.create(task=task, payload=payload)
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+
+
+def run_next():
+    """
+    Toma la siguiente tarea pendiente y la ejecuta. Retorna la tarea o None
+    si no había ninguna disponible.
+
+    La fila se toma con SELECT ... FOR UPDATE SKIP LOCKED, así que varios
+    workers pueden trabajar en paralelo sin tomar la misma tarea ni esperarse.
+    La función corre dentro de la misma transacción que marca la tarea como
+    completada: o se confirman ambas o ninguna, y si el worker muere a mitad
+    el bloqueo se libera y otro worker la reintenta.
+    """
+    with transaction.atomic():
+        job = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status='pending', run_after__lte=timezone.now())
+            .order_by('run_after', 'id')
+            .first()
+        )
+        if job is None:
+            return None
+
+        job.attempts += 1
+        try:
+            with transaction.atomic():
+                import_string(job.task)(**job.payload)
+        except Exception as e:
+            job.last_error = f"{type(e).__name__}: {e}"
+            if job.attempts >= job.max_attempts:
+                job.status = 'failed'
+                job.finished_at = timezone.now()
+            else:
+                job.run_after = timezone.now() + _retry_delay(job.attempts)
+        else:
+            job.status = 'done'
+            job.last_error = None
+            job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'attempts', 'run_after', 'last_error', 'finished_at'])
+        return job
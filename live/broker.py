@@ -0,0 +1,108 @@
+import asyncio
+import json
+import logging
+
+import psycopg
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = getattr(settings, 'LIVE_EVENTS_CHANNEL', 'spos_events')
+QUEUE_SIZE = 100
+RECONNECT_SECONDS = 3
+RESYNC = {'event': 'resync', 'data': {}}
+# Opciones de DATABASES que son de Django y no parámetros de conexión de psycopg
+_DJANGO_OPTIONS = ('isolation_level', 'server_side_binding', 'pool', 'assume_role')
+
+
+class Subscription:
+    def __init__(self, matches):
+        self.matches = matches
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+
+class Broker:
+    """
+    Reparte los eventos publicados (live.events.publish) entre las conexiones
+    SSE abiertas en este proceso.
+
+    Con Postgres, cada proceso mantiene una sola conexión con LISTEN al canal
+    de eventos, sin importar cuántos clientes tenga conectados; así un evento
+    publicado por cualquier worker (o por el worker de la cola) llega a todos.
+    """
+
+    def __init__(self):
+        self._subscriptions = set()
+        self._loop = None
+        self._listener = None
+
+    def subscribe(self, matches) -> Subscription:
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(matches)
+        self._subscriptions.add(subscription)
+        if connections['default'].vendor == 'postgresql' and (self._listener is None or self._listener.done()):
+            self._listener = self._loop.create_task(self._listen())
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self._subscriptions.discard(subscription)
+
+    def dispatch(self, message: str):
+        try:
+            event = json.loads(message)
+        except ValueError:
+            return
+        self._deliver(event, only_matching=True)
+
+    def dispatch_threadsafe(self, message: str):
+        # Desde código síncrono (otro hilo): entregar en el event loop de las suscripciones
+        if self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self.dispatch, message)
+
+    def _deliver(self, event, only_matching):
+        for subscription in list(self._subscriptions):
+            if only_matching and not subscription.matches(event):
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                # Cliente demasiado lento: se corta su stream (None) y al reconectar recibe el estado actual
+                self.unsubscribe(subscription)
+                while not subscription.queue.empty():
+                    subscription.queue.get_nowait()
+                subscription.queue.put_nowait(None)
+
+    @staticmethod
+    def _conninfo() -> str:
+        db = settings.DATABASES['default']
+        params = {
+            'dbname': db.get('NAME'),
+            'user': db.get('USER'),
+            'password': db.get('PASSWORD'),
+            'host': db.get('HOST'),
+            'port': db.get('PORT'),
+        }
+        params.update({k: v for k, v in db.get('OPTIONS', {}).items() if k not in _DJANGO_OPTIONS})
+        return psycopg.conninfo.make_conninfo(**{k: v for k, v in params.items() if v})
+
+    async def _listen(self):
+        connected_before = False
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(self._conninfo(), autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {CHANNEL}")
+                    if connected_before:
+                        # Se pudieron perder eventos mientras no había conexión
+                        self._deliver(RESYNC, only_matching=False)
+                    connected_before = True
+                    async for notify in conn.notifies():
+                        self.dispatch(notify.payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Conexión LISTEN de eventos perdida: %s", e)
+            await asyncio.sleep(RECONNECT_SECONDS)
+
+
+broker = Broker()
@@ -0,0 +1,55 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+
+from live.broker import broker, CHANNEL
+
+ORDER_STATUS = 'order.status'
+PAYMENT_COMPLETED = 'payment.completed'
+
+
+def publish(event: str, data: dict):
+    """
+    Publica un evento para los clientes conectados a /api/events/.
+
+    En Postgres se envía con NOTIFY, que se entrega recién al hacer commit de
+    la transacción actual (y nunca si hace rollback) a todos los workers que
+    escuchan el canal. Con otras bases de datos solo llega a los clientes de
+    este proceso.
+    """
+    message = json.dumps({'event': event, 'data': data}, cls=DjangoJSONEncoder)
+    if connection.vendor == 'postgresql':
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [CHANNEL, message])
+    else:
+        transaction.on_commit(lambda: broker.dispatch_threadsafe(message))
+
+
+def order_event(order, previous_status=None) -> dict:
+    return {
+        'order_id': str(order.pk),
+        'order_number': order.order_number,
+        'user_id': str(order.user_id),
+        'status': order.status,
+        'previous_status': previous_status,
+        'updated_at': order.updated_at,
+    }
+
+
+def payment_event(payment) -> dict:
+    return {
+        'payment_id': str(payment.pk),
+        'user_id': str(payment.user_id),
+        'status': payment.status,
+        'amount': payment.amount,
+        'completed_at': payment.completed_at,
+    }
+
+
+def order_status_changed(order, previous_status):
+    publish(ORDER_STATUS, order_event(order, previous_status))
+
+
+def payment_completed(payment):
+    publish(PAYMENT_COMPLETED, payment_event(payment))
@@ -0,0 +1,39 @@
+import secrets
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+
+TICKET_SALT = 'live.events.ticket'
+TICKET_SECONDS = getattr(settings, 'LIVE_EVENTS_TICKET_SECONDS', 30)
+USED_KEY = 'live-ticket-used:{}'
+
+
+class TicketError(Exception):
+    pass
+
+
+def issue_ticket(user) -> str:
+    """
+    Ticket firmado para abrir /api/events/ con ?ticket=. EventSource no puede
+    enviar la cabecera Authorization, y poner el JWT en la URL lo deja en los
+    logs de proxies y del navegador con toda su validez; el ticket solo sirve
+    para este stream, vence en TICKET_SECONDS y se acepta una sola vez.
+    """
+    return signing.dumps({'u': str(user.pk), 'n': secrets.token_urlsafe(12)}, salt=TICKET_SALT, compress=True)
+
+
+def redeem_ticket(ticket: str) -> str:
+    """Valida y consume el ticket; retorna el id del usuario."""
+    try:
+        payload = signing.loads(ticket, salt=TICKET_SALT, max_age=TICKET_SECONDS)
+    except signing.SignatureExpired:
+        raise TicketError("Ticket expirado")
+    except signing.BadSignature:
+        raise TicketError("Ticket inválido")
+    # add() solo guarda si la clave no existe: un segundo uso del mismo ticket falla.
+    # Con cache local por worker el uso único vale dentro del worker; el vencimiento
+    # corto acota la reutilización en otros.
+    if not cache.add(USED_KEY.format(payload['n']), True, timeout=TICKET_SECONDS):
+        raise TicketError("Ticket ya utilizado")
+    return payload['u']
@@ -0,0 +1,191 @@
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from drf_spectacular.utils import extend_schema
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from config.response import response, StandardResponseSerializerSuccess, StandardResponseSerializerError
+from live.broker import broker
+from live.events import ORDER_STATUS, PAYMENT_COMPLETED, order_event, payment_event
+from live.tickets import TICKET_SECONDS, TicketError, issue_ticket, redeem_ticket
+from order.models import Order
+from payment.models import PaymentTransaction
+from user.models import User
+
+KEEPALIVE_SECONDS = getattr(settings, 'LIVE_EVENTS_KEEPALIVE', 15)
+RETRY_MS = 3000
+
+
+class StreamError(Exception):
+    def __init__(self, status_code, message):
+        self.status_code = status_code
+        super().__init__(message)
+
+
+def _error(status_code, message):
+    return JsonResponse({'statusCode': status_code, 'message': message}, status=status_code)
+
+
+@extend_schema(
+    tags=['Eventos'],
+    request=None,
+    responses={
+        200: StandardResponseSerializerSuccess,
+        401: StandardResponseSerializerError
+    }
+)
+class EventTicketView(APIView):
+    """
+    POST /api/events/ticket/: ticket de un solo uso para abrir el stream con
+    EventSource (que no envía cabeceras): new EventSource(`/api/events/?ticket=${ticket}`).
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        return response(200, "Ticket generado", data={
+            'ticket': issue_ticket(request.user),
+            'expires_in': TICKET_SECONDS,
+        })
+
+
+def _authenticate(request):
+    # Cabecera Authorization (clientes que la pueden enviar) o ?ticket= de /api/events/ticket/;
+    # el JWT nunca se acepta en la URL
+    ticket = request.GET.get('ticket')
+    if ticket:
+        try:
+            user = User.objects.filter(pk=redeem_ticket(ticket)).first()
+        except TicketError as e:
+            raise StreamError(401, str(e))
+    else:
+        auth = JWTAuthentication()
+        header = auth.get_header(request)
+        raw = auth.get_raw_token(header) if header else None
+        if not raw:
+            raise StreamError(401, "Se requiere un token de acceso o un ticket")
+        try:
+            user = auth.get_user(auth.get_validated_token(raw))
+        except (InvalidToken, TokenError, AuthenticationFailed):
+            raise StreamError(401, "Token inválido o expirado")
+    if user is None or not user.is_active:
+        raise StreamError(401, "Usuario inactivo")
+    return user
+
+
+def _prepare(request):
+    """
+    Autentica y arma el filtro de eventos del cliente:
+
+    - ?order=<id>: solo ese pedido. ?payment=<id>: solo ese pago.
+    - Sin filtros, los clientes reciben los eventos de sus propios pedidos y
+      pagos, y los administradores (ej: pantalla de cocina) los de todos.
+
+    Retorna (matches, snapshot) donde snapshot() da el estado actual de lo
+    filtrado, que se envía al conectar y tras una reconexión del LISTEN.
+    """
+    user = _authenticate(request)
+    staff = user.is_staff or user.is_superuser
+    order_id = request.GET.get('order')
+    payment_id = request.GET.get('payment')
+
+    try:
+        if order_id and not Order.objects.filter(pk=order_id, **({} if staff else {'user': user})).exists():
+            raise StreamError(404, "Pedido no encontrado")
+        if payment_id and not PaymentTransaction.objects.filter(
+            pk=payment_id, **({} if staff else {'user': user})
+        ).exists():
+            raise StreamError(404, "Transacción no encontrada")
+    except (ValidationError, ValueError):
+        raise StreamError(400, "ID de pedido o de pago inválido")
+
+    user_id = str(user.pk)
+
+    def matches(event):
+        data = event.get('data', {})
+        if not staff and data.get('user_id') != user_id:
+            return False
+        if event.get('event') == ORDER_STATUS:
+            return not payment_id and (not order_id or data.get('order_id') == str(order_id))
+        if event.get('event') == PAYMENT_COMPLETED:
+            return not order_id and (not payment_id or data.get('payment_id') == str(payment_id))
+        return False
+
+    def snapshot():
+        events = []
+        if order_id:
+            order = Order.objects.get(pk=order_id)
+            events.append({'event': ORDER_STATUS, 'data': order_event(order)})
+        if payment_id:
+            payment = PaymentTransaction.objects.get(pk=payment_id)
+            if payment.status == 'completed':
+                events.append({'event': PAYMENT_COMPLETED, 'data': payment_event(payment)})
+        return events
+
+    return matches, snapshot
+
+
+def _format(event) -> str:
+    data = json.dumps(event['data'], cls=DjangoJSONEncoder, ensure_ascii=False)
+    return f"event: {event['event']}\ndata: {data}\n\n"
+
+
+async def events_stream(request):
+    """
+    GET /api/events/ (text/event-stream): empuja los cambios de estado de los
+    pedidos y los pagos completados a medida que ocurren, en lugar de que el
+    cliente consulte el pedido o el pago cada pocos segundos.
+
+    Cada cliente mantiene una conexión abierta sin costo mientras no haya
+    eventos. Requiere un servidor ASGI (ver config/asgi.py y entrypoint.sh).
+    Se autentica con ?ticket= (POST /api/events/ticket/) o la cabecera
+    Authorization.
+    """
+    if request.method != 'GET':
+        return _error(405, "Método no permitido")
+    if not isinstance(request, ASGIRequest):
+        # Bajo WSGI cada conexión abierta ocuparía un worker completo
+        return _error(503, "Los eventos en vivo solo están disponibles con el servidor ASGI")
+    try:
+        matches, snapshot = await sync_to_async(_prepare)(request)
+        initial = await sync_to_async(snapshot)()
+    except StreamError as e:
+        return _error(e.status_code, str(e))
+
+    async def stream():
+        subscription = broker.subscribe(matches)
+        try:
+            yield f"retry: {RETRY_MS}\n\n"
+            for event in initial:
+                yield _format(event)
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    # Comentario SSE: mantiene viva la conexión a través de proxies
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is None:
+                    break
+                if event['event'] == 'resync':
+                    for current in await sync_to_async(snapshot)():
+                        yield _format(current)
+                    continue
+                yield _format(event)
+        finally:
+            broker.unsubscribe(subscription)
+
+    stream_response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    stream_response['Cache-Control'] = 'no-cache'
+    stream_response['X-Accel-Buffering'] = 'no'  # nginx: no acumular la respuesta
+    return stream_response
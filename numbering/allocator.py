@@ -0,0 +1,53 @@
+from django.db import connection
+from django.utils import timezone
+
+from numbering.models import DocumentCounter
+
+# Series de documentos: (prefijo, una serie por día, dígitos)
+SALE = ('SALE', False, 10)
+ORDER = ('ORD', True, 5)
+PURCHASE = ('COMP', True, 5)
+
+_UPSERT = f"""
+    INSERT INTO {DocumentCounter._meta.db_table} (key, value, updated_at)
+    VALUES (%s, %s, %s)
+    ON CONFLICT (key) DO UPDATE
+        SET value = {DocumentCounter._meta.db_table}.value + EXCLUDED.value,
+            updated_at = EXCLUDED.updated_at
+    RETURNING value
+"""
+
+
+def _series_key(prefix: str, day=None) -> str:
+    return f"{prefix}:{day:%Y%m%d}" if day else prefix
+
+
+def next_values(prefix: str, count: int = 1, day=None) -> range:
+    """
+    Reserva `count` números consecutivos de una serie con un único
+    INSERT ... ON CONFLICT DO UPDATE ... RETURNING.
+
+    La fila del contador queda bloqueada hasta el fin de la transacción del
+    llamador: dos asignaciones concurrentes de la misma serie se ordenan solas
+    (sin reintentos) y un rollback devuelve los números, así que no quedan
+    huecos. Series distintas no se bloquean entre sí.
+    """
+    if count < 1:
+        raise ValueError("count debe ser mayor que cero")
+    with connection.cursor() as cursor:
+        cursor.execute(_UPSERT, [_series_key(prefix, day), count, timezone.now()])
+        last = cursor.fetchone()[0]
+    return range(last - count + 1, last + 1)
+
+
+def allocate(series, count: int = 1) -> list:
+    """Códigos formateados para una de las series definidas arriba (SALE, ORDER, PURCHASE)."""
+    prefix, daily, digits = series
+    if daily:
+        day = timezone.localdate()
+        return [f"{prefix}-{day:%Y%m%d}-{str(n).zfill(digits)}" for n in next_values(prefix, count, day)]
+    return [str(n).zfill(digits) for n in next_values(prefix, count)]
+
+
+def allocate_one(series) -> str:
+    return allocate(series, 1)[0]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2 on 2026-10-17 17:42
+
+from django.db import migrations, models
+from django.db.models import BigIntegerField, Max
+from django.db.models.functions import Cast
+
+
+def seed_sale_counter(apps, schema_editor):
+    # Continuar la numeración de ventas desde el último código numérico existente
+    Sale = apps.get_model('sale', 'Sale')
+    DocumentCounter = apps.get_model('numbering', 'DocumentCounter')
+    last = (
+        Sale.objects.filter(code__regex=r'^[0-9]+$')
+        .aggregate(last=Max(Cast('code', BigIntegerField())))['last']
+    )
+    if last:
+        DocumentCounter.objects.create(key='SALE', value=last)
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('sale', '0004_cashregister_sale_cashre_created_917134_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentCounter',
+            fields=[
+                ('key', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('value', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'numbering_counters',
+            },
+        ),
+        migrations.RunPython(seed_sale_counter, migrations.RunPython.noop),
+    ]
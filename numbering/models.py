@@ -0,0 +1,14 @@
+from django.db import models
+
+
+class DocumentCounter(models.Model):
+    """Último número asignado de una serie (ej: 'SALE' o 'ORD:20260115')."""
+    key = models.CharField(max_length=50, primary_key=True)
+    value = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'numbering_counters'
+
+    def __str__(self):
+        return f"{self.key}: {self.value}"
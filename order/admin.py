@@ -52,10 +52,14 @@ class OrderAdmin(admin.ModelAdmin):
     inlines = [OrderItemInline, OrderStatusHistoryInline]
     
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related(
+        return super().get_queryset(request).with_total_items().select_related(
             'user', 'delivery_address'
         ).prefetch_related('items', 'status_history')
 
+    @admin.display(description='Total de items')
+    def total_items(self, obj):
+        return getattr(obj, 'total_items', None)
+
 @admin.register(OrderItem)
 class OrderItemAdmin(admin.ModelAdmin):
     list_display = [
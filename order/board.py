@@ -0,0 +1,121 @@
+import json
+from datetime import datetime, time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.utils import timezone
+
+from order.models import Order
+from user.models import User
+
+BOARD_CACHE_SECONDS = getattr(settings, 'ORDER_BOARD_CACHE_SECONDS', 5)
+BOARD_KEY = 'orders-board:{}:{}'
+GENERATION_KEY = 'orders-board:generation'
+DEFAULT_TOP = 5
+MAX_TOP = 50
+PERCENTILES = (0.5, 0.9)
+
+STATUSES = [status for status, _ in Order.STATUS_CHOICES]
+# Estados en los que un pedido espera a alguien; los finales solo se cuentan desde hoy
+ACTIVE = [status for status in STATUSES if Order.TRANSITIONS[status]]
+FINAL = [status for status in STATUSES if not Order.TRANSITIONS[status]]
+
+
+def _board_sql() -> str:
+    """
+    Una fila con una columna por métrica y estado (agregación condicional con
+    FILTER): cantidad, y para los estados activos percentiles y máximo de la
+    antigüedad y los N pedidos más antiguos, numerados con row_number().
+    """
+    columns = []
+    for status in STATUSES:
+        columns.append(f"COUNT(*) FILTER (WHERE status = '{status}')")
+        if status in ACTIVE:
+            columns.append(
+                f"percentile_cont(ARRAY{list(PERCENTILES)}) WITHIN GROUP (ORDER BY age) "
+                f"FILTER (WHERE status = '{status}')"
+            )
+            columns.append(f"MAX(age) FILTER (WHERE status = '{status}')")
+            columns.append(
+                "COALESCE(jsonb_agg(jsonb_build_object("
+                "'id', id, 'order_number', order_number, 'customer', customer, "
+                "'total_amount', total_amount, 'created_at', created_at, 'age_seconds', age"
+                f") ORDER BY rank) FILTER (WHERE status = '{status}' AND rank <= %(top)s), '[]')"
+            )
+    return f"""
+        SELECT {', '.join(columns)}
+        FROM (
+            SELECT o.id, o.order_number, u.name AS customer, o.total_amount, o.created_at, o.status,
+                   EXTRACT(EPOCH FROM (%(now)s - o.created_at))::bigint AS age,
+                   row_number() OVER (PARTITION BY o.status ORDER BY o.created_at, o.id) AS rank
+            FROM {Order._meta.db_table} o
+            JOIN {User._meta.db_table} u ON u.id = o.user_id
+            WHERE o.status = ANY(%(active)s)
+               OR (o.status = ANY(%(final)s) AND o.created_at >= %(since)s)
+        ) board
+    """
+
+
+_BOARD_SQL = _board_sql()
+
+
+def build_board(top: int = DEFAULT_TOP) -> dict:
+    """Conteo por estado, antigüedad (segundos) y pedidos más antiguos de cada estado activo."""
+    now = timezone.now()
+    since = timezone.make_aware(datetime.combine(timezone.localdate(now), time.min))
+    with connection.cursor() as cursor:
+        cursor.execute(_BOARD_SQL, {'now': now, 'since': since, 'top': top, 'active': ACTIVE, 'final': FINAL})
+        values = iter(cursor.fetchone())
+
+    statuses = []
+    labels = dict(Order.STATUS_CHOICES)
+    for status in STATUSES:
+        entry = {'status': status, 'label': labels[status], 'count': next(values)}
+        if status in ACTIVE:
+            percentiles = next(values) or [None] * len(PERCENTILES)
+            entry['age_seconds'] = {
+                **{f'p{int(p * 100)}': value for p, value in zip(PERCENTILES, percentiles)},
+                'max': next(values),
+            }
+            # Django registra jsonb para que psycopg lo entregue como texto
+            entry['oldest'] = json.loads(next(values))
+        statuses.append(entry)
+
+    return {
+        'generated_at': now,
+        # Los estados finales cuentan solo los pedidos creados desde esta hora
+        'final_since': since,
+        'statuses': statuses,
+    }
+
+
+def _new_generation() -> int:
+    # Basada en la hora: si la cache pierde el contador, no se reutiliza una generación vieja
+    return int(timezone.now().timestamp() * 1000)
+
+
+def _generation() -> int:
+    return cache.get_or_set(GENERATION_KEY, _new_generation, timeout=None)
+
+
+def cached_board(top: int = DEFAULT_TOP) -> dict:
+    """
+    Tablero de despacho en cache por unos segundos. Cada cambio de estado
+    invalida la cache de este proceso; con cache local por worker, los demás
+    workers pueden mostrar datos de hasta BOARD_CACHE_SECONDS atrás.
+    """
+    key = BOARD_KEY.format(_generation(), top)
+    board = cache.get(key)
+    if board is None:
+        board = build_board(top)
+        cache.set(key, board, timeout=BOARD_CACHE_SECONDS)
+    return board
+
+
+def invalidate_board():
+    # Nueva generación: las claves anteriores dejan de leerse y expiran solas
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, _new_generation(), timeout=None)
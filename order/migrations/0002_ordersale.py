@@ -0,0 +1,26 @@
+# Generated by Django 5.2 on 2026-10-17 17:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('order', '0001_initial'),
+        ('sale', '0007_partition_prep'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderSale',
+            fields=[
+                ('order', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='sale_link', serialize=False, to='order.order')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sale', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='sale.sale')),
+            ],
+            options={
+                'db_table': 'order_sales',
+            },
+        ),
+    ]
@@ -1,8 +1,39 @@
 from django.db import models
 from django.db import transaction
+from django.db.models import F, IntegerField, OuterRef, Subquery, Sum, Value as V
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from user.models import User
 from inventory.models import Product
 from delivery.models import DeliveryAddress
+from numbering.allocator import allocate_one, ORDER, SALE
+from live.events import order_status_changed
+
+
+class InvalidTransition(ValueError):
+    def __init__(self, current, new):
+        self.current = current
+        self.new = new
+        allowed = ', '.join(Order.TRANSITIONS.get(current, ())) or 'ninguno'
+        super().__init__(f"No se puede pasar de '{current}' a '{new}'. Estados permitidos: {allowed}")
+
+
+class StaleTransition(Exception):
+    """El pedido cambió de estado desde que se leyó (otro usuario lo modificó)."""
+    def __init__(self, expected):
+        self.expected = expected
+        super().__init__(f"El pedido ya no está en estado '{expected}'; recargue e intente de nuevo")
+
+
+class OrderQuerySet(models.QuerySet):
+    def with_total_items(self):
+        """Anota total_items (suma de cantidades de los items) con una subconsulta por pedido."""
+        quantities = (
+            OrderItem.objects.filter(order=OuterRef('pk'))
+            .order_by().values('order').annotate(total=Sum('quantity')).values('total')
+        )
+        return self.annotate(total_items=Coalesce(Subquery(quantities), V(0), output_field=IntegerField()))
+
 
 class Order(models.Model):
     STATUS_CHOICES = [
@@ -59,56 +90,149 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = OrderQuerySet.as_manager()
+    
     class Meta:
         db_table = 'orders'
         ordering = ['-created_at']
+        indexes = [
+            # Listado por cursor: ORDER BY created_at DESC NULLS LAST, id DESC (config.pagination),
+            # para todos los pedidos, por cliente y por estado
+            models.Index(F('created_at').desc(nulls_last=True), F('id').desc(), name='orders_created_idx'),
+            models.Index(
+                'user', F('created_at').desc(nulls_last=True), F('id').desc(), name='orders_user_created_idx'
+            ),
+            models.Index(
+                'status', F('created_at').desc(nulls_last=True), F('id').desc(), name='orders_status_created_idx'
+            ),
+        ]
+
+    # Transiciones de estado permitidas
+    TRANSITIONS = {
+        'pending': ('confirmed', 'cancelled'),
+        'confirmed': ('preparing', 'cancelled'),
+        'preparing': ('ready', 'cancelled'),
+        'ready': ('delivering', 'delivered', 'cancelled'),
+        'delivering': ('delivered', 'cancelled'),
+        'delivered': (),
+        'cancelled': (),
+    }
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Estado tal como se leyó, para detectar cambios en save() sin otra consulta
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
 
     def save(self, *args, **kwargs):
         if not self.order_number:
-            import uuid
-            from datetime import datetime
-            # Generar número de pedido único: ORD-YYYYMMDD-XXXX
-            today = datetime.now().strftime('%Y%m%d')
-            unique_id = str(uuid.uuid4())[:4].upper()
-            self.order_number = f'ORD-{today}-{unique_id}'
+            # Número de pedido correlativo por día: ORD-YYYYMMDD-NNNNN
+            self.order_number = allocate_one(ORDER)
         
-        # Verificar si el estado cambió a 'delivered'
-        is_new = self.pk is None
-        old_status = None
-        if not is_new:
-            old_instance = Order.objects.get(pk=self.pk)
-            old_status = old_instance.status
+        # Los cambios de estado deberían pasar por transition_to(); esto cubre ediciones
+        # directas (ej: desde el admin) sin volver a leer el pedido
+        old_status = getattr(self, '_loaded_status', None)
         
         super().save(*args, **kwargs)
         
-        # Si el estado cambió a 'delivered', crear una venta
-        if not is_new and old_status != 'delivered' and self.status == 'delivered':
-            self._create_sale_from_order()
+        if old_status != self.status:
+            self._invalidate_board()
+        if old_status and old_status != self.status:
+            order_status_changed(self, old_status)
+        # Si el estado cambió a 'delivered', encolar la creación de la venta
+        if old_status and old_status != 'delivered' and self.status == 'delivered':
+            self._enqueue_sale()
+        self._loaded_status = self.status
+
+    def can_transition_to(self, new_status) -> bool:
+        return new_status in self.TRANSITIONS.get(self.status, ())
+
+    def transition_to(self, new_status, changed_by=None, notes=None, expected_status=None):
+        """
+        Cambia el estado del pedido con un compare-and-set:
+        UPDATE ... WHERE id = <id> AND status = <estado leído>.
+
+        Si otro usuario cambió el pedido entre la lectura y la escritura, el
+        UPDATE no encuentra la fila y se lanza StaleTransition, así que dos
+        entregas simultáneas no pueden crear dos ventas. El historial y la
+        tarea que crea la venta (al entregar) se escriben en la misma transacción.
+
+        `expected_status` es el estado que vio el cliente; si ya no coincide,
+        la transición se rechaza aunque sea válida desde el estado actual.
+        """
+        if expected_status and expected_status != self.status:
+            raise StaleTransition(expected_status)
+        old_status = self.status
+        if not self.can_transition_to(new_status):
+            raise InvalidTransition(old_status, new_status)
+
+        now = timezone.now()
+        changes = {'status': new_status, 'updated_at': now}
+        if new_status == 'delivered':
+            changes['actual_delivery_time'] = now
+
+        with transaction.atomic():
+            updated = Order.objects.filter(pk=self.pk, status=old_status).update(**changes)
+            if not updated:
+                raise StaleTransition(old_status)
+            for field, value in changes.items():
+                setattr(self, field, value)
+            self._loaded_status = new_status
+
+            history = OrderStatusHistory.objects.create(
+                order=self,
+                previous_status=old_status,
+                new_status=new_status,
+                notes=notes,
+                changed_by=changed_by
+            )
+            # Aviso a los clientes conectados a /api/events/ (se entrega al hacer commit)
+            order_status_changed(self, old_status)
+            self._invalidate_board()
+            if new_status == 'delivered':
+                self._enqueue_sale()
+        return history
+
+    @staticmethod
+    def _invalidate_board():
+        # Después del commit, para que el tablero no vuelva a guardar el estado anterior
+        from order.board import invalidate_board
+        transaction.on_commit(invalidate_board)
+
+    def _enqueue_sale(self):
+        # La venta se crea en el worker de la cola (manage.py run_jobs), no en la petición
+        from jobs.queue import enqueue
+        enqueue('order.tasks.create_sale_from_order', order_id=self.pk)
 
     def _create_sale_from_order(self):
-        """Convierte esta orden en una venta cuando se marca como entregada"""
+        """
+        Convierte esta orden en una venta. Se ejecuta desde la cola de tareas;
+        OrderSale (clave primaria sobre el pedido) garantiza una sola venta por
+        pedido aunque la tarea se ejecute más de una vez. Retorna la venta.
+        """
         from sale.models import Sale, SaleDetail
-        import uuid
-        from datetime import datetime
+        from analytics.rollups import record_sales
         
         with transaction.atomic():
-            # Generar código único para la venta
-            today = datetime.now().strftime('%Y%m%d')
-            unique_id = str(uuid.uuid4())[:4].upper()
-            sale_code = f'SALE-{today}-{unique_id}'
-            
-            # Crear la venta
+            existing = OrderSale.objects.filter(order=self).first()
+            if existing:
+                return existing.sale
+
+            # Crear la venta con el siguiente código de la serie de ventas
             sale = Sale.objects.create(
-                code=sale_code,
+                code=allocate_one(SALE),
                 paid_amount=self.total_amount,
                 nit=self.user.ci,  # Usar CI del usuario como NIT
                 customer=self.user,
                 # cash_register se puede asignar más tarde si es necesario
             )
+            # Si otro worker convirtió el pedido a la vez, esto falla y todo hace rollback
+            OrderSale.objects.create(order=self, sale=sale)
             
             # Crear los detalles de venta basados en los items de la orden
-            for order_item in self.items.all():
-                SaleDetail.objects.create(
+            details = SaleDetail.objects.bulk_create([
+                SaleDetail(
                     product=order_item.product,
                     sale=sale,
                     quantity=order_item.quantity,
@@ -116,16 +240,15 @@ class Order(models.Model):
                     discount=0,  # Por defecto sin descuento
                     subtotal=order_item.total_price
                 )
+                for order_item in self.items.select_related('product')
+            ])
+            record_sales([(sale, details)])
             
             return sale
 
     def __str__(self):
         return f"Pedido {self.order_number} - {self.user.name}"
 
-    @property
-    def total_items(self):
-        return sum(item.quantity for item in self.items.all())
-
 
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
@@ -174,3 +297,18 @@ class OrderStatusHistory(models.Model):
 
     def __str__(self):
         return f"{self.order.order_number}: {self.previous_status} → {self.new_status}"
+
+
+class OrderSale(models.Model):
+    """Venta generada al entregar un pedido: una por pedido como máximo."""
+    order = models.OneToOneField(Order, on_delete=models.CASCADE, primary_key=True, related_name='sale_link')
+    # Sin FK en la base de datos: sale_sale está particionada y su clave incluye created_at.
+    # Un trigger verifica que la venta exista al insertar (partitioning.integrity)
+    sale = models.ForeignKey('sale.Sale', on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'order_sales'
+
+    def __str__(self):
+        return f"{self.order_id} → {self.sale_id}"
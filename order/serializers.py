@@ -1,3 +1,7 @@
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
 from rest_framework import serializers
 from .models import Order, OrderItem, OrderStatusHistory
 from inventory.models import Product
@@ -53,61 +57,89 @@ class OrderCreateSerializer(serializers.ModelSerializer):
             if 'price' not in item:
                 raise serializers.ValidationError("Cada item debe tener un price.")
         
-        return value
+        # Un producto repetido en el carrito se une en un solo item (OrderItem es
+        # único por pedido y producto) sumando las cantidades
+        lines = {}
+        for item in value:
+            try:
+                product_id = Product._meta.pk.to_python(item['product_id'])
+                quantity = int(item['quantity'])
+                price = Decimal(str(item['price']))
+            except (DjangoValidationError, TypeError, ValueError, ArithmeticError):
+                raise serializers.ValidationError("Item inválido: revise product_id, quantity y price.")
+            if quantity <= 0:
+                raise serializers.ValidationError("La cantidad debe ser mayor a 0.")
+            if price < 0:
+                raise serializers.ValidationError("El precio no puede ser negativo.")
+            if product_id in lines:
+                previous, merged_price = lines[product_id]
+                if merged_price != price:
+                    raise serializers.ValidationError(
+                        f"El producto {product_id} aparece con precios distintos en el pedido."
+                    )
+                quantity += previous
+            lines[product_id] = (quantity, price)
+
+        return [(product_id, quantity, price) for product_id, (quantity, price) in lines.items()]
+
+    def validate(self, attrs):
+        # Todos los productos del carrito en una sola consulta
+        products = Product.objects.in_bulk([product_id for product_id, _, _ in attrs['items']])
+        missing = [product_id for product_id, _, _ in attrs['items'] if product_id not in products]
+        if missing:
+            raise serializers.ValidationError(
+                {'items': [f"Producto con ID {product_id} no encontrado." for product_id in missing]}
+            )
+
+        # Por ahora no calculamos impuestos ni costo de delivery
+        subtotal = sum((price * quantity for _, quantity, price in attrs['items']), Decimal(0))
+        if abs(attrs['total_amount'] - subtotal) > Decimal('0.01'):
+            raise serializers.ValidationError("El total del pedido no coincide con los items.")
+
+        attrs['items'] = [(products[product_id], quantity, price) for product_id, quantity, price in attrs['items']]
+        attrs['subtotal'] = subtotal
+        return attrs
 
     def create(self, validated_data):
+        """
+        El pedido se inserta una sola vez, ya validado y con su subtotal, y los
+        items van en un único bulk_create con el total y el snapshot del
+        producto calculados aquí (bulk_create no llama a OrderItem.save()).
+        """
         items_data = validated_data.pop('items')
         user = self.context['request'].user
         
-        # Crear el pedido
-        order = Order.objects.create(
-            user=user,
-            **validated_data
-        )
-        
-        # Obtener la dirección de entrega del usuario
-        if hasattr(user, 'delivery_address'):
-            order.delivery_address = user.delivery_address
-        
-        # Crear los items del pedido
-        total_subtotal = 0
-        for item_data in items_data:
-            try:
-                product = Product.objects.get(id=item_data['product_id'])
-                
-                order_item = OrderItem.objects.create(
+        with transaction.atomic():
+            order = Order.objects.create(
+                user=user,
+                # Dirección de entrega del usuario, si tiene una
+                delivery_address=getattr(user, 'delivery_address', None),
+                tax_amount=0,
+                delivery_fee=0,
+                **validated_data
+            )
+            
+            OrderItem.objects.bulk_create([
+                OrderItem(
                     order=order,
                     product=product,
-                    quantity=item_data['quantity'],
-                    unit_price=item_data['price']
+                    quantity=quantity,
+                    unit_price=price,
+                    total_price=price * quantity,
+                    product_name=product.name,
+                    product_description=product.description
                 )
-                
-                total_subtotal += order_item.total_price
-                
-            except Product.DoesNotExist:
-                # Si un producto no existe, eliminar el pedido y lanzar error
-                order.delete()
-                raise serializers.ValidationError(f"Producto con ID {item_data['product_id']} no encontrado.")
-        
-        # Actualizar subtotal del pedido
-        order.subtotal = total_subtotal
-        # Por ahora no calculamos impuestos ni costo de delivery
-        order.tax_amount = 0
-        order.delivery_fee = 0
-        # Verificar que el total coincida
-        calculated_total = order.subtotal + order.tax_amount + order.delivery_fee
-        if abs(float(order.total_amount) - float(calculated_total)) > 0.01:
-            order.delete()
-            raise serializers.ValidationError("El total del pedido no coincide con los items.")
-        
-        order.save()
-        
-        # Crear historial de estado
-        OrderStatusHistory.objects.create(
-            order=order,
-            new_status=order.status,
-            notes="Pedido creado"
-        )
+                for product, quantity, price in items_data
+            ])
+            # Mismo valor que la anotación with_total_items(), sin otra consulta
+            order.total_items = sum(quantity for _, quantity, _ in items_data)
+            
+            # Crear historial de estado
+            OrderStatusHistory.objects.create(
+                order=order,
+                new_status=order.status,
+                notes="Pedido creado"
+            )
         
         return order
 
@@ -0,0 +1,7 @@
+from order.models import Order
+
+
+def create_sale_from_order(order_id):
+    """Tarea de la cola: crea la venta de un pedido entregado."""
+    order = Order.objects.select_related('user').get(pk=order_id)
+    order._create_sale_from_order()
@@ -1,53 +1,120 @@
+from django.core.exceptions import ValidationError
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiExample
-from config.response import response
-from .models import Order, OrderStatusHistory
+from config.response import response, StandardResponseSerializerSuccess, StandardResponseSerializerError
+from config.eager import eager_load
+from config.conditional import queryset_etag, etag_matches, not_modified
+from config.export import filter_date_range, ExportError
+from config.listing import ListQueryMixin, ListQueryError, PREFIX
+from config.pagination import cursor_paginate, CursorError
+from user.permissions import IsAdministrator
+from .board import cached_board, DEFAULT_TOP, MAX_TOP
+from .models import Order, InvalidTransition, StaleTransition
 from .serializers import OrderSerializer, OrderCreateSerializer, OrderStatusHistorySerializer
 
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(ListQueryMixin, viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
+    filter_fields = {'order_number': PREFIX}
+    order_fields = ('created_at', 'updated_at', 'total_amount')
+    conditional_get = True
     
     def get_serializer_class(self):
         if self.action == 'create':
             return OrderCreateSerializer
         return OrderSerializer
-    
-    def get_queryset(self):
+
+    def _visible_orders(self):
         # Los administradores pueden ver todos los pedidos
         # Los usuarios normales solo pueden ver sus propios pedidos
         if self.request.user.is_staff or self.request.user.is_superuser:
-            return Order.objects.all().prefetch_related(
-                'items__product', 'delivery_address', 'status_history'
-            ).select_related('user')
-        else:
-            return Order.objects.filter(user=self.request.user).prefetch_related(
-                'items__product', 'delivery_address', 'status_history'
-            )
+            return Order.objects.all()
+        return Order.objects.filter(user=self.request.user)
+    
+    def get_queryset(self):
+        return eager_load(self._visible_orders().with_total_items(), OrderSerializer)
+
+    def get_list_queryset(self):
+        # build_list_queryset agrega la carga anticipada; total_items se anota solo en la página
+        return self._visible_orders()
+
+    def get_etag_extra(self, request):
+        return f"{request.user.pk}|{request.get_full_path()}"
+
+    @staticmethod
+    def _choice_filter(queryset, request, param, field, choices):
+        raw = request.query_params.get(param)
+        if not raw:
+            return queryset
+        values = [value.strip() for value in raw.split(',') if value.strip()]
+        invalid = [value for value in values if value not in dict(choices)]
+        if invalid:
+            raise ListQueryError(f"Valor inválido para '{param}': {', '.join(invalid)}")
+        return queryset.filter(**{f'{field}__in': values})
+
+    def filter_list_queryset(self, request, queryset):
+        # Filtros por estado del pedido y del pago (admiten varios valores separados por coma)
+        queryset = self._choice_filter(queryset, request, 'status', 'status', Order.STATUS_CHOICES)
+        queryset = self._choice_filter(
+            queryset, request, 'payment_status', 'payment_status', Order.PAYMENT_STATUS_CHOICES
+        )
+
+        # Filtro por cliente (solo tiene efecto para administradores)
+        customer = request.query_params.get('customer')
+        if customer:
+            try:
+                queryset = queryset.filter(user_id=customer)
+            except (ValidationError, ValueError):
+                raise ListQueryError("El valor de 'customer' no es un ID válido")
+
+        # Rango de fechas de creación
+        try:
+            return filter_date_range(queryset, request)
+        except ExportError as e:
+            raise ListQueryError(str(e))
+
+    def paginate_list(self, request, queryset):
+        """
+        Siempre paginado: con offset se usa limit/offset y en cualquier otro
+        caso el cursor (sin ?cursor se retorna la primera página).
+        """
+        queryset = queryset.with_total_items()
+        if 'offset' in request.query_params:
+            return super().paginate_list(request, queryset)
+        try:
+            return cursor_paginate(queryset, request, self.default_order)
+        except CursorError as e:
+            raise ListQueryError(str(e))
 
     @extend_schema(
         summary="Listar pedidos del usuario",
-        description="Obtiene todos los pedidos realizados por el usuario autenticado",
+        description=(
+            "Obtiene los pedidos del usuario autenticado (o de todos los clientes si es administrador), "
+            "paginados por cursor: la respuesta incluye el cursor de la página siguiente."
+        ),
+        parameters=[
+            OpenApiParameter(name='limit', description='Cantidad de resultados (por defecto 20, máximo 200)', required=False, type=int),
+            OpenApiParameter(name='cursor', description='Cursor opaco de la página siguiente (vacío para la primera página)', required=False, type=str),
+            OpenApiParameter(name='offset', description='Inicio del listado (paginación limit/offset en lugar de cursor)', required=False, type=int),
+            OpenApiParameter(name='count', description='Calcular el total de resultados (true/false, por defecto true)', required=False, type=str),
+            OpenApiParameter(name='order', description='Campo de ordenamiento (ej: -created_at, +total_amount)', required=False, type=str),
+            OpenApiParameter(name='attr', description='Campo para filtrar (ej: order_number)', required=False, type=str),
+            OpenApiParameter(name='value', description='Valor del campo a filtrar', required=False, type=str),
+            OpenApiParameter(name='status', description='Estado del pedido; varios separados por coma (ej: pending,confirmed)', required=False, type=str),
+            OpenApiParameter(name='payment_status', description='Estado del pago; varios separados por coma', required=False, type=str),
+            OpenApiParameter(name='customer', description='ID del cliente (solo administradores)', required=False, type=str),
+            OpenApiParameter(name='from', description='Fecha inicial de creación (YYYY-MM-DD)', required=False, type=str),
+            OpenApiParameter(name='to', description='Fecha final de creación (YYYY-MM-DD, inclusive)', required=False, type=str),
+        ],
         responses={
             200: OrderSerializer(many=True),
+            400: "Parámetros de listado inválidos",
         }
     )
     def list(self, request):
-        try:
-            queryset = self.get_queryset()
-            serializer = self.get_serializer(queryset, many=True)
-            return response(
-                status_code=200,
-                message="Pedidos obtenidos exitosamente",
-                data=serializer.data
-            )
-        except Exception as e:
-            return response(
-                status_code=500,
-                message=f"Error al obtener pedidos: {str(e)}"
-            )
+        return self.list_response(request, "Pedidos obtenidos exitosamente", "Error al obtener pedidos")
 
     @extend_schema(
         summary="Crear nuevo pedido",
@@ -116,12 +183,19 @@ class OrderViewSet(viewsets.ModelViewSet):
     )
     def retrieve(self, request, pk=None):
         try:
+            etag, rows = queryset_etag(self.get_queryset().filter(pk=pk), OrderSerializer, extra=str(request.user.pk))
+            if not rows:
+                raise Order.DoesNotExist
+            if etag_matches(request, etag):
+                return not_modified(etag)
+
             order = self.get_object()
             serializer = self.get_serializer(order)
             return response(
                 status_code=200,
                 message="Pedido obtenido exitosamente",
-                data=serializer.data
+                data=serializer.data,
+                etag=etag
             )
         except Order.DoesNotExist:
             return response(
@@ -136,7 +210,11 @@ class OrderViewSet(viewsets.ModelViewSet):
 
     @extend_schema(
         summary="Actualizar estado del pedido",
-        description="Actualiza el estado de un pedido. Si se marca como 'delivered', se crea automáticamente una venta.",
+        description=(
+            "Actualiza el estado de un pedido. Si se marca como 'delivered', la venta correspondiente se crea en segundo plano. "
+            "Solo se permiten las transiciones definidas en Order.TRANSITIONS. Si el pedido cambió de estado "
+            "mientras tanto (o no está en 'expected_status'), se responde 409."
+        ),
         request={
             "type": "object",
             "properties": {
@@ -147,41 +225,49 @@ class OrderViewSet(viewsets.ModelViewSet):
                 "notes": {
                     "type": "string",
                     "description": "Notas opcionales sobre el cambio de estado"
+                },
+                "expected_status": {
+                    "type": "string",
+                    "description": "Estado que el cliente cree que tiene el pedido (opcional)"
                 }
             },
             "required": ["status"]
         },
         responses={
             200: OrderSerializer,
-            400: "Estado inválido",
+            400: "Estado inválido o transición no permitida",
             404: "Pedido no encontrado",
+            409: "El pedido cambió de estado mientras tanto",
         }
     )
     def partial_update(self, request, pk=None):
         try:
             order = self.get_object()
-            old_status = order.status
             
-            if 'status' in request.data:
-                new_status = request.data['status']
-                notes = request.data.get('notes', f"Estado actualizado desde la app web")
-                
-                # Actualizar el estado
-                order.status = new_status
-                order.save()  # Esto disparará la creación de venta si el estado es 'delivered'
-                
-                # Crear historial de cambio de estado
-                OrderStatusHistory.objects.create(
-                    order=order,
-                    previous_status=old_status,
-                    new_status=new_status,
-                    notes=notes,
-                    changed_by=request.user
+            if 'status' not in request.data:
+                return response(
+                    status_code=400,
+                    message="El campo 'status' es requerido"
                 )
-                
-                message = "Estado del pedido actualizado exitosamente"
-                if old_status != 'delivered' and new_status == 'delivered':
-                    message += ". Se ha creado automáticamente una venta correspondiente."
+            new_status = request.data['status']
+            if new_status not in dict(Order.STATUS_CHOICES):
+                return response(
+                    status_code=400,
+                    message=f"Estado inválido: {new_status}"
+                )
+            notes = request.data.get('notes', f"Estado actualizado desde la app web")
+            
+            # Compare-and-set: el historial y la tarea de la venta (si se entrega) van en la misma transacción
+            order.transition_to(
+                new_status,
+                changed_by=request.user,
+                notes=notes,
+                expected_status=request.data.get('expected_status')
+            )
+            
+            message = "Estado del pedido actualizado exitosamente"
+            if new_status == 'delivered':
+                message += ". La venta correspondiente se generará en unos instantes."
             
             serializer = self.get_serializer(order)
             return response(
@@ -190,6 +276,17 @@ class OrderViewSet(viewsets.ModelViewSet):
                 data=serializer.data
             )
             
+        except InvalidTransition as e:
+            return response(
+                status_code=400,
+                message=str(e),
+                error={'status': e.current, 'allowed': list(Order.TRANSITIONS.get(e.current, ()))}
+            )
+        except StaleTransition as e:
+            return response(
+                status_code=409,
+                message=str(e)
+            )
         except Order.DoesNotExist:
             return response(
                 status_code=404,
@@ -201,6 +298,34 @@ class OrderViewSet(viewsets.ModelViewSet):
                 message=f"Error al actualizar pedido: {str(e)}"
             )
 
+    @extend_schema(
+        summary="Tablero de despacho",
+        description=(
+            "Cantidad de pedidos por estado, antigüedad (percentiles 50 y 90 y máximo, en segundos) y los "
+            "pedidos más antiguos de cada estado activo, calculados en una sola consulta. Los estados "
+            "finales (entregado, cancelado) cuentan solo los pedidos creados hoy. Se guarda en cache unos "
+            "segundos y se invalida con cada cambio de estado."
+        ),
+        parameters=[
+            OpenApiParameter(name='top', description=f'Pedidos más antiguos por estado (por defecto {DEFAULT_TOP}, máximo {MAX_TOP})', required=False, type=int),
+        ],
+        responses={
+            200: StandardResponseSerializerSuccess,
+            400: StandardResponseSerializerError,
+        }
+    )
+    @action(detail=False, methods=['get'], permission_classes=[IsAdministrator])
+    def board(self, request):
+        try:
+            try:
+                top = int(request.query_params.get('top', DEFAULT_TOP))
+            except ValueError:
+                return response(400, "El valor de top debe ser entero")
+            top = max(1, min(top, MAX_TOP))
+            return response(200, "Tablero obtenido exitosamente", data=cached_board(top))
+        except Exception as e:
+            return response(500, f"Error al obtener el tablero: {str(e)}")
+
     @extend_schema(
         summary="Historial de estados del pedido",
         description="Obtiene el historial completo de cambios de estado de un pedido",
@@ -0,0 +1,6 @@
+from django.apps import AppConfig
+
+
+class PartitioningConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'partitioning'
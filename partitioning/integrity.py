@@ -0,0 +1,122 @@
+"""
+Integridad que el particionamiento le quita a la base de datos y cómo se recupera.
+
+- sale_sale solo puede tener restricciones únicas que incluyan created_at, así
+  que la unicidad global del código y del id vive en sale_codes (SaleCode), que
+  mantiene el trigger sale_codes_sync.
+- sale_saledetail.sale_id y order_sales.sale_id no pueden ser FK hacia una
+  tabla particionada por otra columna. Un trigger rechaza al insertar (o al
+  cambiar sale_id) filas que apunten a una venta que no está en sale_codes;
+  se busca ahí (índice único sobre sale_id, sin particiones) y no en
+  sale_sale, donde sale_id no permite descartar particiones. Lo que no cubre
+  (ventas borradas con SQL directo, particiones archivadas) lo reporta
+  `manage.py check_sale_integrity`.
+
+Mover filas entre particiones (partitions.create_partition) no es una venta
+nueva ni borrada: se hace con MOVING_SETTING activo y los triggers lo ignoran.
+"""
+
+MOVING_SETTING = 'spos.moving_rows'
+
+_INSTALL_SQL = f"""
+CREATE OR REPLACE FUNCTION sale_codes_sync() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF current_setting('{MOVING_SETTING}', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO sale_codes (code, sale_id, created_at) VALUES (NEW.code, NEW.id, NEW.created_at);
+    ELSIF TG_OP = 'UPDATE' THEN
+        IF NEW.code IS DISTINCT FROM OLD.code OR NEW.id IS DISTINCT FROM OLD.id THEN
+            UPDATE sale_codes SET code = NEW.code, sale_id = NEW.id, created_at = NEW.created_at
+            WHERE sale_id = OLD.id;
+        END IF;
+    ELSE
+        DELETE FROM sale_codes WHERE sale_id = OLD.id;
+    END IF;
+    RETURN NULL;
+END $$;
+
+CREATE OR REPLACE FUNCTION sale_exists_check() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF current_setting('{MOVING_SETTING}', true) = 'on' THEN
+        RETURN NULL;
+    END IF;
+    IF NOT EXISTS (SELECT 1 FROM sale_codes WHERE sale_id = NEW.sale_id) THEN
+        RAISE EXCEPTION 'La venta % no existe (%.sale_id)', NEW.sale_id, TG_TABLE_NAME
+            USING ERRCODE = 'foreign_key_violation';
+    END IF;
+    RETURN NULL;
+END $$;
+
+DROP TRIGGER IF EXISTS sale_codes_sync ON sale_sale;
+CREATE TRIGGER sale_codes_sync AFTER INSERT OR UPDATE OR DELETE ON sale_sale
+    FOR EACH ROW EXECUTE FUNCTION sale_codes_sync();
+
+DROP TRIGGER IF EXISTS sale_exists_check ON sale_saledetail;
+CREATE TRIGGER sale_exists_check AFTER INSERT OR UPDATE OF sale_id ON sale_saledetail
+    FOR EACH ROW EXECUTE FUNCTION sale_exists_check();
+
+DROP TRIGGER IF EXISTS sale_exists_check ON order_sales;
+CREATE TRIGGER sale_exists_check AFTER INSERT OR UPDATE OF sale_id ON order_sales
+    FOR EACH ROW EXECUTE FUNCTION sale_exists_check();
+"""
+
+_UNINSTALL_SQL = """
+DROP TRIGGER IF EXISTS sale_exists_check ON order_sales;
+DROP TRIGGER IF EXISTS sale_exists_check ON sale_saledetail;
+DROP TRIGGER IF EXISTS sale_codes_sync ON sale_sale;
+DROP FUNCTION IF EXISTS sale_exists_check();
+DROP FUNCTION IF EXISTS sale_codes_sync();
+"""
+
+# (descripción, consulta que cuenta, consulta con ejemplos)
+CHECKS = (
+    (
+        "Detalles de venta sin su venta",
+        "FROM sale_saledetail d WHERE NOT EXISTS (SELECT 1 FROM sale_sale s WHERE s.id = d.sale_id)",
+        "d.id",
+    ),
+    (
+        "Pedidos convertidos cuya venta no existe (o está archivada)",
+        "FROM order_sales o WHERE NOT EXISTS (SELECT 1 FROM sale_sale s WHERE s.id = o.sale_id)",
+        "o.order_id",
+    ),
+    (
+        "Ventas sin registrar en sale_codes",
+        "FROM sale_sale s WHERE NOT EXISTS (SELECT 1 FROM sale_codes c WHERE c.sale_id = s.id)",
+        "s.id",
+    ),
+)
+
+
+def install(cursor):
+    """Crea los triggers y registra en sale_codes las ventas existentes."""
+    cursor.execute(
+        "INSERT INTO sale_codes (code, sale_id, created_at) "
+        "SELECT code, id, created_at FROM sale_sale ON CONFLICT DO NOTHING"
+    )
+    cursor.execute(_INSTALL_SQL)
+
+
+def uninstall(cursor):
+    cursor.execute(_UNINSTALL_SQL)
+
+
+def moving_rows(cursor):
+    """Desactiva los triggers de integridad hasta el fin de la transacción actual."""
+    cursor.execute("SELECT set_config(%s, 'on', true)", [MOVING_SETTING])
+
+
+def integrity_report(cursor, samples: int = 10) -> list:
+    """Retorna [(descripción, cantidad, [ids de ejemplo])] de cada verificación."""
+    report = []
+    for description, source, column in CHECKS:
+        cursor.execute(f"SELECT count(*) {source}")
+        count = cursor.fetchone()[0]
+        examples = []
+        if count:
+            cursor.execute(f"SELECT {column} {source} LIMIT %s", [samples])
+            examples = [str(value) for (value,) in cursor.fetchall()]
+        report.append((description, count, examples))
+    return report
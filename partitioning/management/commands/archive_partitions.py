@@ -0,0 +1,39 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from partitioning.partitions import (
+    PARTITIONED_TABLES, add_months, archive_partition, month_start, monthly_partitions, partition_name,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Mueve a archivos .csv.gz las particiones con más de N meses de antigüedad y las elimina "
+        "de la base de datos. Se pueden recuperar con restore_partition."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, required=True, help="Antigüedad mínima en meses")
+        parser.add_argument('--dir', required=True, help="Directorio local donde guardar los archivos")
+        parser.add_argument('--dry-run', action='store_true', help="Solo listar las particiones")
+
+    def handle(self, *args, **options):
+        if options['older_than'] < 1:
+            raise CommandError("--older-than debe ser al menos 1")
+        limit = add_months(month_start(datetime.now(dt_timezone.utc)), -options['older_than'])
+
+        archived = 0
+        with connection.cursor() as cursor:
+            for table in PARTITIONED_TABLES:
+                for month in monthly_partitions(cursor, table):
+                    if month >= limit:
+                        continue
+                    if options['dry_run']:
+                        self.stdout.write(f"Se archivaría: {partition_name(table, month)}")
+                        continue
+                    path = archive_partition(cursor, table, month, options['dir'])
+                    archived += 1
+                    self.stdout.write(f"{partition_name(table, month)} -> {path}")
+        self.stdout.write(self.style.SUCCESS(f"{archived} particiones archivadas"))
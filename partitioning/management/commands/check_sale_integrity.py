@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from partitioning.integrity import integrity_report
+
+
+class Command(BaseCommand):
+    help = (
+        "Busca filas huérfanas que las FK ya no impiden desde que las ventas están particionadas "
+        "(detalles sin venta, pedidos con venta inexistente, ventas sin código registrado). "
+        "Termina con error si encuentra alguna, para usarlo en cron o en monitoreo."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--samples', type=int, default=10, help="Ids de ejemplo por verificación")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("Las ventas solo están particionadas en PostgreSQL")
+        with connection.cursor() as cursor:
+            report = integrity_report(cursor, options['samples'])
+
+        problems = 0
+        for description, count, examples in report:
+            if count:
+                problems += count
+                self.stdout.write(self.style.WARNING(f"{description}: {count} (ej: {', '.join(examples)})"))
+            else:
+                self.stdout.write(f"{description}: 0")
+        if problems:
+            raise CommandError(f"{problems} filas con problemas de integridad")
+        self.stdout.write(self.style.SUCCESS("Sin problemas de integridad"))
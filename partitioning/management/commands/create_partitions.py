@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from partitioning.partitions import FUTURE_MONTHS, ensure_future_partitions
+
+
+class Command(BaseCommand):
+    help = "Crea las particiones mensuales del mes actual y de los próximos meses (ejecutar con cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int, default=FUTURE_MONTHS,
+                            help=f"Meses hacia adelante (por defecto {FUTURE_MONTHS})")
+
+    def handle(self, *args, **options):
+        with connection.cursor() as cursor:
+            created = ensure_future_partitions(cursor, options['months'])
+        for name in created:
+            self.stdout.write(f"Partición creada: {name}")
+        self.stdout.write(self.style.SUCCESS(f"{len(created)} particiones nuevas"))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from partitioning.partitions import restore_partition
+
+
+class Command(BaseCommand):
+    help = "Restaura particiones archivadas con archive_partitions a partir de sus archivos .csv.gz."
+
+    def add_arguments(self, parser):
+        parser.add_argument('files', nargs='+', help="Archivos .csv.gz generados por archive_partitions")
+
+    def handle(self, *args, **options):
+        with connection.cursor() as cursor:
+            for path in options['files']:
+                try:
+                    name, rows = restore_partition(cursor, path)
+                except (OSError, ValueError) as e:
+                    raise CommandError(str(e))
+                self.stdout.write(f"{name}: {rows} filas restauradas")
@@ -0,0 +1,24 @@
+from django.db import migrations
+
+from partitioning.partitions import PARTITIONED_TABLES, partition_existing_table
+
+
+def partition_tables(apps, schema_editor):
+    # Particionamiento declarativo: solo existe en Postgres
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for table in PARTITIONED_TABLES:
+            partition_existing_table(cursor, table)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sale', '0007_partition_prep'),
+        ('order', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_tables),
+    ]
@@ -0,0 +1,31 @@
+from django.db import migrations
+
+from partitioning.integrity import install, uninstall
+
+
+def install_triggers(apps, schema_editor):
+    # Los triggers reemplazan restricciones que el particionamiento (solo Postgres) quita
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        install(cursor)
+
+
+def uninstall_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        uninstall(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('partitioning', '0001_partition_tables'),
+        ('sale', '0008_sale_code_registry'),
+        ('order', '0002_ordersale'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_triggers, uninstall_triggers),
+    ]
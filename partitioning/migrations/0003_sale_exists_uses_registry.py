@@ -0,0 +1,22 @@
+from django.db import migrations
+
+from partitioning.integrity import install
+
+
+def reinstall_triggers(apps, schema_editor):
+    # sale_exists_check busca la venta en sale_codes en lugar de recorrer las particiones de sale_sale
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        install(cursor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('partitioning', '0002_integrity_triggers'),
+    ]
+
+    operations = [
+        migrations.RunPython(reinstall_triggers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,266 @@
+import gzip
+import os
+import re
+from datetime import date, datetime, timezone as dt_timezone
+
+from django.db import transaction
+
+from partitioning.integrity import moving_rows
+
+# Tablas particionadas por mes (en UTC) y su columna de partición
+PARTITIONED_TABLES = {
+    'sale_sale': 'created_at',
+    'sale_saledetail': 'created_at',
+    'order_status_history': 'created_at',
+}
+FUTURE_MONTHS = 3
+# FK que apuntan a estas tablas y que `DROP TABLE ... CASCADE` puede eliminar al
+# particionar: ninguna. sale_saledetail.sale y order_sales.sale se declaran con
+# db_constraint=False antes (ver partitioning.integrity, que las reemplaza).
+ALLOWED_INBOUND_FKS = {}
+# Columnas que se buscan sin la columna de partición y que necesitan un índice en
+# cada partición (ej: el prefetch de los detalles de una página de ventas)
+LOOKUP_COLUMNS = {
+    'sale_saledetail': 'sale_id',
+}
+_NAME = re.compile(r'^(?P<table>\w+)_p(?P<year>\d{4})(?P<month>\d{2})$')
+
+
+def month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def parse_partition_name(name: str):
+    """'sale_sale_p202601' -> ('sale_sale', date(2026, 1, 1)); None si no es mensual."""
+    match = _NAME.match(name)
+    if not match or match['table'] not in PARTITIONED_TABLES:
+        return None
+    return match['table'], date(int(match['year']), int(match['month']), 1)
+
+
+def _bound(month: date) -> str:
+    return datetime(month.year, month.month, 1, tzinfo=dt_timezone.utc).isoformat()
+
+
+def is_partitioned(cursor, table: str) -> bool:
+    cursor.execute("SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s)", [table])
+    return cursor.fetchone() is not None
+
+
+def monthly_partitions(cursor, table: str) -> list:
+    """Meses con partición propia, ordenados (la partición por defecto no se incluye)."""
+    cursor.execute(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(%s)",
+        [table]
+    )
+    months = [parse_partition_name(name) for (name,) in cursor.fetchall()]
+    return sorted(parsed[1] for parsed in months if parsed)
+
+
+def create_partition(cursor, table: str, month: date) -> bool:
+    """
+    Crea la partición de `month` si no existe. Las filas de ese mes que hayan
+    caído en la partición por defecto se mueven a la nueva antes de adjuntarla.
+    ATTACH solo toma un bloqueo liviano sobre la tabla padre, así que las
+    ventas pueden seguir insertándose mientras tanto.
+    """
+    name = partition_name(table, month)
+    cursor.execute("SELECT to_regclass(%s)", [name])
+    if cursor.fetchone()[0]:
+        return False
+
+    column = PARTITIONED_TABLES[table]
+    start, end = _bound(month), _bound(add_months(month, 1))
+    with transaction.atomic():
+        cursor.execute(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+        # Las filas solo cambian de partición: que los triggers de integridad no las vean como borradas
+        moving_rows(cursor)
+        cursor.execute(
+            f"WITH moved AS (DELETE FROM {table}_default WHERE {column} >= %s AND {column} < %s RETURNING *) "
+            f"INSERT INTO {name} SELECT * FROM moved",
+            [start, end]
+        )
+        cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM ('{start}') TO ('{end}')")
+    return True
+
+
+def ensure_future_partitions(cursor, months_ahead: int = FUTURE_MONTHS) -> list:
+    current = month_start(datetime.now(dt_timezone.utc))
+    created = []
+    for table in PARTITIONED_TABLES:
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            if create_partition(cursor, table, month):
+                created.append(partition_name(table, month))
+    return created
+
+
+def _table_definition(cursor, table: str):
+    """Índices y restricciones de `table` para recrearlos sobre la tabla particionada."""
+    cursor.execute(
+        "SELECT conname, contype, pg_get_constraintdef(oid), "
+        "ARRAY(SELECT attname FROM pg_attribute WHERE attrelid = conrelid AND attnum = ANY(conkey)) "
+        "FROM pg_constraint WHERE conrelid = to_regclass(%s) AND contype IN ('p', 'u', 'f')",
+        [table]
+    )
+    constraints = cursor.fetchall()
+    cursor.execute(
+        "SELECT i.relname, pg_get_indexdef(x.indexrelid) FROM pg_index x "
+        "JOIN pg_class i ON i.oid = x.indexrelid "
+        "WHERE x.indrelid = to_regclass(%s) "
+        "AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conindid = x.indexrelid)",
+        [table]
+    )
+    return constraints, cursor.fetchall()
+
+
+def _inbound_foreign_keys(cursor, table: str) -> list:
+    cursor.execute(
+        "SELECT conrelid::regclass::text, conname FROM pg_constraint "
+        "WHERE contype = 'f' AND confrelid = to_regclass(%s) ORDER BY 1, 2",
+        [table]
+    )
+    return cursor.fetchall()
+
+
+def _has_leading_index(cursor, table: str, column: str) -> bool:
+    cursor.execute(
+        "SELECT 1 FROM pg_index x JOIN pg_attribute a ON a.attrelid = x.indrelid AND a.attnum = x.indkey[0] "
+        "WHERE x.indrelid = to_regclass(%s) AND a.attname = %s",
+        [table, column]
+    )
+    return cursor.fetchone() is not None
+
+
+def partition_existing_table(cursor, table: str, months_ahead: int = FUTURE_MONTHS):
+    """
+    Convierte `table` en una tabla particionada por mes copiando sus filas.
+
+    Se crea una partición por cada mes con datos, las de los próximos meses y
+    una partición por defecto. La clave primaria y las restricciones únicas
+    pasan a incluir la columna de partición (Postgres lo exige); los demás
+    índices y las FK salientes se recrean con el mismo nombre.
+    """
+    column = PARTITIONED_TABLES[table]
+    if is_partitioned(cursor, table):
+        return
+
+    # DROP ... CASCADE eliminaría sin aviso las FK de otras tablas hacia esta
+    unexpected = [
+        f"{source}.{name}" for source, name in _inbound_foreign_keys(cursor, table)
+        if (source, name) not in ALLOWED_INBOUND_FKS.get(table, ())
+    ]
+    if unexpected:
+        raise ValueError(
+            f"No se puede particionar {table}: se perderían las FK {', '.join(unexpected)}. "
+            "Declárelas con db_constraint=False (y una verificación en partitioning.integrity) antes."
+        )
+
+    constraints, indexes = _table_definition(cursor, table)
+    cursor.execute(f"SELECT min({column}) FROM {table}")
+    oldest = cursor.fetchone()[0]
+    current = month_start(datetime.now(dt_timezone.utc))
+    first = month_start(oldest.astimezone(dt_timezone.utc)) if oldest else current
+
+    new = f"{table}__partitioned"
+    cursor.execute(
+        f"CREATE TABLE {new} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING IDENTITY) "
+        f"PARTITION BY RANGE ({column})"
+    )
+    cursor.execute(f"CREATE TABLE {table}_default PARTITION OF {new} DEFAULT")
+    month = first
+    while month <= add_months(current, months_ahead):
+        cursor.execute(
+            f"CREATE TABLE {partition_name(table, month)} PARTITION OF {new} "
+            f"FOR VALUES FROM ('{_bound(month)}') TO ('{_bound(add_months(month, 1))}')"
+        )
+        month = add_months(month, 1)
+
+    cursor.execute(f"INSERT INTO {new} SELECT * FROM {table}")
+    cursor.execute(f"DROP TABLE {table} CASCADE")
+    cursor.execute(f"ALTER TABLE {new} RENAME TO {table}")
+
+    for name, kind, definition, columns in constraints:
+        if kind == 'f':
+            cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {definition}")
+            continue
+        if column not in columns:
+            columns = list(columns) + [column]
+        keyword = 'PRIMARY KEY' if kind == 'p' else 'UNIQUE'
+        cursor.execute(f"ALTER TABLE {table} ADD CONSTRAINT {name} {keyword} ({', '.join(columns)})")
+    for name, definition in indexes:
+        # La definición nombra la tabla original, que ahora es la particionada
+        cursor.execute(definition)
+    lookup = LOOKUP_COLUMNS.get(table)
+    if lookup and not _has_leading_index(cursor, table, lookup):
+        # Un índice sobre la tabla particionada se crea en cada partición (y en las futuras al adjuntarlas)
+        cursor.execute(f"CREATE INDEX {table}_{lookup}_idx ON {table} ({lookup})")
+
+    # Las columnas identity obtienen una secuencia nueva: continuar desde el último id copiado
+    cursor.execute(
+        "SELECT attname FROM pg_attribute WHERE attrelid = to_regclass(%s) AND attidentity <> ''",
+        [table]
+    )
+    for (identity,) in cursor.fetchall():
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, %s), COALESCE((SELECT max({identity}) FROM {table}), 0) + 1, false)",
+            [table, identity]
+        )
+
+
+def archive_partition(cursor, table: str, month: date, directory: str) -> str:
+    """
+    Copia la partición de `month` a `{directory}/{partición}.csv.gz` y la
+    elimina de la base de datos. Retorna la ruta del archivo.
+    """
+    name = partition_name(table, month)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{name}.csv.gz")
+    partial = f"{path}.partial"
+
+    with gzip.open(partial, 'wb') as output:
+        with cursor.copy(f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER true)") as copy:
+            for data in copy:
+                output.write(data)
+    os.replace(partial, path)
+
+    with transaction.atomic():
+        cursor.execute(f"ALTER TABLE {table} DETACH PARTITION {name}")
+        cursor.execute(f"DROP TABLE {name}")
+    return path
+
+
+def restore_partition(cursor, path: str) -> tuple:
+    """Vuelve a crear y adjuntar una partición archivada con `archive_partition`."""
+    filename = os.path.basename(path)
+    parsed = parse_partition_name(filename.split('.', 1)[0])
+    if not parsed:
+        raise ValueError(f"El archivo {filename} no corresponde a una partición archivada")
+    table, month = parsed
+    name = partition_name(table, month)
+
+    cursor.execute("SELECT to_regclass(%s)", [name])
+    if cursor.fetchone()[0]:
+        raise ValueError(f"La partición {name} ya existe")
+
+    start, end = _bound(month), _bound(add_months(month, 1))
+    with transaction.atomic():
+        cursor.execute(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)")
+        with gzip.open(path, 'rb') as source, \
+                cursor.copy(f"COPY {name} FROM STDIN WITH (FORMAT csv, HEADER true)") as copy:
+            while chunk := source.read(1 << 16):
+                copy.write(chunk)
+        cursor.execute(f"ALTER TABLE {table} ATTACH PARTITION {name} FOR VALUES FROM ('{start}') TO ('{end}')")
+        cursor.execute(f"SELECT count(*) FROM {name}")
+        rows = cursor.fetchone()[0]
+    return name, rows
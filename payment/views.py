@@ -20,6 +20,7 @@ from .serializers import (
 )
 from .veripagos_service import VeripagosService
 from config.response import response
+from live.events import payment_completed
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -156,6 +157,7 @@ def verify_payment_status(request):
             payment.sender_account = remitente.get('cuenta')
             
             payment.save()
+            payment_completed(payment)
 
         # Serializar respuesta
         transaction_serializer = PaymentTransactionSerializer(payment)
@@ -233,6 +235,7 @@ def veripagos_webhook(request):
             payment.sender_document = remitente.get('documento')
             payment.sender_account = remitente.get('cuenta')
             payment.save()
+            payment_completed(payment)
 
         return JsonResponse({'message': 'Webhook procesado exitosamente'}, status=200)
 
@@ -0,0 +1,178 @@
+import hashlib
+import json
+from collections import Counter, defaultdict
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from analytics.rollups import record_sales
+from inventory.stock import lock_products, decrement_stock
+from numbering.allocator import allocate, SALE
+from sale.models import Sale, SaleDetail, CashRegister, IdempotencyKey
+from sale.serializers import SaleBatchItemSerializer, build_details
+from user.models import User
+
+MAX_BATCH_SALES = 500
+
+
+def _failed(index, status, error):
+    return {'index': index, 'status': status, 'error': error}
+
+
+def _as_json(data):
+    # Mismo valor en la primera respuesta y en las repeticiones (ej: Decimal -> "12.50")
+    return json.loads(json.dumps(data, cls=DjangoJSONEncoder))
+
+
+def _request_hash(raw) -> str:
+    return hashlib.md5(json.dumps(raw, sort_keys=True, cls=DjangoJSONEncoder).encode()).hexdigest()
+
+
+def _claim_keys(user, items, raw_items, results):
+    """
+    Registra las idempotency_key del lote. Las que ya tenían respuesta (de un
+    envío anterior del mismo lote) se contestan desde la tabla y se quitan de
+    `items`. Retorna {índice: IdempotencyKey} de las claves nuevas.
+    """
+    keyed, seen = {}, set()
+    for index, item in list(items.items()):
+        key = item.get('idempotency_key')
+        if not key:
+            continue
+        if key in seen:
+            results[index] = _failed(index, 409, "Idempotency-Key repetida dentro del lote.")
+            del items[index]
+            continue
+        seen.add(key)
+        keyed[index] = IdempotencyKey.BATCH_PREFIX + key
+    if not keyed:
+        return {}
+
+    hashes = {index: _request_hash(raw_items[index]) for index in keyed}
+    # ON CONFLICT DO NOTHING espera a que termine otro lote que esté insertando la misma clave
+    IdempotencyKey.objects.bulk_create(
+        [IdempotencyKey(user=user, key=key, request_hash=hashes[index]) for index, key in keyed.items()],
+        ignore_conflicts=True
+    )
+    stored = {record.key: record for record in IdempotencyKey.objects.filter(user=user, key__in=keyed.values())}
+
+    claimed = {}
+    for index, key in keyed.items():
+        record = stored[key]
+        if record.status_code is None:
+            claimed[index] = record
+            continue
+        del items[index]
+        if record.request_hash != hashes[index]:
+            results[index] = _failed(index, 422, "La Idempotency-Key ya se usó con otros datos de venta.")
+        else:
+            results[index] = dict(record.response_body, index=index, replayed=True)
+    return claimed
+
+
+def create_sales_batch(user, raw_items) -> list:
+    """
+    Crea un lote de ventas (ej: las que un terminal acumuló sin conexión).
+
+    Todas se validan juntas, los productos y cajas involucrados se bloquean una
+    sola vez, los códigos se reservan en bloque y las filas se insertan con
+    bulk_create. Cada venta se acepta o rechaza por separado, en el orden del
+    lote, como si se hubieran enviado una por una. Retorna un resultado por venta.
+    """
+    results = [None] * len(raw_items)
+    items = {}
+    for index, raw in enumerate(raw_items):
+        serializer = SaleBatchItemSerializer(data=raw)
+        if serializer.is_valid():
+            items[index] = serializer.validated_data
+        else:
+            results[index] = _failed(index, 400, serializer.errors)
+
+    with transaction.atomic():
+        claimed = _claim_keys(user, items, raw_items, results)
+
+        customer_ids = {item['customer'] for item in items.values()}
+        customers = set(User.objects.filter(pk__in=customer_ids, role='customer').values_list('pk', flat=True))
+        # Mismo orden de bloqueo que una venta suelta (SaleSerializer.create):
+        # productos → cajas → contador de códigos (allocate) → rollups (record_sales)
+        products = lock_products({line['product'] for item in items.values() for line in item['details']})
+        register_ids = {item['cash_register'] for item in items.values() if item.get('cash_register')}
+        registers = {
+            register.pk: register
+            for register in CashRegister.objects.select_for_update(of=('self',)).filter(pk__in=register_ids).order_by('pk')
+        }
+        available = {pk: product.stock for pk, product in products.items()}
+
+        accepted = []
+        for index, item in items.items():
+            register = registers.get(item.get('cash_register')) if item.get('cash_register') else None
+            quantities = Counter()
+            for line in item['details']:
+                quantities[line['product']] += line['quantity']
+
+            missing = [str(pk) for pk in quantities if pk not in products]
+            short = [products[pk].name for pk, qty in quantities.items() if pk in products and available[pk] < qty]
+            if item['customer'] not in customers:
+                results[index] = _failed(index, 400, {'customer': ["Cliente no encontrado."]})
+            elif item.get('cash_register') and register is None:
+                results[index] = _failed(index, 404, "Caja no encontrada.")
+            elif register is not None and register.closing:
+                results[index] = _failed(index, 400, "La caja está cerrada.")
+            elif missing:
+                results[index] = _failed(index, 400, {'details': [f"Producto no encontrado: {pk}" for pk in missing]})
+            elif short:
+                results[index] = _failed(index, 400, [f"Stock insuficiente para el producto: {name}" for name in short])
+            else:
+                for pk, qty in quantities.items():
+                    available[pk] -= qty
+                details, total = build_details(
+                    [(line['product'], line['quantity'], line['price']) for line in item['details']],
+                    products
+                )
+                accepted.append((index, item, register, quantities, details, total))
+
+        if accepted:
+            codes = allocate(SALE, len(accepted))
+            sales = [
+                Sale(code=code, paid_amount=total, nit=item['nit'], customer_id=item['customer'], cash_register=register)
+                for code, (index, item, register, quantities, details, total) in zip(codes, accepted)
+            ]
+            Sale.objects.bulk_create(sales)
+
+            all_details, sold = [], Counter()
+            register_totals = defaultdict(lambda: 0)
+            for sale, (index, item, register, quantities, details, total) in zip(sales, accepted):
+                for detail in details:
+                    detail.sale = sale
+                all_details.extend(details)
+                sold.update(quantities)
+                if register is not None:
+                    register_totals[register] += total
+                results[index] = {
+                    'index': index,
+                    'status': 201,
+                    'data': _as_json({'id': sale.id, 'code': sale.code, 'paid_amount': sale.paid_amount}),
+                }
+            SaleDetail.objects.bulk_create(all_details)
+
+            # Un solo UPDATE de stock para todo el lote y uno por caja para sus totales
+            decrement_stock(dict(sold), products=products)
+            for register, amount in register_totals.items():
+                register.record_sale(amount)
+            record_sales([(sale, accepted_item[4]) for sale, accepted_item in zip(sales, accepted)])
+
+        # Guardar solo las respuestas exitosas; las claves de ventas rechazadas se liberan
+        done, released = [], []
+        for index, record in claimed.items():
+            if results[index]['status'] == 201:
+                record.status_code = 201
+                record.response_body = {k: v for k, v in results[index].items() if k != 'index'}
+                done.append(record)
+            else:
+                released.append(record.pk)
+        if done:
+            IdempotencyKey.objects.bulk_update(done, ['status_code', 'response_body'])
+        if released:
+            IdempotencyKey.objects.filter(pk__in=released).delete()
+
+    return results
@@ -0,0 +1,18 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from sale.models import IdempotencyKey
+
+
+class Command(BaseCommand):
+    help = "Elimina las Idempotency-Key de ventas más antiguas que el periodo indicado."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=72, help="Antigüedad mínima en horas (por defecto 72)")
+
+    def handle(self, *args, **options):
+        limit = timezone.now() - timedelta(hours=options['hours'])
+        deleted, _ = IdempotencyKey.objects.filter(created_at__lt=limit).delete()
+        self.stdout.write(self.style.SUCCESS(f"{deleted} claves eliminadas"))
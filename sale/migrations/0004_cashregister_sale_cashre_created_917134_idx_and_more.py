@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-17 17:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sale', '0003_cashregister_observations'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cashregister',
+            index=models.Index(fields=['created_at', 'id'], name='sale_cashre_created_917134_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sale',
+            index=models.Index(fields=['created_at', 'id'], name='sale_sale_created_518558_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-17 17:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sale', '0004_cashregister_sale_cashre_created_917134_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cashregister',
+            name='discrepancy',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True),
+        ),
+    ]
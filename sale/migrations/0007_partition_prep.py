@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-17 17:50
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sale', '0006_idempotencykey'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='sale',
+            name='code',
+            field=models.CharField(max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='saledetail',
+            name='sale',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='details', to='sale.sale'),
+        ),
+        migrations.AddConstraint(
+            model_name='sale',
+            constraint=models.UniqueConstraint(fields=('code', 'created_at'), name='sale_code_created_uniq'),
+        ),
+    ]
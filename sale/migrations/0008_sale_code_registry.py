@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-17 18:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sale', '0007_partition_prep'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SaleCode',
+            fields=[
+                ('code', models.CharField(max_length=20, primary_key=True, serialize=False)),
+                ('sale_id', models.UUIDField(unique=True)),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'sale_codes',
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+from django.db import migrations
+from django.db.models import Value
+from django.db.models.functions import Concat, Length
+
+BATCH_PREFIX = 'batch:'
+
+
+def prefix_batch_keys(apps, schema_editor):
+    # Las respuestas de los lotes tienen 'status'; las de POST /api/sales/ el formato estándar ('statusCode')
+    IdempotencyKey = apps.get_model('sale', 'IdempotencyKey')
+    (
+        IdempotencyKey.objects
+        .filter(response_body__has_key='status')
+        .exclude(response_body__has_key='statusCode')
+        .exclude(key__startswith=BATCH_PREFIX)
+        .annotate(key_length=Length('key'))
+        .filter(key_length__lte=255 - len(BATCH_PREFIX))
+        .update(key=Concat(Value(BATCH_PREFIX), 'key'))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sale', '0008_sale_code_registry'),
+    ]
+
+    operations = [
+        migrations.RunPython(prefix_batch_keys, migrations.RunPython.noop),
+    ]
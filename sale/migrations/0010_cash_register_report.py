@@ -0,0 +1,26 @@
+# Generated by Django 5.2 on 2026-10-17 18:22
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sale', '0009_namespace_batch_idempotency_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CashRegisterReport',
+            fields=[
+                ('cash_register', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='+', serialize=False, to='sale.cashregister')),
+                ('data', models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'sale_cash_register_reports',
+            },
+        ),
+    ]
@@ -1,9 +1,25 @@
-from django.db import models
+from decimal import Decimal
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models, transaction
+from django.db.models import Count, DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 from config.models import BaseModel
 from user.models import User
 from inventory.models import Product
 
+
+MONEY = DecimalField(max_digits=14, decimal_places=2)
+
+
+def _per_register(queryset, group, aggregate, output_field):
+    """Subconsulta escalar con el agregado de `queryset` para la caja de la fila externa (0 si no hay filas)."""
+    value = queryset.order_by().values(group).annotate(v=aggregate).values('v')
+    zero = Decimal(0) if isinstance(output_field, DecimalField) else 0
+    return Coalesce(Subquery(value, output_field=output_field), Value(zero), output_field=output_field)
+
+
 class CashRegister(BaseModel):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='cash_registers')
     opening = models.DateTimeField()
@@ -13,30 +29,136 @@ class CashRegister(BaseModel):
     purchases_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     observations = models.TextField(null=True, blank=True)
+    # Diferencia entre los totales acumulados y los recalculados al cerrar la caja
+    discrepancy = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Soporta la paginación por cursor sobre (created_at, id)
+            models.Index(fields=['created_at', 'id']),
+        ]
+
+    def _add(self, sales=Decimal(0), purchases=Decimal(0)) -> bool:
+        # Incremento atómico en la base de datos; falla (False) si la caja ya está cerrada
+        return bool(CashRegister.objects.filter(pk=self.pk, closing__isnull=True).update(
+            sales_total=F('sales_total') + sales,
+            purchases_total=F('purchases_total') + purchases,
+            total=F('total') + sales - purchases,
+            updated_at=timezone.now(),
+        ))
+
+    def record_sale(self, amount) -> bool:
+        return self._add(sales=amount)
 
-    def close_register(self):
-        self.closing = timezone.now()
-        self.save()
+    def record_purchase(self, amount) -> bool:
+        return self._add(purchases=amount)
+
+    def close_register(self) -> dict:
+        """
+        Cierra la caja y concilia sus totales.
+
+        Una sola consulta bloquea la fila de la caja (las ventas en curso sobre
+        ella esperan) y recalcula desde Sale/SaleDetail/Purchase la cantidad
+        de ventas, ítems y montos. Los totales guardados se reemplazan por los
+        recalculados y la diferencia con los acumulados queda en `discrepancy`.
+        El reporte del turno (sale.reports) se guarda en la misma transacción.
+        Retorna el resumen del cierre.
+        """
+        from inventory.models import Purchase
+        from sale.reports import save_report
+
+        sales = Sale.objects.filter(cash_register=OuterRef('pk'))
+        details = SaleDetail.objects.filter(sale__cash_register=OuterRef('pk'))
+        purchases = Purchase.objects.filter(cash_register=OuterRef('pk'))
+
+        with transaction.atomic():
+            row = (
+                CashRegister.objects.select_for_update(of=('self',))
+                .filter(pk=self.pk)
+                .annotate(
+                    sales_count=_per_register(sales, 'cash_register', Count('pk'), models.IntegerField()),
+                    paid_total=_per_register(sales, 'cash_register', Sum('paid_amount'), MONEY),
+                    details_total=_per_register(details, 'sale__cash_register', Sum('subtotal'), MONEY),
+                    items_sold=_per_register(details, 'sale__cash_register', Sum('quantity'), models.IntegerField()),
+                    purchases_sum=_per_register(purchases, 'cash_register', Sum('total_amount'), MONEY),
+                )
+                .values('closing', 'sales_total', 'purchases_total', 'sales_count', 'paid_total',
+                        'details_total', 'items_sold', 'purchases_sum')
+                .get()
+            )
+            if row['closing']:
+                raise ValueError("La caja ya está cerrada.")
+
+            recorded = row['sales_total'] - row['purchases_total']
+            reconciled = row['paid_total'] - row['purchases_sum']
+            self.closing = timezone.now()
+            self.sales_total = row['paid_total']
+            self.purchases_total = row['purchases_sum']
+            self.total = reconciled
+            self.discrepancy = recorded - reconciled
+            self.save(update_fields=['closing', 'sales_total', 'purchases_total', 'total', 'discrepancy', 'updated_at'])
+            # La caja ya no recibe ventas: su reporte no vuelve a cambiar
+            save_report(self)
+
+        return {
+            'sales_count': row['sales_count'],
+            'items_sold': row['items_sold'],
+            'sales_total': row['paid_total'],
+            'details_total': row['details_total'],
+            'purchases_total': row['purchases_sum'],
+            'total': reconciled,
+            'recorded_total': recorded,
+            'discrepancy': self.discrepancy,
+        }
 
     def __str__(self):
         return f"Cash Register #{self.id}"
 
 
+class CashRegisterReport(models.Model):
+    """Reporte final de una caja cerrada (sale.reports), calculado una sola vez al cerrarla."""
+    cash_register = models.OneToOneField(CashRegister, on_delete=models.CASCADE, primary_key=True, related_name='+')
+    data = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'sale_cash_register_reports'
+
+    def __str__(self):
+        return f"Reporte de {self.cash_register_id}"
+
+
 class Sale(BaseModel):
-    code = models.CharField(max_length=20, unique=True)
+    # La tabla está particionada por mes, así que sus restricciones únicas (y la clave
+    # primaria) tienen que incluir created_at. La unicidad global del código y del id
+    # la garantiza SaleCode, que un trigger mantiene en cada INSERT/UPDATE/DELETE.
+    code = models.CharField(max_length=20)
     paid_amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     nit = models.CharField(max_length=50)
 
     customer = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sales', limit_choices_to={'role': 'customer'})
     cash_register = models.ForeignKey(CashRegister, on_delete=models.CASCADE, related_name='sales', null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # Soporta la paginación por cursor sobre (created_at, id)
+            models.Index(fields=['created_at', 'id']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['code', 'created_at'], name='sale_code_created_uniq'),
+        ]
+
     def __str__(self):
         return f"Sale {self.code}"
 
 
 class SaleDetail(BaseModel):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='sale_details')
-    sale = models.ForeignKey(Sale, on_delete=models.CASCADE, related_name='details')
+    # Sin FK en la base de datos: no se puede referenciar una tabla particionada solo por id.
+    # La reemplaza un trigger que rechaza detalles de ventas inexistentes al insertar
+    # (partitioning.integrity); los huérfanos posteriores (ej: al archivar) los reporta
+    # `manage.py check_sale_integrity`.
+    sale = models.ForeignKey(Sale, on_delete=models.CASCADE, related_name='details', db_constraint=False)
     quantity = models.PositiveIntegerField()
     price = models.DecimalField(max_digits=10, decimal_places=2)
     discount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
@@ -44,3 +166,52 @@ class SaleDetail(BaseModel):
 
     def __str__(self):
         return f"{self.quantity} x {self.product.name}"
+
+
+class SaleCode(models.Model):
+    """
+    Registro global (sin particionar) de los códigos e ids de venta. Lo llena
+    un trigger sobre sale_sale, así que cualquier inserción con un código o id
+    repetido falla, venga del ORM, de bulk_create o de SQL directo. Las ventas
+    archivadas conservan su fila: el código sigue reservado.
+    """
+    code = models.CharField(max_length=20, primary_key=True)
+    sale_id = models.UUIDField(unique=True)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'sale_codes'
+
+    def __str__(self):
+        return self.code
+
+
+class IdempotencyKey(models.Model):
+    """
+    Respuesta guardada de un POST /api/sales/ enviado con la cabecera
+    Idempotency-Key. El índice único (user, key) hace que un reintento
+    concurrente espere a que termine la primera petición.
+
+    Las idempotency_key de POST /api/sales/batch/ se guardan con BATCH_PREFIX:
+    su respuesta tiene otro formato y no debe repetirse en el otro endpoint.
+    """
+    BATCH_PREFIX = 'batch:'
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    key = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=32)
+    status_code = models.PositiveSmallIntegerField(null=True)
+    response_body = models.JSONField(encoder=DjangoJSONEncoder, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'sale_idempotency_keys'
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='sale_idempotency_user_key_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.key} ({self.status_code})"
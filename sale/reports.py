@@ -0,0 +1,99 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+
+from inventory.models import Category, Product
+from sale.models import CashRegisterReport, Sale, SaleDetail
+
+# Un solo recorrido de los detalles de la caja: GROUPING SETS devuelve a la vez
+# las filas por producto, por categoría y el total general.
+_REPORT_SQL = f"""
+    SELECT
+        GROUPING(p.id) AS by_category,
+        GROUPING(c.id) AS grand_total,
+        p.id, p.name, c.id, c.name,
+        COUNT(DISTINCT d.sale_id),
+        COALESCE(SUM(d.quantity), 0),
+        COALESCE(SUM(d.price * d.quantity), 0),
+        COALESCE(SUM(d.price * d.quantity - d.subtotal), 0),
+        COALESCE(SUM(d.subtotal), 0)
+    FROM {SaleDetail._meta.db_table} d
+    JOIN {Sale._meta.db_table} s ON s.id = d.sale_id
+    JOIN {Product._meta.db_table} p ON p.id = d.product_id
+    JOIN {Category._meta.db_table} c ON c.id = p.category_id
+    WHERE s.cash_register_id = %s
+    GROUP BY GROUPING SETS ((c.id, c.name, p.id, p.name), (c.id, c.name), ())
+"""
+
+
+def _totals(row):
+    tickets, quantity, gross, discounts, net = row
+    return {
+        'tickets': tickets,
+        'quantity': quantity,
+        'gross': gross,
+        'discounts': discounts,
+        'net': net,
+    }
+
+
+def build_report(cash_register) -> dict:
+    """Ventas de la caja por producto y por categoría, descuentos y cantidad de tickets."""
+    with connection.cursor() as cursor:
+        cursor.execute(_REPORT_SQL, [cash_register.pk])
+        rows = cursor.fetchall()
+
+    report = {
+        'cash_register': cash_register.pk,
+        'opening': cash_register.opening,
+        'closing': cash_register.closing,
+        'summary': _totals((0, 0, 0, 0, 0)),
+        'by_category': [],
+        'by_product': [],
+    }
+    for by_category, grand_total, product_id, product_name, category_id, category_name, *values in rows:
+        if grand_total:
+            report['summary'] = _totals(values)
+        elif by_category:
+            report['by_category'].append({'id': category_id, 'name': category_name, **_totals(values)})
+        else:
+            report['by_product'].append({
+                'id': product_id,
+                'name': product_name,
+                'category': category_id,
+                **_totals(values),
+            })
+
+    report['by_category'].sort(key=lambda item: item['net'], reverse=True)
+    report['by_product'].sort(key=lambda item: item['net'], reverse=True)
+    return report
+
+
+def _as_json(report) -> dict:
+    # Mismo formato (montos como texto) para un reporte recién calculado que para uno guardado
+    return json.loads(json.dumps(report, cls=DjangoJSONEncoder))
+
+
+def save_report(cash_register) -> dict:
+    """Calcula y guarda el reporte de una caja ya cerrada (lo llama CashRegister.close_register)."""
+    report = _as_json(build_report(cash_register))
+    CashRegisterReport.objects.update_or_create(cash_register_id=cash_register.pk, defaults={'data': report})
+    return report
+
+
+def register_report(cash_register) -> dict:
+    """
+    Reporte de la caja. El de una caja cerrada se guarda en la base de datos
+    al cerrarla (CashRegisterReport), así que no depende de la cache de cada
+    worker ni se pierde al reiniciar; el de una caja abierta se calcula en
+    cada llamada.
+    """
+    if not cash_register.closing:
+        return _as_json(build_report(cash_register))
+
+    stored = CashRegisterReport.objects.filter(cash_register_id=cash_register.pk).values_list('data', flat=True).first()
+    if stored is None:
+        # Cajas cerradas antes de que existiera la tabla de reportes
+        stored = save_report(cash_register)
+    return stored
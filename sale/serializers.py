@@ -2,13 +2,43 @@ from rest_framework import serializers
 from django.utils import timezone
 from django.db import transaction
 from decimal import Decimal
+from collections import Counter
 
-from sale.models import Sale, SaleDetail, CashRegister
+from sale.models import Sale, SaleDetail, CashRegister, IdempotencyKey
 from user.models import User
 from user.serializers import UserSerializer
 from inventory.models import Product
+from inventory.stock import decrement_stock, InsufficientStock
 from inventory.serializers import ProductSerializer
-
+from numbering.allocator import allocate_one, SALE
+from analytics.rollups import record_sales
+
+
+def build_details(lines, products):
+    """
+    Arma los SaleDetail (sin guardar) de una venta aplicando el descuento activo
+    de cada producto. `lines` es [(product_id, cantidad, precio)] y `products`
+    el diccionario de productos ya bloqueados. Retorna (detalles, total).
+    """
+    total = Decimal(0)
+    details = []
+    for product_id, quantity, price in lines:
+        product = products[product_id]
+
+        discount = Decimal(0)
+        if product.discount and product.discount.is_active:
+            discount = product.discount.percentage
+
+        subtotal = (price - (price * discount / 100)) * quantity
+        details.append(SaleDetail(
+            product=product,
+            quantity=quantity,
+            price=price,
+            discount=discount,
+            subtotal=subtotal
+        ))
+        total += subtotal
+    return details, total
 
 
 class SaleDetailSerializer(serializers.ModelSerializer):
@@ -60,12 +90,8 @@ class SaleSerializer(serializers.ModelSerializer):
         return value
 
     def generate_code(self):
-        last_sale = Sale.objects.order_by('-created_at').first()
-        if last_sale and last_sale.code.isdigit():
-            next_number = int(last_sale.code) + 1
-        else:
-            next_number = 1
-        return str(next_number).zfill(10)
+        # Debe llamarse dentro de la transacción de la venta: el número se libera si hace rollback
+        return allocate_one(SALE)
 
     def create(self, validated_data):
         details_data = validated_data.pop('details', [])
@@ -74,47 +100,58 @@ class SaleSerializer(serializers.ModelSerializer):
         if not details_data:
             raise serializers.ValidationError("Debe incluir al menos un detalle de venta.")
 
+        quantities = Counter()
+        for detail in details_data:
+            quantities[detail['product'].pk] += detail['quantity']
+
         with transaction.atomic():
-            total_sale_amount = Decimal(0)
+            # Bloquea los productos en orden de id y descuenta el stock en un solo UPDATE
+            try:
+                products = decrement_stock(quantities)
+            except InsufficientStock as e:
+                raise serializers.ValidationError(str(e))
+
+            details, total_sale_amount = build_details(
+                [(detail['product'].pk, detail['quantity'], detail['price']) for detail in details_data],
+                products
+            )
+
+            # Totales de la caja con incrementos atómicos (F), sin leer y reescribir la fila.
+            # Va antes del código y los rollups: el orden de bloqueo es productos → caja →
+            # contador → rollups, igual que en los lotes (sale.batch), para no cruzarse con ellos
+            if cash_register and not cash_register.record_sale(total_sale_amount):
+                raise serializers.ValidationError("La caja está cerrada.")
+
             validated_data['code'] = self.generate_code()
+            validated_data['paid_amount'] = total_sale_amount
             sale = Sale.objects.create(**validated_data)
 
-            for detail in details_data:
-                product = detail['product']
-                quantity = detail['quantity']
-                price = detail['price']
+            for detail in details:
+                detail.sale = sale
+            SaleDetail.objects.bulk_create(details)
+            record_sales([(sale, details)])
 
-                if product.stock < quantity:
-                    raise serializers.ValidationError(f"Stock insuficiente para el producto: {product.name}")
-
-                discount = Decimal(0)
-                if product.discount and product.discount.is_active:
-                    discount = product.discount.percentage
-
-                subtotal = (price - (price * discount / 100)) * quantity
+            return sale
 
-                SaleDetail.objects.create(
-                    sale=sale,
-                    product=product,
-                    quantity=quantity,
-                    price=price,
-                    discount=discount,
-                    subtotal=subtotal
-                )
 
-                product.stock -= quantity
-                product.save()
-                total_sale_amount += subtotal
+class SaleBatchLineSerializer(serializers.Serializer):
+    product = serializers.UUIDField()
+    quantity = serializers.IntegerField(min_value=1, error_messages={'min_value': "La cantidad debe ser mayor que cero."})
+    price = serializers.DecimalField(max_digits=10, decimal_places=2)
 
-            sale.paid_amount = total_sale_amount
-            sale.save()
+    def validate_price(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("El precio debe ser mayor que cero.")
+        return value
 
-            if cash_register:
-                cash_register.sales_total += total_sale_amount
-                cash_register.total += total_sale_amount
-                cash_register.save()
 
-            return sale
+class SaleBatchItemSerializer(serializers.Serializer):
+    """Una venta de POST /api/sales/batch/; solo valida el formato, sin consultas."""
+    nit = serializers.CharField(max_length=50, error_messages={'max_length': "El NIT no puede exceder los 50 caracteres."})
+    customer = serializers.UUIDField()
+    cash_register = serializers.UUIDField(required=False, allow_null=True)
+    idempotency_key = serializers.CharField(max_length=255 - len(IdempotencyKey.BATCH_PREFIX), required=False)
+    details = SaleBatchLineSerializer(many=True, allow_empty=False)
 
 
 class CashRegisterSerializer(serializers.ModelSerializer):
@@ -123,7 +160,7 @@ class CashRegisterSerializer(serializers.ModelSerializer):
     class Meta:
         model = CashRegister
         fields = '__all__'
-        read_only_fields = ['id', 'opening', 'closing', 'sales_total', 'purchases_total', 'total', 'user']
+        read_only_fields = ['id', 'opening', 'closing', 'sales_total', 'purchases_total', 'total', 'discrepancy', 'user']
     
     def create(self, validated_data):
         # Automatically set opening time to now and set totals to 0
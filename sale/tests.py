@@ -0,0 +1,57 @@
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from inventory.models import Category, Product
+from sale.models import CashRegister, Sale, SaleDetail
+from user.models import User
+
+
+class SaleListQueryCountTests(TestCase):
+    """El listado de ventas carga sus relaciones anidadas en una cantidad fija de consultas (config.eager)."""
+
+    # Página de ventas y un prefetch de detalles con producto, categoría y descuento en JOIN
+    # (el conteo total se omite con count=false porque se guarda en cache entre llamadas)
+    EXPECTED_QUERIES = 2
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('1000000', 'admin@test.com', 'Admin', '7000000', 'administrator', 'x')
+        cashier = User.objects.create_user('2000000', 'cajero@test.com', 'Cajero', '7000001', 'cashier', 'x')
+        cls.customer = User.objects.create_user('3000000', 'cliente@test.com', 'Cliente', '7000002', 'customer', 'x')
+        register = CashRegister.objects.create(user=cashier, opening=timezone.now())
+        category = Category.objects.create(name='Bebidas')
+        cls.products = [
+            Product.objects.create(name=f'Producto {i}', purchase_price=1, sale_price=2, category=category, stock=100)
+            for i in range(3)
+        ]
+        cls.register = register
+
+    def _create_sales(self, count):
+        sales = Sale.objects.bulk_create([
+            Sale(code=f'T{i:09d}', paid_amount=4, nit='0', customer=self.customer, cash_register=self.register)
+            for i in range(count)
+        ])
+        SaleDetail.objects.bulk_create([
+            SaleDetail(sale=sale, product=product, quantity=1, price=2, discount=0, subtotal=2)
+            for sale in sales
+            for product in self.products[:2]
+        ])
+
+    def _list(self, limit):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        with self.assertNumQueries(self.EXPECTED_QUERIES):
+            response = client.get('/api/sales/', {'limit': limit, 'count': 'false'})
+        self.assertEqual(response.status_code, 200)
+        return response.json()['data']
+
+    def test_page_of_100_sales_uses_constant_queries(self):
+        self._create_sales(100)
+        data = self._list(100)
+        self.assertEqual(len(data), 100)
+        self.assertEqual(len(data[0]['details']), 2)
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        self._create_sales(10)
+        self.assertEqual(len(self._list(10)), 10)
@@ -1,19 +1,38 @@
-from rest_framework import viewsets
+import hashlib
+import json
+
+from rest_framework import viewsets, serializers
+from rest_framework.response import Response
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.decorators import action
 from django.db import transaction
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
 from django.utils import timezone
-from django.db.models import Q, Case, When, IntegerField, Value as V
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from datetime import datetime
 
-from sale.models import Sale, CashRegister
+from sale.models import Sale, SaleDetail, CashRegister, IdempotencyKey
 from sale.serializers import SaleSerializer, SaleDetailSerializer, CashRegisterSerializer
+from sale.reports import register_report
+from sale.batch import create_sales_batch, MAX_BATCH_SALES
 from inventory.models import Product
 from config.response import response
-from user.permissions import IsAdminOrCashier, IsAdminOrCustomerOrCashier
+from config.listing import ListQueryMixin, EXACT, PREFIX, CONTAINS
+from config.eager import eager_load
+from config.export import export_response, filter_date_range, ExportError
+from user.permissions import IsAdminOrCashier, IsAdminOrCustomerOrCashier, IsAdministrator
 from config.response import StandardResponseSerializerSuccess, StandardResponseSerializerError, StandardResponseSerializerSuccessList
 
+SALE_EXPORT_FIELDS = [
+    'code', 'created_at', 'nit', 'paid_amount',
+    'customer__ci', 'customer__name', 'cash_register', 'cash_register__user__name',
+]
+SALE_LINE_EXPORT_FIELDS = [
+    'sale__code', 'sale__created_at', 'sale__nit', 'product', 'product__name',
+    'product__category__name', 'quantity', 'price', 'discount', 'subtotal',
+]
+
 @extend_schema(
     request=SaleSerializer,
     responses={
@@ -22,16 +41,26 @@ from config.response import StandardResponseSerializerSuccess, StandardResponseS
         404: StandardResponseSerializerError
     }
 )
-class SaleViewSet(viewsets.ModelViewSet):
+class SaleViewSet(ListQueryMixin, viewsets.ModelViewSet):
     queryset = Sale.objects.all()
     serializer_class = SaleSerializer
+    filter_fields = {
+        'code': PREFIX,
+        'nit': PREFIX,
+        'paid_amount': EXACT,
+        'customer': EXACT,
+        'cash_register': EXACT,
+    }
+    order_fields = ('created_at', 'code', 'paid_amount')
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAdminOrCustomerOrCashier]
 
     @extend_schema(
         parameters=[
             OpenApiParameter(name='limit', description='Cantidad de resultados', required=False, type=int),
+            OpenApiParameter(name='count', description='Calcular el total de resultados (true/false, por defecto true)', required=False, type=str),
             OpenApiParameter(name='offset', description='Inicio del listado', required=False, type=int),
+            OpenApiParameter(name='cursor', description='Cursor opaco de la página siguiente (vacío para la primera página)', required=False, type=str),
             OpenApiParameter(name='order', description='Campo de ordenamiento (ej: +name, -email)', required=False, type=str),
             OpenApiParameter(name='attr', description='Campo para filtrar (ej: code, paid_amount)', required=False, type=str),
             OpenApiParameter(name='value', description='Valor del campo a filtrar', required=False, type=str),
@@ -42,90 +71,129 @@ class SaleViewSet(viewsets.ModelViewSet):
             500: StandardResponseSerializerError
         }
     )
-    def list(self, request):
-        try:
-            # Query básica para obtener todas las ventas
-            queryset = Sale.objects.all()
-
-            # Filtrado por parámetros adicionales
-            attr = request.query_params.get('attr')
-            value = request.query_params.get('value')
-
-            if attr and value and hasattr(Sale, attr):
-                # Filtrado usando "contains" o "starts with"
-                starts_with_filter = {f"{attr}__istartswith": value}
-                contains_filter = {f"{attr}__icontains": value}
-                queryset = queryset.filter(Q(**contains_filter))
-                
-                # Ordenar por relevancia si el valor empieza con el texto
-                queryset = queryset.annotate(
-                    relevance=Case(
-                        When(**starts_with_filter, then=V(0)),
-                        default=V(1),
-                        output_field=IntegerField()
-                    )
-                ).order_by('relevance')
-
-            elif attr and not hasattr(Sale, attr):
-                return response(
-                    400,
-                    f"El campo '{attr}' no es válido para filtrado"
-                )
-
-            # Ordenar resultados
-            order = request.query_params.get('order')
-            if order:
-                try:
-                    queryset = queryset.order_by(order)
-                except Exception:
-                    return response(
-                        400,
-                        f"No se pudo ordenar por '{order}'"
-                    )
-
-            # Paginación: limit y offset
-            limit = request.query_params.get('limit')
-            offset = request.query_params.get('offset', 0)
-
-            if limit is not None:
-                try:
-                    limit = int(limit)
-                    offset = int(offset)
-                    queryset = queryset[offset:offset+limit]
-                except ValueError:
-                    return response(
-                        400,
-                        "Los valores de limit y offset deben ser enteros"
-                    )
-
-            # Serializar datos
-            serializer = SaleSerializer(queryset, many=True)
-            return response(
-                200,
-                "Ventas encontradas",
-                data=serializer.data,
-                count_data=len(queryset)
-            )
-
-        except Exception as e:
-            return response(
-                500,
-                f"Error al obtener ventas: {str(e)}"
-            )
+    def list(self, request, *args, **kwargs):
+        return self.list_response(request, "Ventas encontradas", "Error al obtener ventas")
 
     def retrieve(self, request, pk=None):
         try:
-            sale = Sale.objects.get(pk=pk)
+            sale = eager_load(Sale.objects.all(), SaleSerializer).get(pk=pk)
             serializer = SaleSerializer(sale)
             return response(200, "Venta encontrada", data=serializer.data)
         except Sale.DoesNotExist:
             return response(404, "Venta no encontrada")
 
+    @extend_schema(
+        description="Exporta las ventas en streaming (CSV o NDJSON), sin cargarlas en memoria.",
+        parameters=[
+            OpenApiParameter(name='from', description='Primer día (YYYY-MM-DD)', required=False, type=str),
+            OpenApiParameter(name='to', description='Último día inclusive (YYYY-MM-DD)', required=False, type=str),
+            OpenApiParameter(name='output', description='Formato: csv o ndjson (por defecto csv)', required=False, type=str),
+            OpenApiParameter(name='gzip', description='Comprimir la descarga (true/false)', required=False, type=str),
+            OpenApiParameter(name='lines', description='Una fila por detalle en vez de una por venta (true/false)', required=False, type=str),
+        ],
+        responses={
+            200: None,
+            400: StandardResponseSerializerError,
+        }
+    )
+    @action(detail=False, methods=['get'], url_path='export', permission_classes=[IsAdministrator])
+    def export(self, request):
+        try:
+            if request.query_params.get('lines', 'false').lower() == 'true':
+                queryset = filter_date_range(SaleDetail.objects.all(), request, 'sale__created_at')
+                queryset = queryset.order_by('sale__created_at', 'sale_id', 'id')
+                fields = SALE_LINE_EXPORT_FIELDS
+            else:
+                queryset = filter_date_range(Sale.objects.all(), request).order_by('created_at', 'id')
+                fields = SALE_EXPORT_FIELDS
+            return export_response(request, queryset, fields, f"ventas_{timezone.localdate():%Y%m%d}")
+        except ExportError as e:
+            return response(400, str(e))
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(name='Idempotency-Key', location=OpenApiParameter.HEADER, required=False, type=str,
+                             description='Clave única por venta; los reintentos con la misma clave devuelven la respuesta original'),
+        ],
+    )
     def create(self, request):
+        key = request.headers.get('Idempotency-Key')
+        if not key:
+            return self._create_sale(request)
+        if len(key) > 255:
+            return response(400, "La cabecera Idempotency-Key no puede exceder los 255 caracteres.")
+        if key.startswith(IdempotencyKey.BATCH_PREFIX):
+            # Reservado para las claves de /api/sales/batch/, que guardan otro formato
+            return response(400, f"La cabecera Idempotency-Key no puede empezar con '{IdempotencyKey.BATCH_PREFIX}'.")
+
+        request_hash = hashlib.md5(
+            json.dumps(request.data, sort_keys=True, cls=DjangoJSONEncoder).encode()
+        ).hexdigest()
+        try:
+            with transaction.atomic():
+                # Si otra petición con la misma clave está en curso, el INSERT espera a
+                # que termine; luego se encuentra su registro ya confirmado.
+                record, created = IdempotencyKey.objects.get_or_create(
+                    user=request.user, key=key, defaults={'request_hash': request_hash}
+                )
+                if not created:
+                    if record.request_hash != request_hash:
+                        return response(422, "La Idempotency-Key ya se usó con otros datos de venta.")
+                    return Response(record.response_body, status=record.status_code,
+                                    headers={'Idempotent-Replayed': 'true'})
+
+                result = self._create_sale(request)
+                if result.status_code == 201:
+                    record.status_code = result.status_code
+                    record.response_body = result.data
+                    record.save(update_fields=['status_code', 'response_body'])
+                else:
+                    # Los errores no se guardan: el cliente puede corregir y reintentar con la misma clave
+                    transaction.set_rollback(True)
+                return result
+        except Exception as e:
+            return response(500, f"Error al crear la venta: {str(e)}")
+
+    @extend_schema(
+        description="Crea en una sola petición las ventas que un terminal acumuló sin conexión. "
+                    "Cada venta se acepta o rechaza por separado; cada una puede traer su propia "
+                    "idempotency_key para que reenviar el lote no duplique ventas.",
+        request={
+            "type": "object",
+            "properties": {
+                "sales": {"type": "array", "items": {"type": "object"}},
+            },
+            "required": ["sales"]
+        },
+        responses={
+            200: StandardResponseSerializerSuccess,
+            400: StandardResponseSerializerError,
+            500: StandardResponseSerializerError
+        }
+    )
+    @action(detail=False, methods=['post'], url_path='batch', permission_classes=[IsAdminOrCashier])
+    def batch(self, request):
+        sales = request.data.get('sales') if isinstance(request.data, dict) else request.data
+        if not isinstance(sales, list) or not sales:
+            return response(400, "Debe enviar una lista de ventas en 'sales'.")
+        if len(sales) > MAX_BATCH_SALES:
+            return response(400, f"El lote no puede tener más de {MAX_BATCH_SALES} ventas.")
+
+        try:
+            results = create_sales_batch(request.user, sales)
+            created = sum(1 for result in results if result['status'] == 201)
+            return response(200, f"Lote procesado: {created} de {len(sales)} ventas aceptadas", data={
+                'accepted': created,
+                'rejected': len(sales) - created,
+                'results': results,
+            })
+        except Exception as e:
+            return response(500, f"Error al procesar el lote de ventas: {str(e)}")
+
+    def _create_sale(self, request):
         data = request.data
         cash_register_id = data.get('cash_register')
         customer_id = data.get('customer')
-        print(f"Data: {cash_register_id}")
 
         try:
             # Validar caja
@@ -147,11 +215,12 @@ class SaleViewSet(viewsets.ModelViewSet):
 
                 return response(400, "Errores de validación en la venta", error=serializer.errors)
 
+        except serializers.ValidationError as e:
+            # Stock insuficiente o caja cerrada durante la venta: el atomic ya revirtió todo
+            return response(400, "Errores de validación en la venta", error=e.detail)
         except Exception as e:
-            transaction.set_rollback(True)
             return response(500, f"Error al crear la venta: {str(e)}")
 
-
 @extend_schema(
     request=CashRegisterSerializer,
     responses={
@@ -161,16 +230,20 @@ class SaleViewSet(viewsets.ModelViewSet):
         403: StandardResponseSerializerError
     }
 )
-class CashRegisterViewSet(viewsets.ModelViewSet):
+class CashRegisterViewSet(ListQueryMixin, viewsets.ModelViewSet):
     queryset = CashRegister.objects.all()
     serializer_class = CashRegisterSerializer
+    filter_fields = {'user': EXACT, 'observations': CONTAINS}
+    order_fields = ('created_at', 'opening', 'closing', 'sales_total', 'total')
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAdminOrCashier]
 
     @extend_schema(
         parameters=[
             OpenApiParameter(name='limit', description='Cantidad de resultados', required=False, type=int),
+            OpenApiParameter(name='count', description='Calcular el total de resultados (true/false, por defecto true)', required=False, type=str),
             OpenApiParameter(name='offset', description='Inicio del listado', required=False, type=int),
+            OpenApiParameter(name='cursor', description='Cursor opaco de la página siguiente (vacío para la primera página)', required=False, type=str),
             OpenApiParameter(name='order', description='Campo de ordenamiento (ej: +name, -email)', required=False, type=str),
             OpenApiParameter(name='attr', description='Campo para filtrar (ej: code, paid_amount)', required=False, type=str),
             OpenApiParameter(name='value', description='Valor del campo a filtrar', required=False, type=str),
@@ -181,83 +254,37 @@ class CashRegisterViewSet(viewsets.ModelViewSet):
             500: StandardResponseSerializerError
         }
     )
-    def list(self, request):
-        try:
-            # Query básica para obtener todas las cajas
-            queryset = CashRegister.objects.all()
-            
-            # Filtrado por parámetros adicionales
-            attr = request.query_params.get('attr')
-            value = request.query_params.get('value')
-            if attr and value and hasattr(CashRegister, attr):
-                # Filtrado usando "contains" y "starts with"
-                starts_with_filter = {f"{attr}__istartswith": value}
-                contains_filter = {f"{attr}__icontains": value}
-
-                # Filtrar por "contains" y usar "starts_with" para orden
-                queryset = queryset.filter(Q(**contains_filter))
-
-                # Ordenar por relevancia si el valor empieza con el texto
-                queryset = queryset.annotate(
-                    relevance=Case(
-                        When(**starts_with_filter, then=V(0)),
-                        default=V(1),
-                        output_field=IntegerField()
-                    )
-                ).order_by('relevance')                
-            elif attr and not hasattr(CashRegister, attr):
-                return response(
-                    400,
-                    f"El campo '{attr}' no es válido para filtrado"
-                )   
+    def list(self, request, *args, **kwargs):
+        return self.list_response(request, "Cajas encontradas", "Error al obtener cajas")
 
-            # Ordenar resultados
-            order = request.query_params.get('order')
-            if order:
-                try:
-                    queryset = queryset.order_by(order)
-                except Exception:
-                    return response(
-                        400,
-                        f"No se pudo ordenar por '{order}'"
-                    )   
-                
-            # Paginación: limit y offset
-            limit = request.query_params.get('limit')
-            offset = request.query_params.get('offset', 0)
-            
-            if limit is not None:
-                try:
-                    limit = int(limit)
-                    offset = int(offset)
-                    queryset = queryset[offset:offset+limit]
-                except ValueError:
-                    return response(
-                        400,
-                        "Los valores de limit y offset deben ser enteros"
-                    )
-                
-            # Serializar datos
-            serializer = CashRegisterSerializer(queryset, many=True)
-            return response(
-                200,
-                "Cajas encontradas",
-                data=serializer.data,
-                count_data=len(queryset)
-            )
-        except Exception as e:
-            return response(
-                500,
-                f"Error al obtener cajas: {str(e)}"
-            )
     def retrieve(self, request, pk=None):
         try:
-            cash_register = CashRegister.objects.get(pk=pk)
+            cash_register = eager_load(CashRegister.objects.all(), CashRegisterSerializer).get(pk=pk)
             serializer = CashRegisterSerializer(cash_register)
             return response(200, "Caja encontrada", data=serializer.data)
         except CashRegister.DoesNotExist:
             return response(404, "Caja no encontrada")
 
+    @extend_schema(
+        description="Reporte del turno de la caja: ventas por producto y por categoría, descuentos "
+                    "otorgados y cantidad de tickets. Se calcula en una sola consulta agrupada y, "
+                    "al cerrar la caja, se guarda para no volver a calcularlo.",
+        responses={
+            200: StandardResponseSerializerSuccess,
+            404: StandardResponseSerializerError,
+            500: StandardResponseSerializerError
+        },
+    )
+    @action(detail=True, methods=["get"], url_path="report", permission_classes=[IsAdminOrCashier])
+    def report(self, request, pk=None):
+        try:
+            cash_register = CashRegister.objects.only('id', 'opening', 'closing').get(pk=pk)
+            return response(200, "Reporte de caja generado", data=register_report(cash_register))
+        except (CashRegister.DoesNotExist, ValidationError):
+            return response(404, "Caja no encontrada")
+        except Exception as e:
+            return response(500, f"Error al generar el reporte de caja: {str(e)}")
+
     def create(self, request):
         data = request.data.copy()
         user = request.user
@@ -300,8 +327,10 @@ class CashRegisterViewSet(viewsets.ModelViewSet):
             return response(500, f"Error al validar la caja del usuario: {str(e)}")
 
     @extend_schema(
+        description="Cierra la caja abierta del usuario y retorna la conciliación de sus totales "
+                    "(recalculados desde las ventas y compras) junto con la discrepancia encontrada.",
         responses={
-            200: SaleDetailSerializer, 
+            200: StandardResponseSerializerSuccess, 
             404: StandardResponseSerializerError, 
             500: StandardResponseSerializerError
         },
@@ -315,11 +344,14 @@ class CashRegisterViewSet(viewsets.ModelViewSet):
             if not cash_register:
                 return response(404, "No se encontró una caja abierta para este usuario.")
 
-            if cash_register.closing:
+            try:
+                summary = cash_register.close_register()
+            except ValueError:
                 return response(400, "La caja ya está cerrada.")
 
-            cash_register.close_register()
-            return response(200, "Caja cerrada correctamente.")
+            summary['id'] = cash_register.id
+            summary['closing'] = cash_register.closing
+            return response(200, "Caja cerrada correctamente.", data=summary)
         except Exception as e:
             return response(500, f"Error al cerrar la caja: {str(e)}")
 
@@ -0,0 +1,24 @@
+from django.db import models
+
+
+class Tombstone(models.Model):
+    """Registro de un borrado para que los terminales lo apliquen en el delta-sync."""
+    ENTITIES = (
+        ('product', 'Producto'),
+        ('category', 'Categoría'),
+        ('discount', 'Descuento'),
+        ('customer', 'Cliente'),
+    )
+
+    entity = models.CharField(max_length=20, choices=ENTITIES)
+    object_id = models.UUIDField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'sync_tombstones'
+        indexes = [
+            models.Index(fields=['deleted_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.entity} {self.object_id} eliminado"
@@ -0,0 +1,27 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from inventory.models import Product, Category, Discount
+from user.models import User
+from sync.models import Tombstone
+
+
+@receiver(post_delete, sender=Product)
+def product_deleted(sender, instance, **kwargs):
+    Tombstone.objects.create(entity='product', object_id=instance.pk)
+
+
+@receiver(post_delete, sender=Category)
+def category_deleted(sender, instance, **kwargs):
+    Tombstone.objects.create(entity='category', object_id=instance.pk)
+
+
+@receiver(post_delete, sender=Discount)
+def discount_deleted(sender, instance, **kwargs):
+    Tombstone.objects.create(entity='discount', object_id=instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def customer_deleted(sender, instance, **kwargs):
+    if instance.role == 'customer':
+        Tombstone.objects.create(entity='customer', object_id=instance.pk)
@@ -0,0 +1,83 @@
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+
+from inventory.models import Product, Category, Discount
+from inventory.serializers import ProductSerializer, CategorySerializer, DiscountSerializer
+from user.models import User
+from user.serializers import UserSerializer
+from user.permissions import IsAdminOrCashier
+from sync.models import Tombstone
+from config.eager import eager_load
+from config.response import response, StandardResponseSerializerSuccess, StandardResponseSerializerError
+
+# Margen para no perder filas cuyo updated_at se asignó antes de la marca
+# pero cuya transacción se confirmó después; los upserts repetidos son inocuos.
+SYNC_OVERLAP = timedelta(seconds=getattr(settings, 'SYNC_OVERLAP_SECONDS', 5))
+
+
+@extend_schema(
+    tags=['Sincronización'],
+    parameters=[
+        OpenApiParameter(name='since', description='Marca de agua (ISO 8601) devuelta por la sincronización anterior; omitir para una carga completa', required=False, type=str),
+    ],
+    responses={
+        200: StandardResponseSerializerSuccess,
+        400: StandardResponseSerializerError
+    }
+)
+class SyncView(APIView):
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAdminOrCashier]
+
+    def get(self, request):
+        since = request.query_params.get('since')
+        if since:
+            since = parse_datetime(since.replace(' ', '+'))
+            if since is None:
+                return response(400, "El parámetro since debe ser una fecha ISO 8601")
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since, dt_timezone.utc)
+
+        # La marca se toma antes de consultar: lo que cambie durante la consulta
+        # se volverá a enviar en la siguiente sincronización.
+        watermark = timezone.now()
+
+        def changed(queryset):
+            if since:
+                return queryset.filter(updated_at__gt=since - SYNC_OVERLAP)
+            return queryset
+
+        products = eager_load(changed(Product.objects.all()), ProductSerializer)
+        categories = changed(Category.objects.all())
+        discounts = changed(Discount.objects.all())
+        customers = changed(User.objects.filter(role='customer'))
+
+        deleted = {'products': [], 'categories': [], 'discounts': [], 'customers': []}
+        if since:
+            tombstones = Tombstone.objects.filter(deleted_at__gt=since - SYNC_OVERLAP)
+            for entity, object_id in tombstones.values_list('entity', 'object_id'):
+                deleted[f"{entity}s" if entity != 'category' else 'categories'].append(str(object_id))
+            # Los clientes se deshabilitan en lugar de borrarse
+            deleted['customers'].extend(
+                str(pk) for pk in customers.filter(is_active=False).values_list('id', flat=True)
+            )
+
+        return response(
+            200,
+            "Cambios obtenidos",
+            data={
+                'watermark': watermark.isoformat(),
+                'full': not since,
+                'products': ProductSerializer(products, many=True).data,
+                'categories': CategorySerializer(categories, many=True).data,
+                'discounts': DiscountSerializer(discounts, many=True).data,
+                'customers': UserSerializer(customers.filter(is_active=True), many=True).data,
+                'deleted': deleted,
+            }
+        )
@@ -46,6 +46,14 @@ class User(BaseModel, AbstractBaseUser, PermissionsMixin):
 
     objects = UserManager()
 
+    class Meta:
+        indexes = [
+            # Soporta la paginación por cursor sobre (created_at, id)
+            models.Index(fields=['created_at', 'id']),
+            # Delta-sync de terminales (/api/sync/)
+            models.Index(fields=['role', 'updated_at']),
+        ]
+
     def __str__(self):
         return f"{self.name} ({self.role})"
 
@@ -4,7 +4,6 @@ from rest_framework.decorators import action
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from drf_spectacular.utils import extend_schema, OpenApiParameter
-from django.db.models import Q, Case, When, IntegerField, Value as V
 from django.contrib.auth import authenticate
 
 from user.serializers import LoginSerializer
@@ -16,6 +15,7 @@ from .models import User
 from .serializers import UserSerializer
 from .utils import send_verification_email, verify_token
 from config.response import response, StandardResponseSerializerSuccess, StandardResponseSerializerSuccessList, StandardResponseSerializerError
+from config.listing import ListQueryMixin, EXACT, PREFIX, CONTAINS
 
 @extend_schema(
     tags=['Autenticación'],
@@ -183,8 +183,10 @@ class CheckTokenView(APIView):
         500: StandardResponseSerializerError
     }
 )
-class UserViewSet(viewsets.ModelViewSet):    
+class UserViewSet(ListQueryMixin, viewsets.ModelViewSet):    
     serializer_class = UserSerializer   
+    filter_fields = {'name': CONTAINS, 'email': PREFIX, 'ci': PREFIX, 'phone': PREFIX, 'role': EXACT}
+    order_fields = ('created_at', 'name', 'email', 'ci')
     authentication_classes = [JWTAuthentication] 
     permission_classes = [IsAdministrator]
 
@@ -206,7 +208,9 @@ class UserViewSet(viewsets.ModelViewSet):
     @extend_schema(
         parameters=[
             OpenApiParameter(name='limit', description='Cantidad de resultados', required=False, type=int),
+            OpenApiParameter(name='count', description='Calcular el total de resultados (true/false, por defecto true)', required=False, type=str),
             OpenApiParameter(name='offset', description='Inicio del listado', required=False, type=int),
+            OpenApiParameter(name='cursor', description='Cursor opaco de la página siguiente (vacío para la primera página)', required=False, type=str),
             OpenApiParameter(name='order', description='Campo de ordenamiento (ej: +name, -email)', required=False, type=str),
             OpenApiParameter(name='attr', description='Campo para filtrar (ej: name, role)', required=False, type=str),
             OpenApiParameter(name='value', description='Valor del campo a filtrar', required=False, type=str),
@@ -217,65 +221,11 @@ class UserViewSet(viewsets.ModelViewSet):
             500: StandardResponseSerializerError
         }
     )
-    def list(self, request):
-        try:
-            queryset = User.objects.filter(is_active=True, role__in=['cashier'])
-
-            attr = request.query_params.get('attr')
-            value = request.query_params.get('value')
-            if attr and value and hasattr(User, attr):
-                starts_with_filter = {f"{attr}__istartswith": value}
-                contains_filter = {f"{attr}__icontains": value}
-                queryset = queryset.filter(Q(**contains_filter))                
-                queryset = queryset.annotate(
-                    relevance=Case(
-                        When(**starts_with_filter, then=V(0)),
-                        default=V(1),
-                        output_field=IntegerField()
-                    )
-                ).order_by('relevance')                
-            elif attr and not hasattr(User, attr):
-                return response(
-                    400,
-                    f"El campo '{attr}' no es válido para filtrado"
-                )
-            order = request.query_params.get('order')
-            if order:
-                try:
-                    queryset = queryset.order_by(order)
-                except Exception:
-                    return response(
-                        400,
-                        f"No se pudo ordenar por '{order}'"
-                    )
-
-            limit = request.query_params.get('limit')
-            offset = request.query_params.get('offset', 0)
-
-            if limit is not None:
-                try:
-                    limit = int(limit)
-                    offset = int(offset)
-                    queryset = queryset[offset:offset+limit]
-                except ValueError:
-                    return response(
-                        400,
-                        "Los valores de limit y offset deben ser enteros"
-                    )
-
-            serializer = UserSerializer(queryset, many=True)
-            return response(
-                200,
-                "Usuarios encontrados",
-                data=serializer.data,
-                count_data=len(queryset)
-            )
+    def get_list_queryset(self):
+        return User.objects.filter(is_active=True, role__in=['cashier'])
 
-        except Exception as e:
-            return response(
-                500,
-                f"Error al obtener usuarios: {str(e)}"
-            )
+    def list(self, request, *args, **kwargs):
+        return self.list_response(request, "Usuarios encontrados", "Error al obtener usuarios")
 
     def retrieve(self, request, pk=None):
         try:
@@ -344,8 +294,10 @@ class UserViewSet(viewsets.ModelViewSet):
         500: StandardResponseSerializerError
     }
 )
-class CustomerViewSet(viewsets.ModelViewSet):
+class CustomerViewSet(ListQueryMixin, viewsets.ModelViewSet):
     serializer_class = UserSerializer
+    filter_fields = {'name': CONTAINS, 'email': PREFIX, 'ci': PREFIX, 'phone': PREFIX}
+    order_fields = ('created_at', 'name', 'email', 'ci')
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAdminOrCustomerOrCashier]
 
@@ -371,7 +323,9 @@ class CustomerViewSet(viewsets.ModelViewSet):
     @extend_schema(
         parameters=[
             OpenApiParameter(name='limit', description='Cantidad de resultados', required=False, type=int),
+            OpenApiParameter(name='count', description='Calcular el total de resultados (true/false, por defecto true)', required=False, type=str),
             OpenApiParameter(name='offset', description='Inicio del listado', required=False, type=int),
+            OpenApiParameter(name='cursor', description='Cursor opaco de la página siguiente (vacío para la primera página)', required=False, type=str),
             OpenApiParameter(name='order', description='Campo de ordenamiento (ej: +name, -email)', required=False, type=str),
             OpenApiParameter(name='attr', description='Campo para filtrar (ej: name, email)', required=False, type=str),
             OpenApiParameter(name='value', description='Valor del campo a filtrar', required=False, type=str),
@@ -382,48 +336,8 @@ class CustomerViewSet(viewsets.ModelViewSet):
             500: StandardResponseSerializerError
         }
     )
-    def list(self, request):
-        try:
-            queryset = self.get_queryset()
-
-            attr = request.query_params.get('attr')
-            value = request.query_params.get('value')
-            if attr and value and hasattr(User, attr):
-                starts_with_filter = {f"{attr}__istartswith": value}
-                contains_filter = {f"{attr}__icontains": value}
-                queryset = queryset.filter(Q(**contains_filter))                
-                queryset = queryset.annotate(
-                    relevance=Case(
-                        When(**starts_with_filter, then=V(0)),
-                        default=V(1),
-                        output_field=IntegerField()
-                    )
-                ).order_by('relevance')
-            elif attr and not hasattr(User, attr):
-                return response(400, f"El campo '{attr}' no es válido para filtrado")
-
-            order = request.query_params.get('order')
-            if order:
-                try:
-                    queryset = queryset.order_by(order)
-                except:
-                    return response(400, f"No se pudo ordenar por '{order}'")
-
-            limit = request.query_params.get('limit')
-            offset = request.query_params.get('offset', 0)
-            if limit is not None:
-                try:
-                    limit = int(limit)
-                    offset = int(offset)
-                    queryset = queryset[offset:offset+limit]
-                except ValueError:
-                    return response(400, "Los valores de limit y offset deben ser enteros")
-
-            serializer = self.get_serializer(queryset, many=True)
-            return response(200, "Clientes encontrados", data=serializer.data, count_data=len(queryset))
-
-        except Exception as e:
-            return response(500, f"Error al obtener clientes: {str(e)}")
+    def list(self, request, *args, **kwargs):
+        return self.list_response(request, "Clientes encontrados", "Error al obtener clientes")
 
     def retrieve(self, request, pk=None):
         try: